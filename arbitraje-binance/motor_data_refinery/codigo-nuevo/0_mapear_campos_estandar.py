@@ -1,7 +1,7 @@
 """
 Genera una exportación de símbolos con campos ESTANDARIZADOS independiente del exchange.
 
-Lee markets desde CCXT, aplana las estructuras y aplica el mapeo definido en
+Lee markets desde el snapshot compartido (ver `config/markets.py`), extrae solo las claves del mapeo (ver `config/extractor.py`) definido en
 `codigo/static/campos_estandar.py` para producir un CSV en `codigo/datos/estandar/`.
 
 Dominus puede ajustar los mapeos en tiempo real modificando `campos_estandar.py`.
@@ -15,49 +15,30 @@ from typing import Any, Dict
 from decimal import Decimal
 
 import pandas as pd
-import ccxt
 
 # Rutas/imports robustos
 THIS_DIR = Path(__file__).resolve().parent
 ROOT_DIR = THIS_DIR.parent
 sys.path.insert(0, str(ROOT_DIR))
 
-from codigo.config import EXCHANGE_ID, CCXT_OPTIONS, DATOS_DIR  # type: ignore
+from codigo.config import EXCHANGE_ID, DATOS_DIR, cargar_markets, Extractor  # type: ignore
 from codigo.static.campos_estandar import TARGET_FIELDS, MAPPING  # type: ignore
 
 
-def flatten_json(value: Any, prefix: str = "") -> Dict[str, Any]:
-    out: Dict[str, Any] = {}
-    if isinstance(value, dict):
-        for k, v in value.items():
-            out.update(flatten_json(v, f"{prefix}{k}_"))
-    elif isinstance(value, list):
-        for idx, item in enumerate(value):
-            if isinstance(item, (dict, list)):
-                out.update(flatten_json(item, f"{prefix}{idx}_"))
-            else:
-                out[f"{prefix}{idx}"] = item
-    else:
-        out[prefix[:-1]] = value
-    return out
-
-
-def main() -> None:
-    exchange_id = EXCHANGE_ID
+def generar_estandar(markets: Dict[str, Dict[str, Any]], exchange_id: str = EXCHANGE_ID) -> pd.DataFrame:
+    """Aplica MAPPING[exchange_id] a cada market y devuelve la tabla estandarizada."""
     mapping = MAPPING.get(exchange_id, {})
     if not mapping:
         raise RuntimeError(
             f"❌ No hay mapeo definido para '{exchange_id}' en codigo/static/campos_estandar.py"
         )
 
-    # Instanciar exchange y cargar markets
-    ex_class = getattr(ccxt, exchange_id)
-    ex = ex_class(CCXT_OPTIONS)
-    ex.load_markets()
+    # Claves del mapeo compiladas a rutas una sola vez (sin aplanar todo el market)
+    extractor = Extractor(mapping.keys())
 
     rows_out = []
-    for symbol, market in ex.markets.items():
-        flat = flatten_json(market)
+    for symbol, market in markets.items():
+        flat = extractor.extraer(market)
         normalized: Dict[str, Any] = {k: None for k in TARGET_FIELDS}
 
         # Asignación por mapeo (source_key -> target_field)
@@ -80,16 +61,23 @@ def main() -> None:
 
         rows_out.append(normalized)
 
-    # Exportar CSV
+    return pd.DataFrame(rows_out)
+
+
+def guardar_estandar(df: pd.DataFrame, exchange_id: str = EXCHANGE_ID) -> None:
     out_dir = DATOS_DIR / "estandar"
     out_dir.mkdir(parents=True, exist_ok=True)
     out_csv = out_dir / f"symbols_estandar_{exchange_id}.csv"
-
-    df = pd.DataFrame(rows_out)
     df.to_csv(out_csv, index=False)
     print(f"✅ Export estandarizada generada: {out_csv} ({len(df)} símbolos)")
 
 
+def main() -> None:
+    # Markets desde snapshot (descarga solo si no hay uno vigente)
+    markets = cargar_markets(EXCHANGE_ID)
+    guardar_estandar(generar_estandar(markets, EXCHANGE_ID), EXCHANGE_ID)
+
+
 if __name__ == "__main__":
     main()
 
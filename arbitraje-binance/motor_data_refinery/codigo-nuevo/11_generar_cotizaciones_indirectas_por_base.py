@@ -3,15 +3,15 @@
 import os
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from decimal import Decimal, getcontext, InvalidOperation
-
-# Precisión alta para evitar errores de redondeo
-getcontext().prec = 50
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT_DIR))
 from codigo.config import EXCHANGE_ID  # type: ignore
+from codigo.config.artefactos import existe_artefacto, guardar_artefacto, leer_artefacto  # type: ignore
+from codigo.config.numerico import a_float, equivalencias  # type: ignore
+from codigo.config.ruteo import BASE_CONOCIDA, COLUMNA_RUTEO, columna, tiene  # type: ignore
 base_dir = os.path.dirname(__file__)
 
 # Rutas (con subcarpeta binance)
@@ -19,70 +19,64 @@ path_base_solo = os.path.join(base_dir, 'datos', EXCHANGE_ID, 'previo_a_cotizar'
 path_usdt_equiv = os.path.join(base_dir, 'datos', EXCHANGE_ID, 'cotizaciones_directas_usdt', '2_a_usdt_equivale_base.csv')
 path_salida     = os.path.join(base_dir, 'datos', EXCHANGE_ID, 'previo_a_cotizar', 'cotizaciones_indirectas_por_base.csv')
 
-# Validaciones de existencia
-if not os.path.exists(path_base_solo):
-    raise FileNotFoundError(f"❌ No se encontró: {path_base_solo}")
-if not os.path.exists(path_usdt_equiv):
-    raise FileNotFoundError(f"❌ No se encontró: {path_usdt_equiv}")
-
-# Cargar datos como strings para preservar precisión
-df_base_solo = pd.read_csv(path_base_solo, dtype=str)
-df_equiv     = pd.read_csv(path_usdt_equiv, dtype=str)
-
-# Diccionario: base → unidades de BASE que rinde 1 USDT
-usdt_equiv_dict = {}
-for _, row in df_equiv.iterrows():
-    b = str(row.get('base', '')).strip()
-    v = str(row.get('1_usdt_equivale_base', '')).strip()
-    if not b or not v or v.lower() == 'nan':
-        continue
-    try:
-        usdt_equiv_dict[b] = Decimal(v)
-    except (InvalidOperation, ValueError):
-        continue
-
-filas = []
-for _, row in df_base_solo.iterrows():
-    base  = str(row.get('base', '')).strip()
-    quote = str(row.get('quote', '')).strip()
-    symbol = str(row.get('symbol', '')).strip()
 
+def cotizar_por_base(df_base_solo: pd.DataFrame, df_equiv: pd.DataFrame) -> pd.DataFrame:
+    # base → unidades de BASE que rinde 1 USDT
+    equiv = equivalencias(df_equiv, 'base', '1_usdt_equivale_base')
+
+    def _col(nombre: str) -> pd.Series:
+        return df_base_solo.get(nombre, pd.Series('', index=df_base_solo.index)).astype(str).str.strip()
+
+    base, symbol = _col('base'), _col('symbol')
+    ruteo = columna(df_base_solo) if len(df_base_solo) else np.zeros(0, dtype=np.uint8)
+    # Solo las filas con bit BASE_CONOCIDA se valúan desde la base
+    usdt_to_base = np.where(tiene(ruteo, BASE_CONOCIDA),
+                            base.map(equiv['valor']).to_numpy(dtype=np.float64), np.nan)
     # Precio directo del par (1 BASE en QUOTE) si vino en el CSV
-    raw_val = row.get('1_base_equivale_x_quote', '')
-    sval = str(raw_val).strip()
-    if sval and sval.lower() != 'nan':
-        try:
-            p_base_en_quote = Decimal(sval)
-        except (InvalidOperation, ValueError):
-            p_base_en_quote = None
-    else:
-        p_base_en_quote = None
-
-    try:
-        if base in usdt_equiv_dict and p_base_en_quote is not None:
-            # 1 USDT = X BASE; 1 BASE = Y QUOTE → 1 USDT = X*Y QUOTE
-            usdt_to_base = usdt_equiv_dict[base]
-            quote_rinde  = usdt_to_base * p_base_en_quote
-
-            filas.append({
-                'symbol': symbol,
-                'base': base,
-                'quote': quote,
-                '1_dolar_equivale_a_quote': str(quote_rinde)
-            })
-        else:
-            # Mensaje informativo si faltan insumos
-            if base not in usdt_equiv_dict:
-                print(f"⚠️ Sin equivalencia USDT→{base}")
-            if p_base_en_quote is None:
-                print(f"⚠️ Sin precio base→quote para {symbol}")
-    except Exception as e:
-        print(f"❌ Error procesando {symbol}: {e}")
-
-# Guardar archivo final
-os.makedirs(os.path.dirname(path_salida), exist_ok=True)
-df_resultado = pd.DataFrame(filas)
-df_resultado.to_csv(path_salida, index=False)
-
-print("✅ Archivo generado con equivalencias por base:")
-print(f"📄 {path_salida}")
+    p_base_en_quote = a_float(df_base_solo.get('1_base_equivale_x_quote', pd.Series(np.nan, index=df_base_solo.index)))
+
+    con_equiv = np.isfinite(usdt_to_base)
+    con_precio = np.isfinite(p_base_en_quote)
+    # Mensaje informativo si faltan insumos
+    for b, s_, ok_e, ok_p in zip(base, symbol, con_equiv, con_precio):
+        if not ok_e:
+            print(f"⚠️ Sin equivalencia USDT→{b}")
+        if not ok_p:
+            print(f"⚠️ Sin precio base→quote para {s_}")
+
+    # 1 USDT = X BASE; 1 BASE = Y QUOTE → 1 USDT = X*Y QUOTE (float64; texto solo en el CSV)
+    ok = con_equiv & con_precio
+    if not ok.any():
+        return pd.DataFrame()
+    return pd.DataFrame({
+        'symbol': symbol[ok].to_numpy(),
+        'base': base[ok].to_numpy(),
+        'quote': _col('quote')[ok].to_numpy(),
+        '1_dolar_equivale_a_quote': usdt_to_base[ok] * p_base_en_quote[ok],
+        COLUMNA_RUTEO: ruteo[ok],
+    })
+
+
+def guardar(df_resultado: pd.DataFrame) -> None:
+    guardar_artefacto(df_resultado, path_salida, 'por_base')
+
+    print("✅ Archivo generado con equivalencias por base:")
+    print(f"📄 {path_salida}")
+
+
+def main():
+    # Validaciones de existencia
+    if not existe_artefacto(path_base_solo):
+        raise FileNotFoundError(f"❌ No se encontró: {path_base_solo}")
+    if not existe_artefacto(path_usdt_equiv):
+        raise FileNotFoundError(f"❌ No se encontró: {path_usdt_equiv}")
+
+    # Artefactos tipados (Parquet) o, si no hay, los CSV (precios float64 en ambos casos)
+    df_base_solo = leer_artefacto(path_base_solo)
+    df_equiv     = leer_artefacto(path_usdt_equiv)
+
+    guardar(cotizar_por_base(df_base_solo, df_equiv))
+
+
+if __name__ == "__main__":
+    main()
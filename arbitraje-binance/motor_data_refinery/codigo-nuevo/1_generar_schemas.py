@@ -2,17 +2,28 @@
 # pylint: disable=invalid-name
 """
 Genera un archivo de *schema* estructural basado en todos los mercados que
-retorna `load_markets()` de CCXT para el exchange definido en config.EXCHANGE_ID.
+retorna `load_markets()` de CCXT para el exchange definido en config.EXCHANGE_ID
+(leídos desde el snapshot compartido de `config/markets.py`).
+
+La inferencia es incremental: cada market se reduce a una huella de forma
+(claves + tipos) y solo las formas nuevas pasan por `infer_type`. El catálogo
+de formas se persiste en temp/, así que una re-corrida solo informa la deriva
+estructural (claves nuevas/eliminadas, cambios de tipo) y reescribe schema.py
+únicamente si la hubo.
 
 🗂  Salida:
    - El schema se guarda en: app/codigo/temp/schema.py  (sin prefijo de exchange)
+   - Catálogo de formas:     app/codigo/temp/schema_formas_<exchange>.json
 """
 
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
+import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, List, Optional, Tuple
 import ccxt
 
 # ---------------------------------------------------------------------------
@@ -21,13 +32,15 @@ import ccxt
 try:
     # cuando corrés: python -m app.codigo.1_generar_schemas
     from .config import config
+    from .config import markets as markets_snapshot
 except Exception:
     # cuando corrés: python app/codigo/1_generar_schemas.py
-    import sys, os
+    import sys
     THIS_DIR = Path(__file__).resolve().parent
     sys.path.insert(0, str(THIS_DIR / "config"))   # app/codigo/config
     sys.path.insert(0, str(THIS_DIR))              # app/codigo
     import config  # type: ignore
+    from config import markets as markets_snapshot  # type: ignore
 
 # ---------------------------------------------------------------------------
 # 🔧 Utilitarios de inferencia/estructura
@@ -78,14 +91,187 @@ def ensure_init(path: Path) -> None:
     if not init_file.exists():
         init_file.write_text("")
 
+# ---------------------------------------------------------------------------
+# 🧬 Huellas de forma + catálogo persistente
+# ---------------------------------------------------------------------------
+
+CATALOGO_VERSION = 1
+
+def _firma(value: Any, partes: List[str]) -> None:
+    """Tokens de forma: mismos criterios que `infer_type`, sin armar dicts."""
+    if isinstance(value, dict):
+        partes.append("{")
+        for k, v in value.items():
+            partes.append(k)
+            partes.append(":")
+            _firma(v, partes)
+            partes.append(",")
+        partes.append("}")
+    elif isinstance(value, list):
+        partes.append(infer_type(value))  # para listas infer_type no recorre dicts internos
+    elif value is None:
+        partes.append("None")
+    else:
+        partes.append(type(value).__name__)
+
+def firma_forma(market: Any) -> str:
+    """Huella corta de la estructura de un market (claves, orden y tipos)."""
+    partes: List[str] = []
+    _firma(market, partes)
+    return hashlib.blake2b("\x1f".join(partes).encode("utf-8"), digest_size=16).hexdigest()
+
+def catalogo_path(exchange_id: str) -> Path:
+    return Path(config.TEMP_DIR) / f"schema_formas_{exchange_id}.json"
+
+def cargar_catalogo(exchange_id: str) -> Dict[str, Any]:
+    path = catalogo_path(exchange_id)
+    vacio = {"version": CATALOGO_VERSION, "exchange_id": exchange_id, "formas": {}, "schema": None}
+    if not path.exists():
+        return vacio
+    try:
+        cat = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return vacio
+    if cat.get("version") != CATALOGO_VERSION or cat.get("exchange_id") != exchange_id:
+        return vacio
+    return cat
+
+def guardar_catalogo(catalogo: Dict[str, Any], exchange_id: str) -> None:
+    path = catalogo_path(exchange_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(catalogo, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+def inferir_con_catalogo(
+    markets: dict[str, Any],
+    formas: Dict[str, Dict[str, Any]],
+) -> Tuple[dict[str, Any], Dict[str, int]]:
+    """
+    Infiere el schema fusionado usando `formas` (huella → schema inferido) como caché;
+    `formas` queda actualizado (nuevas agregadas, no vistas eliminadas).
+    El resultado es idéntico a fusionar `infer_type` de todos los markets en orden.
+    """
+    vistas: Dict[str, int] = {}
+    schema: dict[str, Any] = {}
+    nuevas = 0
+    for symbol, market in markets.items():
+        fp = firma_forma(market)
+        if fp in vistas:
+            vistas[fp] += 1
+            continue
+        vistas[fp] = 1
+        if fp not in formas:
+            formas[fp] = {"schema": infer_type(market), "ejemplo": symbol}
+            nuevas += 1
+        inferred = formas[fp]["schema"]
+        if isinstance(inferred, dict):
+            # copia: merge_dicts comparte sub-dicts y no debe tocar el catálogo
+            schema = merge_dicts(schema, copy.deepcopy(inferred))
+
+    eliminadas = [fp for fp in formas if fp not in vistas]
+    for fp in eliminadas:
+        del formas[fp]
+    for fp, n in vistas.items():
+        formas[fp]["n"] = n
+    return schema, {"markets": len(markets), "formas": len(vistas), "nuevas": nuevas, "eliminadas": len(eliminadas)}
+
+def inferir_schema(markets: dict[str, Any], exchange_id: Optional[str] = None) -> dict[str, Any]:
+    """
+    Infiere y fusiona la estructura de todos los markets.
+    Con `exchange_id` reutiliza (y actualiza) el catálogo de formas persistido.
+    """
+    if exchange_id is None:
+        return inferir_con_catalogo(markets, {})[0]
+    catalogo = cargar_catalogo(exchange_id)
+    schema, stats = inferir_con_catalogo(markets, catalogo["formas"])
+    print(f"🧬 {stats['formas']} formas en {stats['markets']} markets "
+          f"(nuevas: {stats['nuevas']}, eliminadas: {stats['eliminadas']})")
+    guardar_catalogo(catalogo, exchange_id)
+    return schema
+
+# ---------------------------------------------------------------------------
+# 🔀 Deriva estructural
+# ---------------------------------------------------------------------------
+
+def _tipos_por_ruta(schema: Any, prefix: str = "") -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    if isinstance(schema, dict):
+        for k, v in schema.items():
+            ruta = f"{prefix}{k}"
+            if isinstance(v, dict):
+                out[ruta] = "dict"
+                out.update(_tipos_por_ruta(v, ruta + "."))
+            else:
+                out[ruta] = str(v)
+    return out
+
+def detectar_deriva(anterior: Optional[dict[str, Any]], nuevo: dict[str, Any]) -> Dict[str, Any]:
+    """Claves agregadas/eliminadas y cambios de tipo entre dos schemas."""
+    a, n = _tipos_por_ruta(anterior or {}), _tipos_por_ruta(nuevo)
+    return {
+        "agregadas": {k: n[k] for k in n if k not in a},
+        "eliminadas": {k: a[k] for k in a if k not in n},
+        "cambios": {k: (a[k], n[k]) for k in n if k in a and a[k] != n[k]},
+    }
+
+def hay_deriva(deriva: Dict[str, Any]) -> bool:
+    return any(deriva[k] for k in ("agregadas", "eliminadas", "cambios"))
+
+def reportar_deriva(deriva: Dict[str, Any], limite: int = 50) -> None:
+    if not hay_deriva(deriva):
+        print("✅ Sin deriva estructural respecto del catálogo.")
+        return
+    print(f"🔀 Deriva estructural: +{len(deriva['agregadas'])} claves, "
+          f"-{len(deriva['eliminadas'])} claves, {len(deriva['cambios'])} cambios de tipo")
+    lineas = (
+        [f"   + {k}: {t}" for k, t in deriva["agregadas"].items()]
+        + [f"   - {k}: {t}" for k, t in deriva["eliminadas"].items()]
+        + [f"   ~ {k}: {a} → {b}" for k, (a, b) in deriva["cambios"].items()]
+    )
+    for linea in lineas[:limite]:
+        print(linea)
+    if len(lineas) > limite:
+        print(f"   … y {len(lineas) - limite} más")
+
+def escribir_schema(schema: dict[str, Any], exchange_id: str, output_path: Path) -> None:
+    """Guarda el schema como archivo Python (sin prefijo del exchange)."""
+    with output_path.open("w", encoding="utf-8") as f:
+        f.write("# Auto-generado: estructura completa deducida desde CCXT.\n")
+        f.write(f"# Exchange origen: {exchange_id}\n")
+        f.write("# Origen del generador: app/codigo/1_generar_schemas.py\n\n")
+        f.write("schema = ")
+        json.dump(schema, f, indent=4, ensure_ascii=False)  # Dict Python serializado
+
+def persistir_schema(schema: dict[str, Any], exchange_id: str, output_path: Path) -> Dict[str, Any]:
+    """
+    Compara contra el schema del catálogo, informa la deriva y solo reescribe
+    `schema.py` si hubo cambios (o si no existe). Devuelve la deriva.
+    """
+    catalogo = cargar_catalogo(exchange_id)
+    previo = catalogo.get("schema")
+    deriva = detectar_deriva(previo, schema)
+    if previo is None:
+        print(f"🆕 Catálogo de formas nuevo para '{exchange_id}'.")
+    else:
+        reportar_deriva(deriva)
+    if previo is None or hay_deriva(deriva) or not output_path.exists():
+        escribir_schema(schema, exchange_id, output_path)
+        print(f"✅ Schema generado en: {output_path}")
+    else:
+        print(f"⏭️ {output_path} sin cambios.")
+    catalogo["schema"] = schema
+    guardar_catalogo(catalogo, exchange_id)
+    return deriva
+
 # ---------------------------------------------------------------------------
 # 🚀 Generador principal (config-driven)
 # ---------------------------------------------------------------------------
 
 def generate_schema() -> None:
     """
-    Crea el archivo de schema basado en `exchange.markets`,
-    infiriendo los tipos de datos y exportándolo como archivo .py estructurado.
+    Crea (o actualiza por deriva) el archivo de schema basado en `exchange.markets`,
+    infiriendo los tipos de datos por forma y exportándolo como archivo .py estructurado.
     Usa EXCHANGE_ID y SCHEMA_OUTPUT_PATH desde config.
     """
     exchange_id = config.EXCHANGE_ID
@@ -98,32 +284,26 @@ def generate_schema() -> None:
         ensure_init(output_path.parent)
 
     try:
-        # Inicializa exchange desde CCXT con opciones de config
-        exchange_class = getattr(ccxt, exchange_id)
-        exchange = exchange_class(config.CCXT_OPTIONS)
-        exchange.load_markets()  # Carga info de todos los mercados disponibles
-
-        schema: dict[str, Any] = {}
-
-        # Recorrer todos los mercados para inferir y fusionar estructura
-        for market in exchange.markets.values():
-            inferred = infer_type(market)
-            if isinstance(inferred, dict):
-                schema = merge_dicts(schema, inferred)
-
-        # Guardar como archivo Python con el schema (sin prefijo del exchange)
-        with output_path.open("w", encoding="utf-8") as f:
-            f.write("# Auto-generado: estructura completa deducida desde CCXT.\n")
-            f.write(f"# Exchange origen: {exchange_id}\n")
-            f.write("# Origen del generador: app/codigo/1_generar_schemas.py\n\n")
-            f.write("schema = ")
-            json.dump(schema, f, indent=4, ensure_ascii=False)  # Dict Python serializado
+        # Markets desde snapshot compartido (descarga solo si no hay uno vigente)
+        payload = markets_snapshot.cargar_snapshot(exchange_id)
 
-        print(f"✅ Schema generado en: {output_path}")
+        # Snapshot idéntico al de la última corrida → nada que inferir
+        catalogo = cargar_catalogo(exchange_id)
+        if catalogo.get("markets_sha256") == payload["sha256"] and catalogo.get("schema") and output_path.exists():
+            print(f"⏭️ Markets sin cambios (sha256 {payload['sha256'][:12]}…); schema vigente: {output_path}")
+            return
+
+        # Inferencia solo para formas nuevas + deriva contra el catálogo
+        schema = inferir_schema(payload["markets"], exchange_id)
+        persistir_schema(schema, exchange_id, output_path)
+
+        catalogo = cargar_catalogo(exchange_id)
+        catalogo["markets_sha256"] = payload["sha256"]
+        guardar_catalogo(catalogo, exchange_id)
 
     except AttributeError:
         print(f"❌ Exchange '{exchange_id}' no es reconocido por CCXT.")
-    except (ccxt.NetworkError, ccxt.ExchangeError) as err:
+    except (ccxt.NetworkError, ccxt.ExchangeError, RuntimeError) as err:
         print(f"⚠️ Error procesando '{exchange_id}' vía CCXT: {err}")
     except Exception as e:
         print(f"❌ Error inesperado: {e}")
@@ -2,30 +2,35 @@
 from __future__ import annotations
 
 import os, sys, json, re
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, List, Optional
 from pathlib import Path
 
 THIS_DIR = Path(__file__).resolve().parent
 try:
     # Ejecución como módulo: python -m codigo.2_crear_estructura_y_llenar
     from .config import (
-        EXCHANGE_ID, CCXT_OPTIONS,
+        EXCHANGE_ID,
         ensure_runtime_dirs, load_schema_or_abort,
         AUDIT_STRUCT_EXPORT, ESTRUCTURAL_DIR,
-        connect,
+        conexion, cargar_markets,
+        adaptar_frame, generar_ddl, tipos_columnas, ensanchar, asegurar_indices,
+        aplicar_delta, asegurar_columna_huella, con_huella,
+        Extractor, extractores_de_schema, aplanar,
     )
 except Exception:
     # Ejecución directa: python codigo/2_crear_estructura_y_llenar.py
     # Agregamos .../codigo al sys.path para importar el paquete 'config'
     sys.path.insert(0, str(THIS_DIR))
     from config import (  # type: ignore
-        EXCHANGE_ID, CCXT_OPTIONS,
+        EXCHANGE_ID,
         ensure_runtime_dirs, load_schema_or_abort,
         AUDIT_STRUCT_EXPORT, ESTRUCTURAL_DIR,
-        connect,
+        conexion, cargar_markets,
+        adaptar_frame, generar_ddl, tipos_columnas, ensanchar, asegurar_indices,
+        aplicar_delta, asegurar_columna_huella, con_huella,
+        Extractor, extractores_de_schema, aplanar,
     )
 
-import ccxt
 import numpy as np
 import pandas as pd
 import pymysql
@@ -37,42 +42,6 @@ def sanitize_name(name: str) -> str:
     return re.sub(r"[^a-zA-Z0-9_]", "_", name)
 
 
-def flatten_json(value: Any, prefix: str = "") -> Dict[str, Any]:
-    """
-    Aplana dict/list a clave=valor (una capa).
-    Ejemplos de salida: 'precision_amount', 'limits_price_min', 'info_status'
-    """
-    out: Dict[str, Any] = {}
-    if isinstance(value, dict):
-        for k, v in value.items():
-            out.update(flatten_json(v, f"{prefix}{k}_"))
-    elif isinstance(value, list):
-        for idx, item in enumerate(value):
-            if isinstance(item, (dict, list)):
-                out.update(flatten_json(item, f"{prefix}{idx}_"))
-            else:
-                out[f"{prefix}{idx}"] = item
-    else:
-        out[prefix[:-1]] = value
-    return out
-
-
-def flatten_schema_keys(node: Any, prefix: str = "") -> Set[str]:
-    """
-    A partir de un sub-schema dict, genera el set de claves aplanadas esperadas.
-    Ej: {"precision": {"amount": "float"}} con prefix='precision_' → {'precision_amount'}
-    """
-    keys: Set[str] = set()
-    if isinstance(node, dict):
-        for k, v in node.items():
-            if isinstance(v, dict):
-                keys |= flatten_schema_keys(v, prefix + k + "_")
-            else:
-                keys.add((prefix + k).rstrip("_"))
-    # Si es list/u otro tipo, no agregamos restricciones
-    return keys
-
-
 def pairs_to_single_row_map(arr: List[List[Any]], prefix: str) -> Dict[str, Any]:
     """
     Convierte [[x,y],[a,b],...] a un solo dict:
@@ -92,17 +61,19 @@ def process_field(
     base: Dict[str, Any],
     rows_dict: Dict[str, List[Dict[str, Any]]],
     schema_local: Dict[str, Any],
+    extractor: Optional[Extractor] = None,
 ) -> None:
     """Procesa un campo anidado según el schema manual."""
     table_name = f"sym_{key}"
 
     if isinstance(value, dict):
-        # 🔧 FIX: aplanar con prefijo 'key_' para alinear con flatten_schema_keys()
-        flat_val = flatten_json(value, prefix=f"{key}_")
+        # Claves 'key_<sub>' del schema leídas por ruta directa (config/extractor.py)
         schema_sub = schema_local.get(key)
         if isinstance(schema_sub, dict):
-            allowed = flatten_schema_keys(schema_sub, prefix=f"{key}_")
-            flat_val = {k: v for k, v in flat_val.items() if (k in allowed)}
+            extractor = extractor or Extractor.desde_schema(schema_sub, prefix=f"{key}_")
+            flat_val = extractor.extraer(value)
+        else:
+            flat_val = aplanar(value, prefix=f"{key}_")
         flat_val.update(base)
         rows_dict[table_name].append(flat_val)
 
@@ -117,7 +88,7 @@ def process_field(
 
 
 def build_relational_rows(
-    exchange: ccxt.Exchange,
+    markets: Dict[str, Dict[str, Any]],
     symbols: List[str],
     schema_local: Dict[str, Any],
     exchange_id: str,
@@ -130,10 +101,11 @@ def build_relational_rows(
     }
 
     print(f"🔁 Procesando {len(symbols)} símbolos de {exchange_id}…")
+    extractores = extractores_de_schema(schema_local)
 
     for symbol in symbols:
         try:
-            market = exchange.markets[symbol]
+            market = markets[symbol]
             base_ref = {
                 "exchange": exchange_id,                 # exchange como columna
                 "symbol_id": f"{exchange_id}:{symbol}",  # trazabilidad
@@ -143,72 +115,32 @@ def build_relational_rows(
                 if key in {"symbol_id", "symbol"}:
                     continue
                 if isinstance(schema_local[key], (dict, list)):
-                    process_field(market.get(key), key, base_ref, rows_rel, schema_local)
+                    process_field(market.get(key), key, base_ref, rows_rel, schema_local, extractores.get(key))
         except Exception as exc:
             print(f"⚠️ Error con símbolo {symbol}: {exc}")
 
     return rows_rel
 
 
-def create_and_fill_tables(
-    connection: pymysql.connections.Connection,
-    rows_dict: Dict[str, List[Dict[str, Any]]],
-) -> None:
-    """Crea tablas neutrales `sym_*` y hace REPLACE INTO. Exporta CSV si está activado."""
-    for table, rows in rows_dict.items():
-        if not rows:
-            continue
-
-        df = pd.DataFrame(rows)
-        df = df.where(pd.notnull(df), None).replace({np.nan: None})
-        df.columns = [sanitize_name(col) for col in df.columns]
-
-        # Tipos
-        cols_sql_parts = [
-            f"`{col}` VARCHAR(255)" if col in {"exchange", "symbol_id", "symbol"} else f"`{col}` TEXT"
-            for col in df.columns
-        ]
-        # PK homogénea en symbol_id
-        if "symbol_id" in df.columns:
-            cols_sql_parts.append("PRIMARY KEY (`symbol_id`)")
-
-        create_sql = "CREATE TABLE IF NOT EXISTS `{}` (\n    {}\n) CHARACTER SET utf8mb4;".format(
-            table, ",\n    ".join(cols_sql_parts)
-        )
-        insert_sql = (
-            f"REPLACE INTO `{table}` (" + ", ".join(f"`{c}`" for c in df.columns) + ") "
-            f"VALUES ({', '.join(['%s'] * len(df.columns))});"
-        )
-
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute(create_sql)
-                cursor.executemany(insert_sql, df.values.tolist())
-            connection.commit()
-            print(f"✅ Tabla `{table}` creada/actualizada ({len(df)} filas).")
-        except Exception as exc:
-            print(f"⚠️ Error en tabla {table}: {exc}")
-
-        # Auditoría opcional
-        if AUDIT_STRUCT_EXPORT:
-            ESTRUCTURAL_DIR.mkdir(parents=True, exist_ok=True)
-            df.to_csv(ESTRUCTURAL_DIR / f"{table}.csv", index=False)
+def rows_to_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Filas → DataFrame con NaN como None y columnas SQL-safe."""
+    df = pd.DataFrame(rows)
+    df = df.where(pd.notnull(df), None).replace({np.nan: None})
+    df.columns = [sanitize_name(col) for col in df.columns]
+    return df
 
 
-def create_flat_symbols_table(
-    connection: pymysql.connections.Connection,
+def build_flat_symbol_rows(
     exchange_id: str,
-    exchange: ccxt.Exchange,
+    markets: Dict[str, Dict[str, Any]],
     schema_local: Dict[str, Any],
     symbols: List[str],
-) -> None:
-    """Crea `sym_symbols` con una fila por símbolo; solo campos simples del schema."""
-    table_name = "sym_symbols"
+) -> List[Dict[str, Any]]:
+    """Una fila por símbolo para `sym_symbols`; solo campos simples del schema."""
     rows: List[Dict[str, Any]] = []
-
     for symbol in symbols:
         try:
-            market = exchange.markets[symbol]
+            market = markets[symbol]
             row = {"exchange": exchange_id, "symbol_id": f"{exchange_id}:{symbol}", "symbol": symbol}
             for key, value in market.items():
                 if key in schema_local and not isinstance(schema_local[key], (dict, list)):
@@ -216,45 +148,78 @@ def create_flat_symbols_table(
             rows.append(row)
         except Exception as exc:
             print(f"⚠️ Error procesando {symbol} en tabla plana: {exc}")
+    return rows
 
-    if not rows:
-        print(f"⚠️ No se generaron datos para {table_name}")
-        return
 
-    df = pd.DataFrame(rows)
-    df = df.where(pd.notnull(df), None).replace({np.nan: None})
-    df.columns = [sanitize_name(col) for col in df.columns]
+def construir_tablas(
+    markets: Dict[str, Dict[str, Any]],
+    schema_local: Dict[str, Any],
+    exchange_id: str,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Arma en memoria todas las tablas `sym_*` (relacionales + `sym_symbols`)
+    sin tocar la DB. Es la unidad que consume el orquestador.
+    """
+    symbols: List[str] = sorted(s for s in markets if "/" in s)
+    rows_rel = build_relational_rows(markets, symbols, schema_local, exchange_id)
+    tablas = {table: rows_to_frame(rows) for table, rows in rows_rel.items() if rows}
 
-    cols_sql_parts = [
-        f"`{col}` VARCHAR(255)" if col in {"exchange", "symbol_id", "symbol", "base", "quote"} else f"`{col}` TEXT"
-        for col in df.columns
-    ]
-    if "symbol_id" in df.columns:
-        cols_sql_parts.append("PRIMARY KEY (`symbol_id`)")
-
-    create_sql = (
-        f"CREATE TABLE IF NOT EXISTS `{table_name}` (\n    "
-        + ",\n    ".join(cols_sql_parts)
-        + "\n) CHARACTER SET utf8mb4;"
-    )
-    insert_sql = (
-        f"REPLACE INTO `{table_name}` (" + ", ".join(f"`{col}`" for col in df.columns) + ") "
-        f"VALUES ({', '.join(['%s'] * len(df.columns))});"
-    )
+    flat_rows = build_flat_symbol_rows(exchange_id, markets, schema_local, symbols)
+    if flat_rows:
+        tablas["sym_symbols"] = rows_to_frame(flat_rows)
+    else:
+        print("⚠️ No se generaron datos para sym_symbols")
+    return tablas
+
+
+def guardar_tabla(
+    connection: pymysql.connections.Connection,
+    table: str,
+    df: pd.DataFrame,
+    tipos: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Crea la tabla `sym_*` si no existe (DDL tipado según el schema, PK en symbol_id),
+    indexa quote y base+quote según los tipos reales de la tabla, ensancha los VARCHAR que ya no alcanzan y
+    escribe solo el delta contra la huella `row_hash` de cada fila (nuevas /
+    cambiadas / borradas). Exporta CSV si está activado.
+    """
+    tipos = tipos if tipos is not None else tipos_columnas()
+    df_sql = con_huella(adaptar_frame(df, tipos))
+    create_sql, _ = generar_ddl(table, df_sql, tipos, si_no_existe=True)
+
+    # Delta acotado al exchange de esta corrida (la tabla puede tener otros)
+    ambito = None
+    if "exchange" in df.columns and df["exchange"].nunique() == 1:
+        ambito = {"exchange": df["exchange"].iloc[0]}
 
     try:
         with connection.cursor() as cursor:
             cursor.execute(create_sql)
-            cursor.executemany(insert_sql, df.values.tolist())
+        # La tabla puede ser previa (p. ej. todo TEXT): índices sobre lo que realmente hay
+        asegurar_indices(connection, table)
+        ensanchar(connection, table, df_sql)
+        asegurar_columna_huella(connection, table)
+        delta = aplicar_delta(connection, table, df_sql, ambito=ambito)
         connection.commit()
-        print(f"✅ Tabla `{table_name}` creada/actualizada ({len(df)} filas).")
+        print(f"✅ Tabla `{table}` sincronizada ({len(df)} filas: {delta}).")
     except Exception as exc:
-        print(f"⚠️ Error creando o insertando en {table_name}: {exc}")
+        connection.rollback()
+        raise RuntimeError(f"❌ Error en tabla {table}: {exc}") from exc
 
     # Auditoría opcional
     if AUDIT_STRUCT_EXPORT:
         ESTRUCTURAL_DIR.mkdir(parents=True, exist_ok=True)
-        df.to_csv(ESTRUCTURAL_DIR / f"{table_name}.csv", index=False)
+        df.to_csv(ESTRUCTURAL_DIR / f"{table}.csv", index=False)
+
+
+def persistir_tablas(
+    connection: pymysql.connections.Connection,
+    tablas: Dict[str, pd.DataFrame],
+) -> None:
+    tipos = tipos_columnas()
+    for table, df in tablas.items():
+        guardar_tabla(connection, table, df, tipos)
 
 
 # ────────────────────────── Orquestador ──────────────────────────
@@ -265,28 +230,15 @@ def main() -> None:
     # 1) Cargar schema manual (obligatorio; sin fallback)
     schema_local: Dict[str, Any] = load_schema_or_abort()
 
-    # 2) Instanciar exchange (CCXT)
-    try:
-        exchange = getattr(ccxt, EXCHANGE_ID)(CCXT_OPTIONS)
-        exchange.load_markets()
-    except Exception as exc:
-        raise RuntimeError(f"❌ Error al cargar exchange {EXCHANGE_ID}: {exc}") from exc
-
-    # 3) Símbolos spot/estándar (ignoramos sintéticos)
-    symbols: List[str] = [s for s in exchange.symbols if "/" in s]
+    # 2) Markets desde snapshot compartido (descarga solo si no hay uno vigente)
+    markets = cargar_markets(EXCHANGE_ID)
 
-    # 4) Conexión DB
-    connection = connect()
+    # 3) Tablas sym_* en memoria (símbolos spot/estándar, ignoramos sintéticos)
+    tablas = construir_tablas(markets, schema_local, EXCHANGE_ID)
 
-    try:
-        rows_relacionales = build_relational_rows(exchange, symbols, schema_local, EXCHANGE_ID)
-        create_and_fill_tables(connection, rows_relacionales)
-        create_flat_symbols_table(connection, EXCHANGE_ID, exchange, schema_local, symbols)
-    finally:
-        try:
-            connection.close()
-        except Exception:
-            pass
+    # 4) Conexión DB (del pool compartido; vuelve al pool al salir)
+    with conexion() as connection:
+        persistir_tablas(connection, tablas)
 
     print("🎯 Finalizado.")
 
@@ -3,61 +3,50 @@
 Valida que los datos estructurales cargados estén consistentes y completos
 comparando la base de datos (tablas 'sym_*') contra los datos reales de CCXT
 (`load_markets()`), usando el MISMO aplanado que usamos al cargar.
+
+Motor columnar: DB y exchange se alinean como frames indexados por symbol_id.
+Las filas idénticas se descartan de una por huella de fila; en el resto, las
+columnas numéricas se comparan con tolerancia vectorizada y las de texto por
+igualdad vectorizada. El resultado es un diff estructurado
+(symbol_id, symbol, campo, tipo, valor_db, valor_ccxt) que se exporta a CSV.
 """
 
 from __future__ import annotations
 import sys
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List
 
 # ── Imports del paquete de config (robustos para ambos modos de ejecución)
 THIS_DIR = Path(__file__).resolve().parent
 try:
     # python -m codigo.3_validar_estructura
     from .config import (
-        EXCHANGE_ID, CCXT_OPTIONS,
-        connect,
+        EXCHANGE_ID, DATOS_DIR,
+        conexion, motor, cargar_markets, extractor_para, COLUMNA_HUELLA,
     )
 except Exception:
     # python codigo/3_validar_estructura.py
     sys.path.insert(0, str(THIS_DIR))
     from config import (  # type: ignore
-        EXCHANGE_ID, CCXT_OPTIONS,
-        connect,
+        EXCHANGE_ID, DATOS_DIR,
+        conexion, motor, cargar_markets, extractor_para, COLUMNA_HUELLA,
     )
 
 import pymysql
 import pandas as pd
 import numpy as np
-import ccxt
 
 TOLERANCIA = 1e-8  # tolerancia numérica para floats
 
+# Columnas de DB que no vienen del market CCXT (trazabilidad y huella del upsert delta)
+COLUMNAS_NO_MARKET = {"exchange", "symbol", "symbol_id", COLUMNA_HUELLA}
 
-# ───────────────────────── Helpers ─────────────────────────
+COLUMNAS_DIFF = ["symbol_id", "symbol", "campo", "tipo", "valor_db", "valor_ccxt"]
+DIFF_PATH = DATOS_DIR / "tratamiento_de_tablas" / f"validacion_{EXCHANGE_ID}.csv"
 
-def flatten_json(value: Any, prefix: str = "") -> Dict[str, Any]:
-    """
-    MISMO aplanado que usa el cargador:
-      - dict → prefijo 'key_'
-      - list → indices 'key_0', 'key_1', ...
-      - escalares → clave completa sin '_' final
-    Ejemplos de salida: 'precision_amount', 'limits_price_min', 'info_status'
-    """
-    out: Dict[str, Any] = {}
-    if isinstance(value, dict):
-        for k, v in value.items():
-            out.update(flatten_json(v, f"{prefix}{k}_"))
-    elif isinstance(value, list):
-        for idx, item in enumerate(value):
-            if isinstance(item, (dict, list)):
-                out.update(flatten_json(item, f"{prefix}{idx}_"))
-            else:
-                out[f"{prefix}{idx}"] = item
-    else:
-        out[prefix[:-1]] = value
-    return out
 
+# ───────────────────────── Lectura ─────────────────────────
 
 def get_sym_tables(conn: pymysql.connections.Connection) -> List[str]:
     """Retorna todas las tablas que comienzan con 'sym_' en el schema actual."""
@@ -75,129 +64,193 @@ def get_sym_tables(conn: pymysql.connections.Connection) -> List[str]:
         return [t for t in names if t.startswith("sym_")]
 
 
-def read_tables_grouped_by_symbol(conn: pymysql.connections.Connection, tables: List[str]) -> Dict[str, Dict[str, Any]]:
+def leer_tablas(engine, tables: List[str]) -> Dict[str, pd.DataFrame]:
+    """Cada tabla sym_* completa como DataFrame (una consulta por tabla)."""
+    return {t: pd.read_sql(f"SELECT * FROM `{t}`", engine) for t in tables}
+
+
+def frame_por_simbolo(tablas: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     """
-    Lee todas las tablas sym_* y agrupa sus columnas por symbol_id.
-    Si hay colisiones de nombres, la última tabla leída pisa (no debería ocurrir si schema es disjunto).
+    Une las tablas sym_* en un frame ancho indexado por symbol_id.
+    Columnas repetidas (symbol, exchange): gana la última tabla que las trae.
     """
-    per_symbol: Dict[str, Dict[str, Any]] = {}
-    for tbl in tables:
-        with conn.cursor() as cursor:
-            cursor.execute(f"SELECT * FROM `{tbl}`")
-            rows = cursor.fetchall()
-            for row in rows:
-                sym_id = row.get("symbol_id") if isinstance(row, dict) else None
-                if not sym_id:
-                    continue
-                if sym_id not in per_symbol:
-                    per_symbol[sym_id] = {}
-                # merge excepto symbol_id
-                for k, v in row.items():
-                    if k == "symbol_id":
-                        continue
-                    per_symbol[sym_id][k] = v
-    return per_symbol
-
-
-def almost_equal(a: Any, b: Any, tol: float = TOLERANCIA) -> bool:
-    """Comparación laxa para floats; exacta para strings/otros."""
-    # Trata de comparar como float si ambos son parseables
-    try:
-        fa = float(a)
-        fb = float(b)
-        if np.isnan(fa) and np.isnan(fb):
-            return True
-        return abs(fa - fb) <= tol
-    except Exception:
-        # Comparación exacta como string
-        return str(a) == str(b)
-
-
-def compare_symbol(
-    sym_id: str,
-    db_dict: Dict[str, Any],
-    ccxt_market: Dict[str, Any],
-) -> List[str]:
+    partes: List[pd.DataFrame] = []
+    vistas: set = set()
+    for df in reversed(list(tablas.values())):
+        if "symbol_id" not in df.columns:
+            continue
+        df = df[df["symbol_id"].notna() & (df["symbol_id"] != "")]
+        cols = [c for c in df.columns if c != "symbol_id" and c not in vistas]
+        vistas.update(cols)
+        partes.append(df.drop_duplicates("symbol_id", keep="last").set_index("symbol_id")[cols])
+    if not partes:
+        return pd.DataFrame(index=pd.Index([], name="symbol_id"))
+    return pd.concat(partes, axis=1, join="outer")
+
+
+def frame_exchange(db: pd.DataFrame, markets: Dict[str, Dict[str, Any]], campos: List[str]) -> pd.DataFrame:
+    """Valores CCXT de `campos` para cada fila de `db`, por ruta compilada (mismo aplanado que al cargar)."""
+    extractor = extractor_para(tuple(campos))
+    filas = [extractor.extraer(markets[s]) for s in db["symbol"]]
+    return pd.DataFrame(filas, index=db.index, columns=campos)
+
+
+# ───────────────────────── Comparación columnar ─────────────────────────
+
+def _a_float(s: pd.Series) -> pd.Series:
+    """Valores numéricos (bool → 0/1, texto numérico → float); el resto NaN."""
+    return pd.to_numeric(s.astype(object), errors="coerce").astype("float64")
+
+
+def _canonica(s: pd.Series, num: pd.Series) -> pd.Series:
+    """Forma canónica para la huella de fila: float si toda la columna es numérica, si no texto."""
+    if (num.notna() | s.isna()).all():
+        return num
+    return s.astype(object).where(s.notna(), None).astype(str)
+
+
+def _diff_filas(ids: pd.Index, db: pd.DataFrame, tipo: str, campo: str = "",
+                valor_db: Any = None, valor_ccxt: Any = None) -> pd.DataFrame:
+    return pd.DataFrame({
+        "symbol_id": ids,
+        "symbol": db.loc[ids, "symbol"].values if len(ids) else [],
+        "campo": campo,
+        "tipo": tipo,
+        "valor_db": valor_db,
+        "valor_ccxt": valor_ccxt,
+    }, columns=COLUMNAS_DIFF)
+
+
+def validar_frames(db: pd.DataFrame, markets: Dict[str, Dict[str, Any]],
+                   tol: float = TOLERANCIA) -> pd.DataFrame:
     """
-    Compara todas las claves presentes en db_dict contra el market aplanado de CCXT.
-    Devuelve lista de errores (strings) o lista vacía si todo OK.
+    Compara el frame de DB (indexado por symbol_id) contra los markets CCXT.
+    Devuelve el diff estructurado (vacío si todo coincide).
+    tipo: sin_symbol | sin_market | ausente_en_ccxt | distinto
     """
-    flat_ccxt = flatten_json(ccxt_market)  # aplanado completo con prefijos
-    errs: List[str] = []
+    print(f"🔎 Validando {len(db)} símbolos en '{EXCHANGE_ID}' contra CCXT…")
+    if "symbol" not in db.columns:
+        db = db.assign(symbol=None)
+    diffs: List[pd.DataFrame] = []
 
-    # Recuperamos el symbol para mensajes
-    symbol = db_dict.get("symbol") or flat_ccxt.get("symbol") or "<?>"
+    sin_symbol = db["symbol"].isna() | (db["symbol"] == "")
+    con_market = ~sin_symbol & db["symbol"].isin(markets.keys())
+    diffs.append(_diff_filas(db.index[sin_symbol], db, "sin_symbol"))
+    sin_market = db.index[~sin_symbol & ~con_market]
+    diffs.append(_diff_filas(sin_market, db, "sin_market", valor_db=db.loc[sin_market, "symbol"].values))
 
-    for k_db, v_db in db_dict.items():
-        if k_db in {"exchange", "symbol", "symbol_id"}:
-            continue
-        # Ojo: algunas columnas pueden venir como None/NULL por normalización
-        v_ccxt = flat_ccxt.get(k_db, None)
-        if v_ccxt is None and v_db is None:
-            continue
-        if v_ccxt is None and v_db is not None:
-            errs.append(f"{sym_id} ({symbol}) → ⚠️ campo '{k_db}' no existe en CCXT (DB={v_db})")
-            continue
-        if not almost_equal(v_db, v_ccxt):
-            errs.append(f"{sym_id} ({symbol}) → ❌ '{k_db}': DB={v_db} vs CCXT={v_ccxt}")
-    return errs
+    campos = [c for c in db.columns if c not in COLUMNAS_NO_MARKET]
+    dbm = db[con_market]
+    exm = frame_exchange(dbm, markets, campos)
 
+    # Forma numérica de ambos lados, una vez por columna
+    num_db = {c: _a_float(dbm[c]) for c in campos}
+    num_ex = {c: _a_float(exm[c]) for c in campos}
 
-# ───────────────────────── Main ─────────────────────────
+    # Atajo: filas cuya huella canónica coincide son idénticas y no se comparan
+    if campos and len(dbm):
+        h_db = pd.util.hash_pandas_object(
+            pd.DataFrame({c: _canonica(dbm[c], num_db[c]) for c in campos}), index=False)
+        h_ex = pd.util.hash_pandas_object(
+            pd.DataFrame({c: _canonica(exm[c], num_ex[c]) for c in campos}), index=False)
+        pendientes = (h_db.values != h_ex.values)
+    else:
+        pendientes = np.zeros(len(dbm), dtype=bool)
 
-def main() -> None:
-    # 1) CCXT
-    try:
-        ex = getattr(ccxt, EXCHANGE_ID)(CCXT_OPTIONS)
-        ex.load_markets()
-    except Exception as e:
-        print(f"❌ No se pudo instanciar CCXT para '{EXCHANGE_ID}': {e}")
-        return
+    if pendientes.any():
+        d_all, e_all = dbm[pendientes], exm[pendientes]
+        for c in campos:
+            d, e = d_all[c], e_all[c]
+            fd, fe = num_db[c][pendientes], num_ex[c][pendientes]
+            nulo_db, nulo_ex = d.isna(), e.isna()
 
-    # 2) DB + tablas sym_*
-    conn = connect()
-    try:
-        tables = get_sym_tables(conn)
-        if not tables:
-            print("❌ No se encontraron tablas 'sym_*' en la base.")
-            return
-
-        per_symbol = read_tables_grouped_by_symbol(conn, tables)
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
-
-    total = len(per_symbol)
-    print(f"🔎 Validando {total} símbolos en '{EXCHANGE_ID}' contra CCXT…")
-    errors: List[str] = []
-
-    # 3) Comparación por símbolo
-    for i, (sym_id, db_dict) in enumerate(per_symbol.items(), 1):
-        symbol = db_dict.get("symbol")
-        if not symbol:
-            errors.append(f"{sym_id} → ⚠️ no tiene 'symbol' en DB")
-            continue
-        market = ex.markets.get(symbol)
-        if not market:
-            errors.append(f"{sym_id} → ❌ símbolo '{symbol}' no existe en CCXT")
-            continue
+            ausente = nulo_ex & ~nulo_db
+            numerico = fd.notna() & fe.notna()
+            ok = (nulo_db & nulo_ex) | (numerico & ((fd - fe).abs() <= tol))
+            texto = ~numerico & ~nulo_db & ~nulo_ex
+            if texto.any():
+                ok |= texto & (d.astype(str) == e.astype(str))
+            distinto = ~ok & ~ausente
+
+            for tipo, mascara in (("ausente_en_ccxt", ausente), ("distinto", distinto)):
+                if mascara.any():
+                    ids = d.index[mascara.values]
+                    diffs.append(_diff_filas(ids, dbm, tipo, c, d[mascara].values, e[mascara].values))
+
+    diffs = [x for x in diffs if len(x)]
+    if not diffs:
+        return pd.DataFrame(columns=COLUMNAS_DIFF)
+    return pd.concat(diffs, ignore_index=True)
+
+
+def mensajes(diff: pd.DataFrame) -> List[str]:
+    """Diff estructurado → líneas legibles (mismo formato que el validador fila a fila)."""
+    out: List[str] = []
+    for r in diff.itertuples(index=False):
+        if r.tipo == "sin_symbol":
+            out.append(f"{r.symbol_id} → ⚠️ no tiene 'symbol' en DB")
+        elif r.tipo == "sin_market":
+            out.append(f"{r.symbol_id} → ❌ símbolo '{r.symbol}' no existe en CCXT")
+        elif r.tipo == "ausente_en_ccxt":
+            out.append(f"{r.symbol_id} ({r.symbol}) → ⚠️ campo '{r.campo}' no existe en CCXT (DB={r.valor_db})")
+        else:
+            out.append(f"{r.symbol_id} ({r.symbol}) → ❌ '{r.campo}': DB={r.valor_db} vs CCXT={r.valor_ccxt}")
+    return out
+
+
+def validar_tablas(tablas: Dict[str, pd.DataFrame], markets: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """sym_* (de la DB o en memoria) → diff estructurado, con resumen por consola."""
+    t0 = time.perf_counter()
+    db = frame_por_simbolo(tablas)
+    diff = validar_frames(db, markets)
+    reportar(diff, len(db), time.perf_counter() - t0)
+    return diff
+
+
+def validar_persistidas(markets: Dict[str, Dict[str, Any]], tables: List[str]) -> pd.DataFrame:
+    """Relee de la DB las sym_* `tables` (ya escritas por el paso 2) y las valida contra CCXT."""
+    return validar_tablas(leer_tablas(motor(), tables), markets)
 
-        errors.extend(compare_symbol(sym_id, db_dict, market))
 
-        if i % 250 == 0:
-            print(f"→ Validados {i}/{total}…")
+def exportar_diff(diff: pd.DataFrame, path: Path = DIFF_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    diff.to_csv(path, index=False)
+    print(f"📄 Diff de validación exportado en {path}")
 
-    # 4) Resultado
-    if errors:
+
+def reportar(diff: pd.DataFrame, total: int, segundos: float = 0.0) -> None:
+    if len(diff):
         print("\n❌ Inconsistencias encontradas:")
-        for e in errors:
+        for e in mensajes(diff):
             print("-", e)
+        resumen = ", ".join(f"{t}={n}" for t, n in diff["tipo"].value_counts().items())
+        print(f"   ({resumen})")
     else:
         print(f"\n✔️ Todos los {total} símbolos coinciden con CCXT.")
 
-    print("\n🎯 Validación completa.")
+    print(f"\n🎯 Validación completa ({segundos * 1000:.0f} ms).")
+
+
+# ───────────────────────── Main ─────────────────────────
+
+def main() -> None:
+    # 1) CCXT (markets desde snapshot compartido)
+    try:
+        markets = cargar_markets(EXCHANGE_ID)
+    except Exception as e:
+        print(f"❌ No se pudo cargar markets para '{EXCHANGE_ID}': {e}")
+        return
+
+    # 2) DB + tablas sym_*
+    with conexion() as conn:
+        tables = get_sym_tables(conn)
+    if not tables:
+        print("❌ No se encontraron tablas 'sym_*' en la base.")
+        return
+
+    # 3) Comparación columnar + diff estructurado
+    diff = validar_persistidas(markets, tables)
+    exportar_diff(diff)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,26 @@
 # app/codigo/4_generar_tabla_unificada.py
+"""
+Genera `tabla_unica` uniendo las tablas sym_* según `schema_unificado`.
+
+Dos modos:
+  (default)     lee las tablas con pandas, une en memoria y vuelca con carga masiva
+  --servidor    todo en la DB: INSERT ... SELECT ... JOIN generado desde el schema,
+                y el CSV se exporta en streaming con cursor del lado del servidor
+                (el proceso nunca tiene la tabla entera en memoria).
+                También con TABLA_UNICA_SERVIDOR=1.
+"""
 import os
+import csv
+import argparse
 import pandas as pd
 import pymysql
-from sqlalchemy import create_engine
 from functools import reduce
-from config.db import connect
+from config.db import conexion, motor
+from config.carga import cargar_frame
+from config.ddl import (
+    INDICES, INDICES_CRITERIOS, VARCHAR_MAX, adaptar_frame, generar_ddl, indices_para, tipos_columnas,
+)
+from config.swap import reconstruir
 from config.config import STATIC_DIR, DATOS_DIR
 import importlib.util
 
@@ -16,58 +32,148 @@ spec.loader.exec_module(ref_module)
 schema_unificado = getattr(ref_module, "schema_unificado")
 
 TABLA_DESTINO = "tabla_unica"
+CLAVES_UNION = ["symbol_id", "symbol"]
+LOTE_CSV = 5000
+
+def unificar(tablas: dict) -> pd.DataFrame:
+    """Selecciona las columnas de `schema_unificado` de cada tabla y las une por símbolo."""
+    dataframes = [tablas[tabla][columnas] for tabla, columnas in schema_unificado.items()]
+    return reduce(lambda left, right: pd.merge(left, right, on=["symbol_id", "symbol"]), dataframes)
+
+
+def leer_tablas_origen(engine) -> dict:
+    tablas = {}
+    for tabla, columnas in schema_unificado.items():
+        query = f"SELECT {', '.join(f'`{c}`' for c in columnas)} FROM `{tabla}`"
+        # nullable: TINYINT con NULL sigue entero (1/0), no pasa a float (1.0)
+        tablas[tabla] = pd.read_sql(query, engine, dtype_backend="numpy_nullable")
+    return tablas
+
+
+def guardar_tabla_unica(df_final: pd.DataFrame) -> None:
+    # DDL tipado desde schema_funcional (+ índices quote / base+quote y los del pushdown del paso 5)
+    tipos = tipos_columnas()
+
+    # Se llena una tabla sombra y se publica con RENAME atómico (la anterior queda para rollback)
+    with conexion() as conn, reconstruir(conn, TABLA_DESTINO) as destino:
+        create_stmt, indices = generar_ddl(destino, df_final, tipos, indices=INDICES + INDICES_CRITERIOS)
+        with conn.cursor() as cursor:
+            cursor.execute(create_stmt)
+            for sql in indices:
+                cursor.execute(sql)
+
+        metodo = cargar_frame(conn, destino, adaptar_frame(df_final, tipos))
+
+    print(f"✅ Tabla `{TABLA_DESTINO}` creada en DB con {len(df_final)} registros ({metodo}).")
+
+
+def exportar_csv(df_final: pd.DataFrame) -> None:
+    output_dir = DATOS_DIR / "tratamiento_de_tablas"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = output_dir / f"{TABLA_DESTINO}.csv"
+    df_final.to_csv(csv_path, index=False)
+    print(f"📄 CSV exportado en {csv_path}")
+
 
 def generar_tabla_unificada():
-    from config.db import get_db_config
+    # Engine del pool compartido (el mismo que usan las escrituras)
+    df_final = unificar(leer_tablas_origen(motor()))
+    guardar_tabla_unica(df_final)
+    exportar_csv(df_final)
 
-    db_conf = get_db_config()
-    pw_escaped = (db_conf['password'] or "").replace("@", "%40")  # escapamos @
-    engine = create_engine(
-        f"mysql+pymysql://{db_conf['user']}:{pw_escaped}@{db_conf['host']}/{db_conf['database']}"
-    )
-    conn = connect()
 
+# ─────────── Modo servidor (join dentro de la DB) ───────────
 
-    dataframes = []
+def columnas_unificadas() -> list[tuple[str, str]]:
+    """(tabla, columna) en el mismo orden que produce `unificar` (claves una sola vez)."""
+    salida, vistas = [], set()
     for tabla, columnas in schema_unificado.items():
-        query = f"SELECT {', '.join(f'`{c}`' for c in columnas)} FROM `{tabla}`"
-        df = pd.read_sql(query, engine)
-        dataframes.append(df)
+        for col in columnas:
+            if col not in vistas:
+                salida.append((tabla, col))
+                vistas.add(col)
+    return salida
 
-    df_final = reduce(lambda left, right: pd.merge(left, right, on=["symbol_id", "symbol"]), dataframes)
 
-    # Drop tabla previa si existe
+def sql_select_unificado() -> str:
+    """SELECT ... JOIN equivalente al merge interno por (symbol_id, symbol)."""
+    tablas = list(schema_unificado)
+    alias = {t: f"t{i}" for i, t in enumerate(tablas)}
+    cols = ", ".join(f"{alias[t]}.`{c}`" for t, c in columnas_unificadas())
+    joins = "".join(
+        f" JOIN `{t}` {alias[t]} ON "
+        + " AND ".join(f"{alias[t]}.`{k}` = t0.`{k}`" for k in CLAVES_UNION)
+        for t in tablas[1:]
+    )
+    return f"SELECT {cols} FROM `{tablas[0]}` t0{joins}"
+
+
+def _tipos_origen(conn, tabla: str) -> dict[str, str]:
     with conn.cursor() as cursor:
-        cursor.execute(f"DROP TABLE IF EXISTS `{TABLA_DESTINO}`;")
-
-        cols_sql = ",\n    ".join([
-            f"`{col}` VARCHAR(255)" if col in ['symbol_id','symbol','base','quote','type'] else f"`{col}` TEXT"
-            for col in df_final.columns
-        ])
-        create_stmt = f"""
-            CREATE TABLE `{TABLA_DESTINO}` (
-                {cols_sql},
-                PRIMARY KEY (`symbol_id`)
-            ) CHARACTER SET utf8mb4;
-        """
-        cursor.execute(create_stmt)
-
-        insert_sql = f"INSERT INTO `{TABLA_DESTINO}` ({', '.join(f'`{c}`' for c in df_final.columns)}) VALUES ({', '.join(['%s'] * len(df_final.columns))});"
-        for _, row in df_final.iterrows():
-            cursor.execute(insert_sql, row.tolist())
-
-        conn.commit()
-
-    # Export CSV
+        cursor.execute(f"SHOW COLUMNS FROM `{tabla}`")
+        return {r["Field"]: r["Type"] for r in cursor.fetchall()}
+
+
+def guardar_tabla_unica_en_servidor() -> int:
+    """Crea `tabla_unica` con INSERT ... SELECT (tipos copiados de las sym_* de origen)."""
+    with conexion() as conn, reconstruir(conn, TABLA_DESTINO) as destino:
+        origen = {t: _tipos_origen(conn, t) for t in schema_unificado}
+        tipos_sql = {c: origen[t][c] for t, c in columnas_unificadas()}
+        # Las sym_* persistentes guardan los str no clave en TEXT; los filtrados por el paso 5
+        # pasan a VARCHAR para poder indexarlos (valores cortos: type, info_status, …)
+        for idx in INDICES_CRITERIOS:
+            for c in idx:
+                if tipos_sql.get(c, "").lower() == "text":
+                    tipos_sql[c] = f"VARCHAR({VARCHAR_MAX})"
+        defs = [f"`{c}` {tipo}" for c, tipo in tipos_sql.items()] + ["PRIMARY KEY (`symbol_id`)"]
+
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE `{destino}` (\n    " + ",\n    ".join(defs) + "\n) CHARACTER SET utf8mb4;"
+            )
+            for sql in indices_para(destino, tipos_sql, INDICES + INDICES_CRITERIOS):
+                cursor.execute(sql)
+            cursor.execute(
+                f"INSERT INTO `{destino}` ({', '.join(f'`{c}`' for c in tipos_sql)}) {sql_select_unificado()}"
+            )
+            filas = cursor.rowcount
+
+    print(f"✅ Tabla `{TABLA_DESTINO}` creada en servidor con {filas} registros (INSERT ... SELECT).")
+    return filas
+
+
+def exportar_csv_streaming(lote: int = LOTE_CSV) -> None:
+    """CSV de `tabla_unica` leído por lotes con cursor del lado del servidor (SSCursor)."""
     output_dir = DATOS_DIR / "tratamiento_de_tablas"
     output_dir.mkdir(parents=True, exist_ok=True)
     csv_path = output_dir / f"{TABLA_DESTINO}.csv"
-    df_final.to_csv(csv_path, index=False)
 
-    print(f"✅ Tabla `{TABLA_DESTINO}` creada en DB con {len(df_final)} registros.")
-    print(f"📄 CSV exportado en {csv_path}")
+    with conexion() as conn, conn.cursor(pymysql.cursors.SSCursor) as cursor, \
+            open(csv_path, "w", newline="", encoding="utf-8") as f:
+        cursor.execute(f"SELECT * FROM `{TABLA_DESTINO}`")
+        writer = csv.writer(f)
+        writer.writerow([d[0] for d in cursor.description])
+        while True:
+            filas = cursor.fetchmany(lote)
+            if not filas:
+                break
+            writer.writerows(filas)
+    print(f"📄 CSV exportado en {csv_path} (streaming)")
+
+
+def generar_tabla_unificada_en_servidor():
+    guardar_tabla_unica_en_servidor()
+    exportar_csv_streaming()
 
-    conn.close()
 
 if __name__ == "__main__":
-    generar_tabla_unificada()
+    parser = argparse.ArgumentParser(description="Genera tabla_unica desde las tablas sym_*")
+    parser.add_argument("--servidor", action="store_true",
+                        default=os.getenv("TABLA_UNICA_SERVIDOR", "0") == "1",
+                        help="join e INSERT ... SELECT dentro de la DB; CSV en streaming")
+    args = parser.parse_args()
+
+    if args.servidor:
+        generar_tabla_unificada_en_servidor()
+    else:
+        generar_tabla_unificada()
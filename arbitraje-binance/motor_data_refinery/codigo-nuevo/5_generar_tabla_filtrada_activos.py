@@ -8,11 +8,20 @@ Genera tabla funcional a partir de tabla_unica.csv según reglas declaradas.
   - descartados_<OUTPUT>.csv (con motivo_descartado)
   - Tablas en DB: funcional_<OUTPUT>, descartados_<OUTPUT>
 en app/codigo/datos/tratamiento_de_tablas/
+
+Con --pushdown (o CRITERIOS_PUSHDOWN=1) el universo se lee de la tabla
+`tabla_unica` con los criterios traducibles ya aplicados en el WHERE; en
+Python solo se evalúan los residuales (NOT_FIAT). --sin-descartados evita
+traer las filas rechazadas por la DB.
 """
 
+import os
 import sys
+import argparse
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import pymysql
 
 # ─────────── Fix path para que 'codigo' sea importable ───────────
 APP_DIR = Path(__file__).resolve().parents[1]  # /app
@@ -21,29 +30,19 @@ sys.path.insert(0, str(APP_DIR))
 # Config centralizada
 from codigo.config import DATOS_DIR
 from codigo.static.fiat import fiat_tokens   # lista global de FIAT
-from codigo.config.db import connect         # función para conectar DB
+from codigo.config.db import conexion        # conexiones del pool compartido
+from codigo.config.carga import cargar_frame  # LOAD DATA / INSERT por lotes
+from codigo.config.ddl import adaptar_frame, generar_ddl, tipos_columnas  # DDL tipado
+from codigo.config.swap import reconstruir   # publicación con RENAME atómico
+from codigo.config.criterios import (         # máscaras por columna + motivos por bits
+    COLUMNA_BITS, normalizar_valor, compilar, compilar_sql, evaluar, separar, con_motivo_texto,
+)
 
 # ─────────── Rutas de entrada / salida ───────────
 TRATAMIENTO_DIR = DATOS_DIR / "tratamiento_de_tablas"
 INPUT_PATH = TRATAMIENTO_DIR / "tabla_unica.csv"
 CRITERIOS_PATH = APP_DIR / "codigo" / "static" / "criterios_filtrados.csv"
-
-
-# ─────────── Helpers ───────────
-
-def _normalizar_valor(valor: str) -> str:
-    """
-    Normaliza valores para comparar contra criterios.
-    - True equivalentes: "true", "1", "yes"
-    - False equivalentes: "false", "0", "no"
-    - Todo lo demás: upper
-    """
-    v = str(valor).strip().lower()
-    if v in {"true", "1", "yes"}:
-        return "TRUE"
-    if v in {"false", "0", "no"}:
-        return "FALSE"
-    return v.upper()
+TABLA_ORIGEN = "tabla_unica"
 
 
 # ─────────── Funciones principales ───────────
@@ -77,45 +76,73 @@ def cargar_criterios() -> tuple[dict[str, set[str]], str]:
             output_name = permitidos
             continue
         if permitidos:
-            criterios[campo] = {_normalizar_valor(v) for v in permitidos.split(";")}
+            criterios[campo] = {normalizar_valor(v) for v in permitidos.split(";")}
     return criterios, output_name
 
 
 def aplicar_criterios(df: pd.DataFrame, criterios: dict[str, set[str]]) -> tuple[pd.DataFrame, pd.DataFrame]:
-    """Filtra df según criterios declarativos; devuelve (funcional, descartados)."""
-    funcional = []
-    descartados = []
+    """
+    Filtra df según criterios declarativos; devuelve (funcional, descartados).
+    Descartados lleva `motivo_bits` (bit i = criterio i); el texto se arma al exportar.
+    """
+    bits = evaluar(df, compilar(criterios), fiat_tokens)
+    return separar(df, bits)
 
-    fiat_norm = {t.upper() for t in fiat_tokens}
 
-    for _, row in df.iterrows():
-        valido = True
-        motivo = []
+# ─────────── Pushdown a la DB ───────────
 
-        for campo, permitidos in criterios.items():
-            if campo not in row:
-                continue
+def _tipos_tabla(conn, tabla: str) -> dict[str, str]:
+    with conn.cursor() as cursor:
+        cursor.execute(f"SHOW COLUMNS FROM `{tabla}`")
+        return {r["Field"]: str(r["Type"]) for r in cursor.fetchall()}
 
-            valor = _normalizar_valor(row[campo])
 
-            # Caso especial: NOT_FIAT
-            if "NOT_FIAT" in permitidos:
-                if valor in fiat_norm:
-                    valido = False
-                    motivo.append(f"{campo}=FIAT")
-            else:
-                if valor not in permitidos:
-                    valido = False
-                    motivo.append(f"{campo}='{valor}' no permitido")
+def _leer(conn, sql: str, args: list) -> pd.DataFrame:
+    with conn.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute(sql, args)
+        columnas = [d[0] for d in cursor.description]
+        return pd.DataFrame(list(cursor.fetchall()), columns=columnas)
 
-        if valido:
-            funcional.append(row)
-        else:
-            row_copy = row.copy()
-            row_copy["motivo_descartado"] = "; ".join(motivo)
-            descartados.append(row_copy)
 
-    return pd.DataFrame(funcional), pd.DataFrame(descartados)
+def _con_booleanos(df: pd.DataFrame, tipos: dict[str, str]) -> pd.DataFrame:
+    """TINYINT(1) → boolean (los CSV siguen saliendo con True/False)."""
+    for col, tipo in tipos.items():
+        if col in df.columns and tipo.lower().startswith("tinyint(1)"):
+            df[col] = df[col].astype("boolean")
+    return df
+
+
+def aplicar_criterios_en_db(criterios: dict[str, set[str]],
+                            descartados: bool = True) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Igual que aplicar_criterios, pero los criterios traducibles se evalúan en el
+    WHERE de la consulta sobre `tabla_unica`. Con descartados=False solo se leen
+    las filas que pasan el WHERE (los descartados quedan solo con los residuales).
+    """
+    compilados = compilar(criterios)
+    with conexion() as conn:
+        tipos = _tipos_tabla(conn, TABLA_ORIGEN)
+        filtro = compilar_sql(compilados, tipos)
+        candidatos = _leer(conn, f"SELECT * FROM `{TABLA_ORIGEN}` WHERE {filtro.where}", filtro.args)
+        rechazados = None
+        if descartados:
+            rechazados = _leer(
+                conn,
+                f"SELECT t.*, ({filtro.bits_sql}) AS `{COLUMNA_BITS}` "
+                f"FROM `{TABLA_ORIGEN}` t WHERE {filtro.where_rechazo}",
+                filtro.bits_args + filtro.args,
+            )
+    print(f"🧮 Pushdown: {len(filtro.en_sql)} criterios en SQL, {len(filtro.residuales)} en Python "
+          f"({len(candidatos)} candidatos leídos)")
+
+    candidatos = _con_booleanos(candidatos, tipos)
+    df_funcional, df_descartados = separar(candidatos, evaluar(candidatos, filtro.residuales, fiat_tokens))
+    if rechazados is not None and len(rechazados):
+        rechazados = _con_booleanos(rechazados, tipos)
+        bits = rechazados[COLUMNA_BITS].to_numpy(dtype=np.int64)
+        rechazados[COLUMNA_BITS] = bits | evaluar(rechazados, filtro.residuales, fiat_tokens)
+        df_descartados = pd.concat([df_descartados, rechazados], ignore_index=True)
+    return df_funcional, df_descartados
 
 
 def guardar_resultados_csv(df_funcional: pd.DataFrame, df_descartados: pd.DataFrame,
@@ -123,6 +150,7 @@ def guardar_resultados_csv(df_funcional: pd.DataFrame, df_descartados: pd.DataFr
     """Guarda los dos DataFrames en CSV en la carpeta de tratamiento_de_tablas.
        Elimina columnas irrelevantes (ej. swap/future/option=FALSE)."""
     TRATAMIENTO_DIR.mkdir(parents=True, exist_ok=True)
+    df_descartados = con_motivo_texto(df_descartados, compilar(criterios))
 
     # Columnas que pediste siempre en FALSE → eliminamos
     columnas_a_quitar = [campo for campo, vals in criterios.items() if vals == {"FALSE"}]
@@ -142,60 +170,56 @@ def guardar_resultados_csv(df_funcional: pd.DataFrame, df_descartados: pd.DataFr
     print(f"   📄 {out_descartados}")
 
 
-def guardar_en_db(df: pd.DataFrame, table_name: str, criterios: dict[str, set[str]]) -> None:
+def guardar_en_db(df: pd.DataFrame, table_name: str, criterios: dict[str, set[str]], conn=None) -> None:
     """Crea/llena tabla en la DB con los resultados filtrados."""
     if df.empty:
         print(f"⚠️ No hay datos para {table_name}, se omite creación.")
         return
 
+    if conn is None:
+        with conexion() as propia:
+            return guardar_en_db(df, table_name, criterios, propia)
+
+    df = con_motivo_texto(df, compilar(criterios))
+
     # Columnas irrelevantes (FALSE) no se guardan
     columnas_a_quitar = [campo for campo, vals in criterios.items() if vals == {"FALSE"}]
     df = df.drop(columns=[c for c in columnas_a_quitar if c in df.columns])
 
-    # Reemplazar NaN por None (→ NULL en SQL)
-    df = df.where(pd.notnull(df), None)
+    # Tipos declarados en schema_funcional; NaN → None (→ NULL en SQL)
+    tipos = tipos_columnas()
+    df = adaptar_frame(df, tipos)
 
     cols = df.columns.tolist()
-
-    # Definir tipos: claves identificadoras en VARCHAR, resto en TEXT
-    col_defs = []
-    for c in cols:
-        if c in {"symbol_id", "symbol", "base", "quote"}:
-            col_defs.append(f"`{c}` VARCHAR(255)")
-        else:
-            col_defs.append(f"`{c}` TEXT")
-
     pk = "symbol_id" if "symbol_id" in cols else cols[0]
 
-    create_sql = f"""
-        CREATE TABLE `{table_name}` (
-            {", ".join(col_defs)},
-            PRIMARY KEY (`{pk}`)
-        ) CHARACTER SET utf8mb4;
-    """
-
-    insert_sql = f"""
-        INSERT INTO `{table_name}` ({", ".join(f"`{c}`" for c in cols)})
-        VALUES ({", ".join(['%s']*len(cols))});
-    """
-
-    conn = connect()
-    try:
+    # Tabla sombra + RENAME atómico: los lectores nunca ven la tabla a medio llenar
+    with reconstruir(conn, table_name) as destino:
+        create_sql, indices = generar_ddl(destino, df, tipos, pk=pk)
         with conn.cursor() as cursor:
-            cursor.execute(f"DROP TABLE IF EXISTS `{table_name}`;")
             cursor.execute(create_sql)
-            cursor.executemany(insert_sql, df.values.tolist())
-        conn.commit()
-        print(f"✅ Datos guardados en DB: `{table_name}` ({len(df)} filas).")
-    finally:
-        conn.close()
+            for sql in indices:
+                cursor.execute(sql)
+        metodo = cargar_frame(conn, destino, df)
+    conn.commit()
+    print(f"✅ Datos guardados en DB: `{table_name}` ({len(df)} filas, {metodo}).")
+
+
+def guardar_resultados_db(df_funcional: pd.DataFrame, df_descartados: pd.DataFrame,
+                          criterios: dict[str, set[str]], output_name: str) -> None:
+    """Ambas tablas con una sola conexión del pool."""
+    with conexion() as conn:
+        guardar_en_db(df_funcional, f"funcional_{output_name}", criterios, conn)
+        guardar_en_db(df_descartados, f"descartados_{output_name}", criterios, conn)
 
 
-def generar_tabla_funcional():
-    df = cargar_tabla_unica()
+def generar_tabla_funcional(pushdown: bool = False, descartados: bool = True):
     criterios, output_name = cargar_criterios()
 
-    df_funcional, df_descartados = aplicar_criterios(df, criterios)
+    if pushdown:
+        df_funcional, df_descartados = aplicar_criterios_en_db(criterios, descartados)
+    else:
+        df_funcional, df_descartados = aplicar_criterios(cargar_tabla_unica(), criterios)
 
     print(f"🔎 Funcionales: {len(df_funcional)} | Descartados: {len(df_descartados)}")
 
@@ -203,11 +227,18 @@ def generar_tabla_funcional():
     guardar_resultados_csv(df_funcional, df_descartados, criterios, output_name)
 
     # Guardar en DB
-    guardar_en_db(df_funcional, f"funcional_{output_name}", criterios)
-    guardar_en_db(df_descartados, f"descartados_{output_name}", criterios)
+    guardar_resultados_db(df_funcional, df_descartados, criterios, output_name)
 
 
 # ─────────── Main ───────────
 
 if __name__ == "__main__":
-    generar_tabla_funcional()
+    parser = argparse.ArgumentParser(description="Genera funcional_/descartados_ según criterios_filtrados.csv")
+    parser.add_argument("--pushdown", action="store_true",
+                        default=os.getenv("CRITERIOS_PUSHDOWN", "0") == "1",
+                        help="filtra en la DB (WHERE sobre tabla_unica) en vez de leer tabla_unica.csv")
+    parser.add_argument("--sin-descartados", action="store_true",
+                        help="con --pushdown, no trae las filas rechazadas por la DB")
+    args = parser.parse_args()
+
+    generar_tabla_funcional(pushdown=args.pushdown, descartados=not args.sin_descartados)
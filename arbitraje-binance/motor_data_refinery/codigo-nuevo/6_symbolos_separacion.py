@@ -8,7 +8,7 @@ Separa símbolos de la tabla funcional en:
 Entrada:
     - Usa config_separador.csv para saber tabla origen e interesado_en
 Salida:
-    - CSVs en codigo/datos/tratamiento_de_cotizacion/
+    - Artefactos en codigo/datos/tratamiento_de_cotizacion/ (Parquet + CSV, config/artefactos.py)
 """
 
 import sys, os
@@ -20,7 +20,8 @@ import pymysql
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT_DIR))
 
-from codigo.config import connect, DATOS_DIR
+from codigo.config import conexion, DATOS_DIR
+from codigo.config.artefactos import guardar_artefacto
 
 # --- Configuración ---
 CONFIG_FILE = Path(__file__).resolve().parent / "static" / "config_separador.csv"
@@ -37,24 +38,9 @@ def cargar_config():
         "interesado_en": df_cfg.loc[0, "interesado_en"].upper().strip()
     }
 
-def main():
-    cfg = cargar_config()
-    tabla_origen = cfg["tabla"]
-    interesado_en = cfg["interesado_en"]
-
-    # Conexión DB
-    conn = connect()
-    with conn.cursor() as cursor:
-        cursor.execute("SHOW TABLES LIKE %s", (tabla_origen,))
-        if cursor.fetchone() is None:
-            raise RuntimeError(f"❌ La tabla origen `{tabla_origen}` no existe en la DB.")
-        cursor.execute(f"SELECT symbol, base, quote FROM `{tabla_origen}`")
-        rows = cursor.fetchall()
-    conn.close()
-
-    df = pd.DataFrame(rows)
-    if df.empty:
-        raise RuntimeError(f"⚠️ La tabla `{tabla_origen}` no tiene datos.")
+def separar(df: pd.DataFrame, interesado_en: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Devuelve (directo, invertido, indirecto) según `interesado_en`."""
+    df = df[["symbol", "base", "quote"]].copy()
 
     # Normalizar
     for col in ("symbol", "base", "quote"):
@@ -64,19 +50,38 @@ def main():
     directo   = df[df["quote"] == interesado_en]
     invertido = df[df["base"]  == interesado_en]
     indirecto = df[(df["base"] != interesado_en) & (df["quote"] != interesado_en)]
+    return directo, invertido, indirecto
 
-    # --- Exportar ---
+def exportar(directo: pd.DataFrame, invertido: pd.DataFrame, indirecto: pd.DataFrame, interesado_en: str) -> None:
     output_dir = DATOS_DIR / "tratamiento_de_cotizacion"
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    directo.to_csv(  output_dir / f"cotizador_directo_{interesado_en}.csv",   index=False)
-    invertido.to_csv(output_dir / f"cotizador_invertido_{interesado_en}.csv", index=False)
-    indirecto.to_csv(output_dir / f"cotizador_indirecto_{interesado_en}.csv", index=False)
+    guardar_artefacto(directo,   output_dir / f"cotizador_directo_{interesado_en}.csv",   "cotizador")
+    guardar_artefacto(invertido, output_dir / f"cotizador_invertido_{interesado_en}.csv", "cotizador")
+    guardar_artefacto(indirecto, output_dir / f"cotizador_indirecto_{interesado_en}.csv", "cotizador")
 
     print(f"✅ Exportados en {output_dir}")
     print(f"✔ cotizador_directo_{interesado_en}.csv:   {len(directo)} símbolos")
     print(f"✔ cotizador_invertido_{interesado_en}.csv: {len(invertido)} símbolos")
     print(f"✔ cotizador_indirecto_{interesado_en}.csv: {len(indirecto)} símbolos")
 
+def main():
+    cfg = cargar_config()
+    tabla_origen = cfg["tabla"]
+    interesado_en = cfg["interesado_en"]
+
+    # Conexión DB
+    with conexion() as conn, conn.cursor() as cursor:
+        cursor.execute("SHOW TABLES LIKE %s", (tabla_origen,))
+        if cursor.fetchone() is None:
+            raise RuntimeError(f"❌ La tabla origen `{tabla_origen}` no existe en la DB.")
+        cursor.execute(f"SELECT symbol, base, quote FROM `{tabla_origen}`")
+        rows = cursor.fetchall()
+
+    df = pd.DataFrame(rows)
+    if df.empty:
+        raise RuntimeError(f"⚠️ La tabla `{tabla_origen}` no tiene datos.")
+
+    # Separar + exportar
+    exportar(*separar(df, interesado_en), interesado_en)
+
 if __name__ == "__main__":
     main()
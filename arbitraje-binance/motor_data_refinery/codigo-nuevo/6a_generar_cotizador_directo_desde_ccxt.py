@@ -1,6 +1,6 @@
 """
 Genera `codigo/datos/tratamiento_de_cotizacion/cotizador_directo_<QUOTE>.csv`
-directamente desde CCXT (sin DB), para alimentar 7_generar_cotizaciones_directas.
+directamente desde los markets de CCXT (snapshot compartido, sin DB), para alimentar 7_generar_cotizaciones_directas.
 
 Lee `static/config_cotizacion_directa.csv` para conocer el QUOTE objetivo.
 """
@@ -10,12 +10,11 @@ from __future__ import annotations
 from pathlib import Path
 import sys
 import pandas as pd
-import ccxt
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT_DIR))
 
-from codigo.config import DATOS_DIR, EXCHANGE_ID, CCXT_OPTIONS  # type: ignore
+from codigo.config import DATOS_DIR, EXCHANGE_ID, cargar_markets  # type: ignore
 
 CONFIG_FILE = ROOT_DIR / "codigo" / "static" / "config_cotizacion_directa.csv"
 
@@ -36,13 +35,11 @@ def main() -> None:
     cfg = cargar_config()
     quote_target = cfg["interesado_en"]
 
-    # Cargar symbols desde el exchange configurado
-    ex_class = getattr(ccxt, EXCHANGE_ID)
-    ex = ex_class(CCXT_OPTIONS)
-    ex.load_markets()
+    # Cargar symbols desde el snapshot del exchange configurado
+    markets = cargar_markets(EXCHANGE_ID)
 
     rows = []
-    for symbol, m in ex.markets.items():
+    for symbol, m in markets.items():
         base = m.get("base")
         quote = m.get("quote")
         if not base or not quote:
@@ -0,0 +1,156 @@
+# codigo/6b_valuacion_grafo.py
+"""
+Valuación en USDT por grafo de monedas: reemplaza la cadena 6 → 7 → 8/8a → 9 →
+10/11 → 12 con un solo cálculo en memoria (config/grafo.py).
+
+Entradas:
+    - funcional_<OUTPUT>.csv (paso 5): pares directos (QUOTE == ref) e invertidos (BASE == ref)
+    - markets del snapshot + una foto masiva de precios (config.tickers)
+    - static/config_cotizacion_directa.csv → moneda de referencia (interesado_en)
+Salida (mismas rutas y columnas que el paso 12, más `saltos` y `ruta`):
+    - datos/<exchange>/previo_a_cotizar/cotizaciones_usdt_unificadas.csv
+    - modulo_absorcion/cotizaciones_equivalentes_1_usdt.csv
+
+`cotizacion`:
+    directo              QUOTE == ref
+    invertido            BASE == ref
+    indirecto_por_quote  el QUOTE tiene par con la referencia, o se valúa por otro camino más corto
+    indirecto_por_base   el QUOTE se valúa a través de este mismo par (unidades de BASE × precio),
+                         cuando ese camino es tan corto como el mejor del QUOTE (como el paso 11)
+Con el grafo, los QUOTE a más de un salto de la referencia también se valúan.
+"""
+
+from __future__ import annotations
+
+import sys
+from decimal import localcontext
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from codigo.config import ABSORCION_DIR, DATOS_DIR, EXCHANGE_ID, exchange_con_markets, obtener_precios  # type: ignore
+from codigo.config.artefactos import guardar_artefacto  # type: ignore
+from codigo.config.grafo import PRECISION, SEPARADOR_RUTA, a_decimal, aristas, valuar  # type: ignore
+
+CONFIG_FILE = ROOT_DIR / "codigo" / "static" / "config_cotizacion_directa.csv"
+CONFIG_SEPARADOR = ROOT_DIR / "codigo" / "static" / "config_separador.csv"
+
+COLUMNAS_SALIDA = ["symbol", "base", "quote", "1_dolar_equivale_a_quote", "cotizacion", "saltos", "ruta"]
+path_salida = DATOS_DIR / EXCHANGE_ID / "previo_a_cotizar" / "cotizaciones_usdt_unificadas.csv"
+archivo_absorcion = ABSORCION_DIR / "cotizaciones_equivalentes_1_usdt.csv"
+
+
+def cargar_config() -> dict:
+    """{interesado_en, tabla_funcional}"""
+    for f in (CONFIG_FILE, CONFIG_SEPARADOR):
+        if not f.exists():
+            raise FileNotFoundError(f"❌ No se encontró {f}")
+    return {
+        "interesado_en": pd.read_csv(CONFIG_FILE).loc[0, "interesado_en"].upper().strip(),
+        "tabla_funcional": pd.read_csv(CONFIG_SEPARADOR).loc[0, "tabla_a_separar"],
+    }
+
+
+def _normalizar(df: pd.DataFrame) -> pd.DataFrame:
+    df = df[["symbol", "base", "quote"]].copy()
+    for col in ("symbol", "base", "quote"):
+        df[col] = df[col].astype(str).str.strip().str.upper()
+    return df
+
+
+def construir_pares(funcional: pd.DataFrame, markets: dict, referencia: str) -> pd.DataFrame:
+    """
+    Universo de pares: los de la referencia salen de la tabla funcional (como el
+    cotizador directo del paso 6); el resto, de todos los markets (como el paso 8a).
+    """
+    func = _normalizar(funcional)
+    con_ref = func[(func["quote"] == referencia) | (func["base"] == referencia)].assign(preferencia=0)
+
+    otros = pd.DataFrame(
+        [(s, (m.get("base") or "").upper(), (m.get("quote") or "").upper()) for s, m in markets.items()],
+        columns=["symbol", "base", "quote"],
+    )
+    otros = otros[(otros["base"] != "") & (otros["quote"] != "")
+                  & (otros["base"] != referencia) & (otros["quote"] != referencia)].assign(preferencia=1)
+
+    return pd.concat([con_ref, otros], ignore_index=True).drop_duplicates("symbol")
+
+
+def valuar_pares(funcional: pd.DataFrame, exchange) -> pd.DataFrame:
+    """funcional + exchange → cotizaciones unificadas (mismo producto que el paso 12)."""
+    referencia = cargar_config()["interesado_en"]
+    pares = construir_pares(funcional, exchange.markets, referencia)
+
+    # Una sola foto de precios para todo el universo
+    precios = obtener_precios(exchange, pares["symbol"].tolist())
+    pares["precio"] = pares["symbol"].map(precios["last"]) if len(precios) else None
+
+    valuados = valuar(aristas(pares), referencia)
+
+    # El directo sigue exigiendo precio propio (como el paso 7)
+    directos = pares["quote"] == referencia
+    pares = pares[~directos | pares["precio"].notna()]
+
+    out = pares.join(valuados, on="quote", how="inner")
+    sin_valor = len(pares) - len(out)
+
+    # Por base: el QUOTE no cotiza contra la referencia y la BASE sí llega
+    # en un camino igual de corto → se valúa desde este mismo par
+    base = out[["base"]].join(valuados.add_suffix("_base"), on="base")
+    precio = out["precio"].map(a_decimal)
+    por_base = ((out["saltos"] > 1) & precio.notna() & base["saltos_base"].notna()
+                & (base["saltos_base"] + 1 <= out["saltos"]))
+    if por_base.any():
+        b = base[por_base]
+        with localcontext() as ctx:
+            ctx.prec = PRECISION
+            out.loc[por_base, "unidades"] = pd.Series(
+                [u * p for u, p in zip(b["unidades_base"], precio[por_base])], index=b.index, dtype=object,
+            )
+        out.loc[por_base, "saltos"] = b["saltos_base"].astype(int) + 1
+        out.loc[por_base, "ruta"] = b["ruta_base"].where(b["ruta_base"] == "", b["ruta_base"] + SEPARADOR_RUTA) \
+            + out.loc[por_base, "symbol"]
+        out.loc[por_base, "via"] = out.loc[por_base, "symbol"]
+
+    out["cotizacion"] = "indirecto_por_quote"
+    out.loc[out["via"] == out["symbol"], "cotizacion"] = "indirecto_por_base"
+    out.loc[out["base"] == referencia, "cotizacion"] = "invertido"
+    out.loc[out["quote"] == referencia, "cotizacion"] = "directo"
+    out["1_dolar_equivale_a_quote"] = [
+        "1" if s == 0 else f"{u:.18f}" for u, s in zip(out["unidades"], out["saltos"])
+    ]
+
+    orden = {"directo": 0, "invertido": 1, "indirecto_por_quote": 2, "indirecto_por_base": 3}
+    out = out.sort_values(["cotizacion", "symbol"], key=lambda c: c.map(orden) if c.name == "cotizacion" else c)
+
+    print(f"🕸️ Grafo: {len(valuados)} activos valuados desde {referencia} "
+          f"(máx. {int(valuados['saltos'].max())} saltos); {len(out)} pares cotizados, {sin_valor} sin camino")
+    return out[COLUMNAS_SALIDA].reset_index(drop=True)
+
+
+def guardar(df_total: pd.DataFrame) -> None:
+    guardar_artefacto(df_total, path_salida, "grafo")
+    guardar_artefacto(df_total, archivo_absorcion, "grafo")
+
+    print("✅ Archivo principal generado:")
+    print(f"📄 {path_salida}")
+    print("✅ Copia generada para módulo de absorción:")
+    print(f"📁 {archivo_absorcion}")
+
+
+def main() -> None:
+    cfg = cargar_config()
+    input_path = DATOS_DIR / "tratamiento_de_tablas" / f"{cfg['tabla_funcional']}.csv"
+    if not input_path.exists():
+        raise FileNotFoundError(f"❌ No existe el archivo de entrada: {input_path} (correr paso 5)")
+
+    funcional = pd.read_csv(input_path, dtype=str)
+    exchange = exchange_con_markets(EXCHANGE_ID)
+    guardar(valuar_pares(funcional, exchange))
+
+
+if __name__ == "__main__":
+    main()
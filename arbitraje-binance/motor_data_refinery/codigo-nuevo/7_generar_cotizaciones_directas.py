@@ -11,22 +11,20 @@ Salidas compatibles con el unificador y módulo de absorción:
     columnas: symbol, base, quote, 1_base_equivale_usdt, 1_usdt_equivale_base
 """
 
+import numpy as np
 import pandas as pd
-import ccxt
-from decimal import Decimal, getcontext
 from pathlib import Path
 import sys
 
 # --- Fix imports ---
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT_DIR))
-from codigo.config import DATOS_DIR, EXCHANGE_ID, CCXT_OPTIONS
+from codigo.config import DATOS_DIR, EXCHANGE_ID, exchange_con_markets, obtener_precios
+from codigo.config.artefactos import existe_artefacto, guardar_artefacto, leer_artefacto
+from codigo.config.numerico import a_float, positivos, texto
 
 CONFIG_FILE = ROOT_DIR / "codigo" / "static" / "config_cotizacion_directa.csv"
 
-# Máxima precisión interna para cálculos
-getcontext().prec = 50
-
 def cargar_config():
     """Lee config_cotizacion_directa.csv → {tabla_origen, interesado_en}"""
     if not CONFIG_FILE.exists():
@@ -39,71 +37,79 @@ def cargar_config():
         "interesado_en": df_cfg.loc[0, "interesado_en"].upper().strip()
     }
 
+def cotizar_directos(df_in: pd.DataFrame, exchange) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Cotiza cada símbolo de `df_in` contra el exchange.
+    Devuelve (cotizaciones, plano) con precios float64 (texto solo en el CSV).
+    """
+    # Una sola foto de precios para todo el universo (fallback individual solo para faltantes)
+    precios = obtener_precios(exchange, df_in["symbol"].tolist())
+
+    last = a_float(precios["last"].reindex(df_in["symbol"])) if len(precios) else np.full(len(df_in), np.nan)
+    con_precio = positivos(last)
+    for symbol in df_in["symbol"][~con_precio]:
+        print(f"⚠️ Sin precio: {symbol}")
+
+    symbols = df_in["symbol"][con_precio]
+    partes = symbols.str.split("/")
+    validos = (partes.str.len() == 2).to_numpy()
+    for symbol in symbols[~validos]:
+        print(f"⚠️ Error {symbol}: símbolo sin BASE/QUOTE")
+    if not validos.any():
+        raise RuntimeError("❌ No se generaron cotizaciones.")
+
+    precio = last[con_precio][validos]
+    # Fast path float64; Decimal solo al formatear el CSV (config/numerico.py)
+    df = pd.DataFrame({
+        "symbol": symbols[validos].to_numpy(),
+        "base": partes.str[0][validos].to_numpy(),
+        "quote": partes.str[1][validos].to_numpy(),
+        "1_base_equivale_usdt": precio,                   # 1 base equivale a X USDT
+        "1_usdt_equivale_base": 1.0 / precio,
+    })
+
+    # Plano {base: 1_usdt_equivale_base} para pasos indirectos
+    df_plano = (
+        df[["base", "1_usdt_equivale_base"]]
+        .dropna(subset=["1_usdt_equivale_base"])
+    )
+    return df, df_plano
+
+def _legible(df: pd.DataFrame) -> pd.DataFrame:
+    """Decimales fijos de los CSV históricos: 10 para el precio, 18 para el inverso."""
+    return df.assign(**{
+        c: texto(df[c], d) for c, d in (("1_base_equivale_usdt", 10), ("1_usdt_equivale_base", 18)) if c in df
+    })
+
+def guardar_directos(df: pd.DataFrame, df_plano: pd.DataFrame) -> None:
+    # Salida por exchange para compatibilidad con unificador/absorción
+    out_dir = DATOS_DIR / EXCHANGE_ID / "cotizaciones_directas_usdt"
+    output_csv = out_dir / "1_a_cotizaciones_usdt.csv"
+    plano_csv = out_dir / "2_a_usdt_equivale_base.csv"
+
+    guardar_artefacto(df, output_csv, "cotizaciones_usdt", exportar=_legible)
+    guardar_artefacto(df_plano, plano_csv, "usdt_equivale_base", exportar=_legible)
+
+    print(f"✅ Cotizaciones directas generadas en: {output_csv} ({len(df)} filas)")
+    print(f"✅ Equivalencias planas generadas en: {plano_csv}")
+
 def main():
     cfg = cargar_config()
     tabla_origen = cfg["tabla"]
-    interesado_en = cfg["interesado_en"]
 
-    # Ruta del CSV de entrada (generado por 6_symbolos_separacion.py)
+    # Artefacto de entrada (generado por 6_symbolos_separacion.py)
     input_path = DATOS_DIR / "tratamiento_de_cotizacion" / f"{tabla_origen}.csv"
-    if not input_path.exists():
+    if not existe_artefacto(input_path):
         raise FileNotFoundError(f"❌ No existe el archivo de entrada: {input_path}")
 
-    df_in = pd.read_csv(input_path, dtype=str)
+    df_in = leer_artefacto(input_path)
     if df_in.empty:
         raise RuntimeError(f"⚠️ {tabla_origen} está vacío.")
 
-    # CCXT – exchange desde config
-    ex_class = getattr(ccxt, EXCHANGE_ID)
-    exchange = ex_class(CCXT_OPTIONS)
-    exchange.load_markets()
-
-    cotizaciones = []
-    for _, row in df_in.iterrows():
-        symbol = row["symbol"]
-        try:
-            ticker = exchange.fetch_ticker(symbol)
-            last = ticker.get("last") or ticker.get("close") or ticker.get("info", {}).get("lastPrice")
-            if not last:
-                print(f"⚠️ Sin precio: {symbol}")
-                continue
-            precio = Decimal(str(last))
-            base, quote = symbol.split("/")
-            cotizaciones.append({
-                "symbol": symbol,
-                "base": base,
-                "quote": quote,
-                "1_base_equivale_usdt": precio,  # 1 base equivale a X USDT
-                "1_usdt_equivale_base": (Decimal("1")/precio) if precio != 0 else None
-            })
-        except Exception as e:
-            print(f"⚠️ Error {symbol}: {e}")
-
-    if not cotizaciones:
-        raise RuntimeError("❌ No se generaron cotizaciones.")
-
-    # Salida por exchange para compatibilidad con unificador/absorción
-    out_dir = DATOS_DIR / EXCHANGE_ID / "cotizaciones_directas_usdt"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    output_csv = out_dir / "1_a_cotizaciones_usdt.csv"
-
-    df = pd.DataFrame(cotizaciones)
-    # 🔧 Limitar decimales de salida (mantén precisión alta)
-    df["1_base_equivale_usdt"] = df["1_base_equivale_usdt"].apply(lambda x: f"{x:.10f}")
-    df["1_usdt_equivale_base"] = df["1_usdt_equivale_base"].apply(lambda x: f"{x:.18f}" if x is not None else "")
-
-    df.to_csv(output_csv, index=False)
+    # CCXT – exchange desde config, markets inyectados desde el snapshot
+    exchange = exchange_con_markets(EXCHANGE_ID)
 
-    # CSV plano {base: 1_usdt_equivale_base} para pasos indirectos
-    plano_csv = out_dir / "2_a_usdt_equivale_base.csv"
-    df_plano = (
-        df[["base", "1_usdt_equivale_base"]]
-        .dropna(subset=["1_usdt_equivale_base"])
-    )
-    df_plano.to_csv(plano_csv, index=False)
-
-    print(f"✅ Cotizaciones directas generadas en: {output_csv} ({len(df)} filas)")
-    print(f"✅ Equivalencias planas generadas en: {plano_csv}")
+    guardar_directos(*cotizar_directos(df_in, exchange))
 
 if __name__ == "__main__":
     main()
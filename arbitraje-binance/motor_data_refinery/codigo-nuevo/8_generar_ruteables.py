@@ -11,16 +11,23 @@ Salida:
 - datos/cotizaciones/ruteables_{interesado_en}.csv
 - datos/cotizaciones/no_ruteables_{interesado_en}.csv  (si existen)
 - datos/cotizaciones/no_ruteables_{interesado_en}.log  (si no existen)
+
+La clasificación viaja como bits en `ruteo` (config/ruteo.py); `cotiza_vs_directo`
+y `origen` se arman desde los bits solo al escribir los CSV.
 """
 
-import pandas as pd
-from decimal import Decimal, getcontext, InvalidOperation
+import sys
 from pathlib import Path
 
-# Precisión alta
-getcontext().prec = 50
+import numpy as np
+import pandas as pd
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+from codigo.config.artefactos import leer_artefacto, precios_legibles  # type: ignore
+from codigo.config.numerico import a_float, positivos  # type: ignore
+from codigo.config.ruteo import COLUMNA_RUTEO, bits, origen, ruteable, texto_8  # type: ignore
+
 CONFIG_FILE = ROOT_DIR / "codigo" / "static" / "config_cotizacion_indirecta.csv"
 
 DATOS_DIR = ROOT_DIR / "codigo" / "datos"
@@ -36,82 +43,57 @@ def cargar_config():
         "interesado_en": df.loc[0, "interesado_en"].upper().strip(),
     }
 
-def main():
-    cfg = cargar_config()
-    interesado = cfg["interesado_en"]
-
-    base_path = DATOS_DIR / "tratamiento_de_cotizacion"
-    f_indir = base_path / f"{cfg['tabla_indirecta']}.csv"
-    f_dir   = base_path / f"{cfg['tabla_directa']}.csv"
-    f_inv   = base_path / f"{cfg['tabla_invertida']}.csv"
-
-    df_indir = pd.read_csv(f_indir, dtype=str)
-    df_dir   = pd.read_csv(f_dir, dtype=str)
-    df_inv   = pd.read_csv(f_inv, dtype=str)
-
+def rutear(df_indir: pd.DataFrame, df_dir: pd.DataFrame, df_inv: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Clasifica los pares indirectos en (ruteables, no_ruteables) con bits de `ruteo`."""
     bases_directas = set(df_dir["base"].dropna().str.strip().str.upper())
     quotes_invertidas = set(df_inv["quote"].dropna().str.strip().str.upper())
 
-    ruteables, no_ruteables = [], []
-
-    for _, row in df_indir.iterrows():
-        base = str(row["base"]).strip().upper()
-        quote = str(row["quote"]).strip().upper()
-        symbol = str(row["symbol"]).strip().upper()
-
-        match_info = []
-        origen = "NONE"
-
-        # Caso: base engancha en directos → origen = indirecto
-        if base in bases_directas:
-            match_info.append(f"base:{base}")
-            origen = "indirecto"
-        else:
-            match_info.append("base:NONE")
-
-        # Caso: quote engancha en directos → origen = indirecto
-        if quote in bases_directas:
-            match_info.append(f"quote:{quote}")
-            origen = "indirecto"
-        # Caso: quote engancha en invertidos → origen = invertido
-        elif quote in quotes_invertidas:
-            match_info.append(f"quote:{quote}")
-            origen = "invertido"
-        else:
-            match_info.append("quote:NONE")
-
-        fila = {
-            "symbol": symbol,
-            "base": base,
-            "quote": quote,
-            "cotiza_vs_directo": "; ".join(match_info),
-            "origen": origen,
-            "1_base_equivale_x_quote": "",
-            "1_quote_equivale_x_base": ""
-        }
-
-        try:
-            precio = Decimal(str(row.get("1_base_equivale_x_quote", "")))
-            if precio and precio != 0:
-                fila["1_base_equivale_x_quote"] = str(precio)
-                fila["1_quote_equivale_x_base"] = str(Decimal("1") / precio)
-        except (InvalidOperation, ValueError, ZeroDivisionError):
-            pass
-
-        if origen != "NONE":
-            ruteables.append(fila)
-        else:
-            no_ruteables.append(fila)
-
-    # Guardar
+    symbol = df_indir["symbol"].astype(str).str.strip().str.upper()
+    base = df_indir["base"].astype(str).str.strip().str.upper()
+    quote = df_indir["quote"].astype(str).str.strip().str.upper()
+
+    # base engancha en directos → BASE_CONOCIDA; quote en directos → QUOTE_CONOCIDA,
+    # si no, en invertidos → INVERTIDO
+    quote_dir = quote.isin(bases_directas).to_numpy()
+    ruteo = bits(
+        base_ok=base.isin(bases_directas).to_numpy(),
+        quote_ok=quote_dir,
+        invertido=quote.isin(quotes_invertidas).to_numpy() & ~quote_dir,
+    )
+
+    # Precio: float64 vectorizado, texto solo al exportar (config/numerico.py)
+    crudo = df_indir.get("1_base_equivale_x_quote", pd.Series("", index=df_indir.index))
+    precio = a_float(crudo)
+    ok = positivos(precio)
+
+    filas = pd.DataFrame({
+        "symbol": symbol.to_numpy(),
+        "base": base.to_numpy(),
+        "quote": quote.to_numpy(),
+        "1_base_equivale_x_quote": np.where(ok, precio, np.nan),
+        "1_quote_equivale_x_base": 1.0 / np.where(ok, precio, np.nan),
+        COLUMNA_RUTEO: ruteo,
+    })
+
+    mascara = ruteable(ruteo)
+    return filas[mascara].reset_index(drop=True), filas[~mascara].reset_index(drop=True)
+
+def _exportable(df: pd.DataFrame) -> pd.DataFrame:
+    """Texto legible (`cotiza_vs_directo`, `origen`, precios) armado solo para el CSV."""
+    out = precios_legibles(df).copy()
+    out.insert(3, "cotiza_vs_directo", texto_8(out[COLUMNA_RUTEO], out["base"], out["quote"]))
+    out.insert(4, "origen", origen(out[COLUMNA_RUTEO]))
+    return out
+
+def guardar_ruteables(ruteables: pd.DataFrame, no_ruteables: pd.DataFrame, interesado: str) -> None:
     out_dir = DATOS_DIR / "cotizaciones"
     out_dir.mkdir(parents=True, exist_ok=True)
 
     # Ruteables siempre
-    pd.DataFrame(ruteables).to_csv(out_dir / f"ruteables_{interesado}.csv", index=False)
+    _exportable(ruteables).to_csv(out_dir / f"ruteables_{interesado}.csv", index=False)
 
-    if no_ruteables:
-        pd.DataFrame(no_ruteables).to_csv(out_dir / f"no_ruteables_{interesado}.csv", index=False)
+    if not no_ruteables.empty:
+        _exportable(no_ruteables).to_csv(out_dir / f"no_ruteables_{interesado}.csv", index=False)
     else:
         log_path = out_dir / f"no_ruteables_{interesado}.log"
         with open(log_path, "w", encoding="utf-8") as f:
@@ -121,5 +103,20 @@ def main():
     print(f"✅ Ruteables: {len(ruteables)} | No ruteables: {len(no_ruteables)}")
     print(f"📄 Archivos guardados en {out_dir}")
 
+def main():
+    cfg = cargar_config()
+    interesado = cfg["interesado_en"]
+
+    base_path = DATOS_DIR / "tratamiento_de_cotizacion"
+    f_indir = base_path / f"{cfg['tabla_indirecta']}.csv"
+    f_dir   = base_path / f"{cfg['tabla_directa']}.csv"
+    f_inv   = base_path / f"{cfg['tabla_invertida']}.csv"
+
+    df_indir = leer_artefacto(f_indir)
+    df_dir   = leer_artefacto(f_dir)
+    df_inv   = leer_artefacto(f_inv)
+
+    guardar_ruteables(*rutear(df_indir, df_dir, df_inv), interesado)
+
 if __name__ == "__main__":
     main()
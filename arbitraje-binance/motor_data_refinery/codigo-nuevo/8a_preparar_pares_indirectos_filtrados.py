@@ -4,88 +4,87 @@ Prepara `pares_indirectos_filtrados.csv` sin DB, usando CCXT + salidas de direct
 Entradas:
 - codigo/datos/<exchange>/cotizaciones_directas_usdt/2_a_usdt_equivale_base.csv
   (mapea token base → 1_usdt_equivale_base)
-- CCXT markets/tickers para obtener precio 1_base_equivale_x_quote
+- CCXT markets + tickers masivos (config.tickers) para obtener precio 1_base_equivale_x_quote
 
 Salida:
 - codigo/datos/<exchange>/previo_a_cotizar/pares_indirectos_filtrados.csv
-  columnas: symbol, base, quote, 1_base_equivale_x_quote, cotiza_vs_directo
+  columnas: symbol, base, quote, 1_base_equivale_x_quote, 1_quote_equivale_x_base,
+            cotiza_vs_directo (texto, solo en el CSV), ruteo
 
-Regla para `cotiza_vs_directo`:
-- Si quote ∈ dict_equiv_usdt → marca como calculable desde quote (no incluye 'quote:NONE').
-- Si NO y base ∈ dict_equiv_usdt → marca como solo_base_calculable ('quote:NONE').
+Regla para `ruteo` (bits de config/ruteo.py):
+- quote ∈ dict_equiv_usdt → QUOTE_CONOCIDA (calculable desde quote).
+- base ∈ dict_equiv_usdt  → BASE_CONOCIDA (sin QUOTE_CONOCIDA: solo_base_calculable).
+`cotiza_vs_directo` ('base:OK|quote:NONE', …) se arma recién al exportar.
 """
 
 from __future__ import annotations
 
 from pathlib import Path
 import sys
-from decimal import Decimal
+import numpy as np
 import pandas as pd
-import ccxt
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT_DIR))
 
-from codigo.config import DATOS_DIR, EXCHANGE_ID, CCXT_OPTIONS  # type: ignore
+from codigo.config import DATOS_DIR, EXCHANGE_ID, exchange_con_markets, obtener_precios  # type: ignore
+from codigo.config.artefactos import existe_artefacto, guardar_artefacto, leer_artefacto  # type: ignore
+from codigo.config.numerico import a_float, positivos  # type: ignore
+from codigo.config.ruteo import COLUMNA_RUTEO, bits, con_texto, texto_8a  # type: ignore
+
+
+def preparar_pares(ex, df_equiv: pd.DataFrame) -> pd.DataFrame:
+    """Arma los pares indirectos (sin USDT) con precio y bits de calculabilidad (`ruteo`)."""
+    # tokens con USDT → BASE unidades
+    valor = a_float(df_equiv.get("1_usdt_equivale_base", pd.Series(np.nan, index=df_equiv.index)))
+    equiv = set(df_equiv["base"][~np.isnan(valor)].astype(str).str.strip().str.upper())
+
+    candidatos = pd.DataFrame(
+        [(s, (m.get("base") or "").upper(), (m.get("quote") or "").upper()) for s, m in ex.markets.items()],
+        columns=["symbol", "base", "quote"],
+    )
+    # indirectos = pares que no involucran USDT directo
+    candidatos = candidatos[(candidatos["base"] != "") & (candidatos["quote"] != "")
+                            & (candidatos["base"] != "USDT") & (candidatos["quote"] != "USDT")].reset_index(drop=True)
+
+    # Precio 1 base en quote: una foto masiva para todos los candidatos
+    precios = obtener_precios(ex, candidatos["symbol"].tolist())
+    last = a_float(precios["last"].reindex(candidatos["symbol"])) if len(precios) else np.full(len(candidatos), np.nan)
+    con_precio = np.isfinite(last)
+    invertible = positivos(last)
+
+    # Clasificación de calculabilidad contra el directo
+    base_ok = candidatos["base"].isin(equiv).to_numpy()
+    quote_ok = candidatos["quote"].isin(equiv).to_numpy()
+    ruteo = bits(base_ok=base_ok, quote_ok=quote_ok)
+
+    # float64 adentro y entre pasos; texto decimal solo en el CSV (config/artefactos.py)
+    return candidatos.assign(**{
+        "1_base_equivale_x_quote": np.where(con_precio, last, np.nan),
+        "1_quote_equivale_x_base": 1.0 / np.where(invertible, last, np.nan),
+        COLUMNA_RUTEO: ruteo,
+    })
+
+
+def guardar_pares(df: pd.DataFrame) -> None:
+    out_dir = DATOS_DIR / EXCHANGE_ID / "previo_a_cotizar"
+    out_csv = out_dir / "pares_indirectos_filtrados.csv"
+    guardar_artefacto(df, out_csv, "pares_indirectos", exportar=lambda d: con_texto(d, texto_8a(d[COLUMNA_RUTEO])))
+    print(f"✅ Generado {out_csv} ({len(df)} pares)")
 
 
 def main() -> None:
-    ex_class = getattr(ccxt, EXCHANGE_ID)
-    ex = ex_class(CCXT_OPTIONS)
-    ex.load_markets()
+    # Markets inyectados desde el snapshot compartido (sin exchangeInfo)
+    ex = exchange_con_markets(EXCHANGE_ID)
 
     # Cargar dict USDT → BASE unidades
     direct_dir = DATOS_DIR / EXCHANGE_ID / "cotizaciones_directas_usdt"
     direct_csv = direct_dir / "2_a_usdt_equivale_base.csv"
-    if not direct_csv.exists():
+    if not existe_artefacto(direct_csv):
         raise FileNotFoundError(f"❌ Falta {direct_csv}. Ejecuta 7_generar_cotizaciones_directas primero.")
-    df_equiv = pd.read_csv(direct_csv, dtype=str)
-    equiv = {str(r["base"]).strip().upper(): str(r["1_usdt_equivale_base"]).strip() for _, r in df_equiv.iterrows() if str(r.get("1_usdt_equivale_base", "")).strip()}
-
-    rows = []
-    for symbol, m in ex.markets.items():
-        base = (m.get("base") or "").upper()
-        quote = (m.get("quote") or "").upper()
-        if not base or not quote:
-            continue
-        if base == "USDT" or quote == "USDT":
-            continue  # indirectos = pares que no involucran USDT directo
-
-        # Precio 1 base en quote
-        price = None
-        try:
-            t = ex.fetch_ticker(symbol)
-            last = t.get("last") or t.get("close") or (t.get("info", {}) or {}).get("lastPrice")
-            if last is not None:
-                price = str(Decimal(str(last)))
-        except Exception:
-            price = None
-
-        # Clasificación de calculabilidad contra el directo
-        quote_ok = quote in equiv
-        base_ok = base in equiv
-        if quote_ok:
-            flag = "base:OK|quote:OK" if base_ok else "base:NONE|quote:OK"
-        elif base_ok:
-            flag = "base:OK|quote:NONE"
-        else:
-            # sin camino directo por base ni por quote: igual lo dejamos fuera para los siguientes pasos
-            flag = "base:NONE|quote:NONE"
-
-        rows.append({
-            "symbol": symbol,
-            "base": base,
-            "quote": quote,
-            "1_base_equivale_x_quote": price or "",
-            "1_quote_equivale_x_base": (str(Decimal("1")/Decimal(price)) if price and Decimal(price) != 0 else ""),
-            "cotiza_vs_directo": flag,
-        })
+    df_equiv = leer_artefacto(direct_csv)
 
-    out_dir = DATOS_DIR / EXCHANGE_ID / "previo_a_cotizar"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out_csv = out_dir / "pares_indirectos_filtrados.csv"
-    pd.DataFrame(rows).to_csv(out_csv, index=False)
-    print(f"✅ Generado {out_csv} ({len(rows)} pares)")
+    guardar_pares(preparar_pares(ex, df_equiv))
 
 
 if __name__ == "__main__":
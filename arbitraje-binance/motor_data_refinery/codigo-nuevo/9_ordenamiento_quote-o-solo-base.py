@@ -2,7 +2,16 @@
 
 import pandas as pd
 import os
-from decimal import Decimal, InvalidOperation
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+from codigo.config.artefactos import existe_artefacto, guardar_artefacto, leer_artefacto  # type: ignore
+from codigo.config.numerico import a_float  # type: ignore
+from codigo.config.ruteo import (  # type: ignore
+    COLUMNA_RUTEO, COLUMNA_TEXTO, columna, con_texto, quote_calculable, solo_base, texto_8a,
+)
 
 EXCHANGE_ID = "binance"
 
@@ -13,53 +22,45 @@ ruta_datos = os.path.join(BASE_DIR, 'datos', EXCHANGE_ID, 'previo_a_cotizar')
 # Archivo de entrada (generado por el script de pares indirectos para Binance)
 ruta_entrada = os.path.join(ruta_datos, 'pares_indirectos_filtrados.csv')
 
-if not os.path.exists(ruta_entrada):
-    raise FileNotFoundError(f"❌ No se encontró el CSV de entrada: {ruta_entrada}")
-
-# Cargar todo como string para no perder precisión
-df = pd.read_csv(ruta_entrada, dtype=str)
-
-# Asegurar que exista la columna clave
-if 'cotiza_vs_directo' not in df.columns:
-    raise RuntimeError("❌ Falta la columna 'cotiza_vs_directo' en el CSV de entrada.")
-
-# Convertir a string “plano” (conservando precisión) solo los valores válidos
-for col in ['1_base_equivale_x_quote', '1_quote_equivale_x_base']:
-    if col in df.columns:
-        def _safe_decimal_str(x):
-            if x in [None, '', 'nan', 'NaN']:
-                return ''
-            try:
-                return str(Decimal(str(x)))
-            except (InvalidOperation, ValueError):
-                return ''
-        df[col] = df[col].apply(_safe_decimal_str)
+# --- FILTROS ---
 
-# --- FUNCIONES AUXILIARES ---
+def ordenar(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Devuelve (quote_calculable_o_mixto, solo_base_calculable)."""
+    # Bits de ruteo (o, en CSV viejos, derivados de 'cotiza_vs_directo')
+    ruteo = columna(df)
 
-def es_quote_calculable(valor: str) -> bool:
-    """True si el valor es calculable desde el quote (no contiene 'quote:NONE')."""
-    return isinstance(valor, str) and ('quote:NONE' not in valor)
+    df = df.drop(columns=[COLUMNA_TEXTO], errors='ignore').assign(**{COLUMNA_RUTEO: ruteo})
+    # Precios float64 tal cual (del artefacto o del paso 8a); inválidos → NaN
+    for col in ['1_base_equivale_x_quote', '1_quote_equivale_x_base']:
+        if col in df.columns:
+            df[col] = a_float(df[col])
 
-def es_solo_base_calculable(valor: str) -> bool:
-    """True si solo base es calculable (tiene 'quote:NONE' y NO tiene 'base:NONE')."""
-    return isinstance(valor, str) and ('quote:NONE' in valor and 'base:NONE' not in valor)
+    # quote calculable (con o sin base) → paso 10; solo base → paso 11
+    df_quote_calculable_o_mixto = df[quote_calculable(ruteo)].copy()
+    df_base_solo = df[solo_base(ruteo)].copy()
+    return df_quote_calculable_o_mixto, df_base_solo
 
-# --- FILTROS ---
+# --- SALIDA ---
 
-df_quote_calculable_o_mixto = df[df['cotiza_vs_directo'].apply(es_quote_calculable)].copy()
-df_base_solo = df[df['cotiza_vs_directo'].apply(es_solo_base_calculable)].copy()
+def guardar(df_quote_calculable_o_mixto: pd.DataFrame, df_base_solo: pd.DataFrame) -> None:
+    out1 = os.path.join(ruta_datos, '1_quote_calculable_o_mixto.csv')
+    out2 = os.path.join(ruta_datos, '2_solo_base_calculable.csv')
 
-# --- SALIDA ---
+    # Texto legible solo en los CSV
+    for df, out in ((df_quote_calculable_o_mixto, out1), (df_base_solo, out2)):
+        guardar_artefacto(df, out, 'pares_indirectos', exportar=lambda d: con_texto(d, texto_8a(d[COLUMNA_RUTEO])))
 
-os.makedirs(ruta_datos, exist_ok=True)
+    print(f"✅ Archivos generados en '{ruta_datos}':")
+    print("📄 1_quote_calculable_o_mixto.csv")
+    print("📄 2_solo_base_calculable.csv")
 
-out1 = os.path.join(ruta_datos, '1_quote_calculable_o_mixto.csv')
-out2 = os.path.join(ruta_datos, '2_solo_base_calculable.csv')
+def main():
+    if not existe_artefacto(ruta_entrada):
+        raise FileNotFoundError(f"❌ No se encontró el CSV de entrada: {ruta_entrada}")
 
-df_quote_calculable_o_mixto.to_csv(out1, index=False)
-df_base_solo.to_csv(out2, index=False)
+    # Artefacto tipado (Parquet) o, si no hay, el CSV (precios float64 en ambos casos)
+    df = leer_artefacto(ruta_entrada)
+    guardar(*ordenar(df))
 
-print(f"✅ Archivos generados en '{ruta_datos}':")
-print("📄 1_quote_calculable_o_mixto.csv")
-print("📄 2_solo_base_calculable.csv")
+if __name__ == "__main__":
+    main()
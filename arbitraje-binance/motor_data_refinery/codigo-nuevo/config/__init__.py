@@ -1,20 +1,59 @@
 # codigo/config/__init__.py
 from .config import (
     APP_DIR, CODIGO_DIR, TEMP_DIR, STATIC_DIR,
-    DATOS_DIR, ESTRUCTURAL_DIR,
-    EXCHANGE_ID, CCXT_OPTIONS,
+    DATOS_DIR, ESTRUCTURAL_DIR, SNAPSHOTS_DIR, ABSORCION_DIR,
+    EXCHANGE_ID, CCXT_OPTIONS, MARKETS_SNAPSHOT_TTL, BINANCE_WS_URL,
+    EXCHANGE_MODO, EXCHANGE_REPLAY_DIR,
     SCHEMA_PRIMARY_PATH, SCHEMA_OUTPUT_PATH,
-    AUDIT_STRUCT_EXPORT,
+    AUDIT_STRUCT_EXPORT, ARTEFACTOS_CSV,
     ensure_runtime_dirs, load_schema_or_abort,
 )
-from .db import get_db_config, connect
+from .db import get_db_config, connect, conexion, motor, cerrar_pools, backend
+from .db_sqlite import es_sqlite
+from .carga import cargar_frame
+from .ddl import generar_ddl, adaptar_frame, tipos_de_schema, tipos_columnas, ensanchar, asegurar_indices
+from .swap import reconstruir, publicar, revertir
+from .delta import Delta, COLUMNA_HUELLA, aplicar_delta, asegurar_columna_huella, con_huella
+from .criterios import Criterio, Pushdown, compilar, compilar_sql, evaluar, separar, con_motivo_texto
+from .historial import (
+    TABLA_HISTORIAL, asegurar_historial, asegurar_particiones, asegurar_vistas, grabar_historial,
+)
+from .grafo import aristas, valuar
+from .numerico import a_float, cota, texto, truncar
+from .artefactos import ESQUEMAS, guardar_artefacto, leer_artefacto, existe_artefacto
+from .ruteo import BASE_CONOCIDA, QUOTE_CONOCIDA, INVERTIDO, DIRECTO, COLUMNA_RUTEO
+from .replay_exchange import crear_exchange, ExchangeReplay, ExchangeReplayAsync, Grabador
+from .markets import cargar_markets, cargar_snapshot, markets_hash, exchange_con_markets
+from .tickers import obtener_precios
+from .fetch_async import iterar, recolectar, fetch_order_books
+from .feed_ws import TablaBBO, FeedBinance, leer_pares_involucrados
+from .orderbook import Escalera, LibroLocal, GestorLibros
+from .extractor import Extractor, aplanar, extractor_para, extractores_de_schema
 
 __all__ = [
     "APP_DIR", "CODIGO_DIR", "TEMP_DIR", "STATIC_DIR",
-    "DATOS_DIR", "ESTRUCTURAL_DIR",
-    "EXCHANGE_ID", "CCXT_OPTIONS",
+    "DATOS_DIR", "ESTRUCTURAL_DIR", "SNAPSHOTS_DIR", "ABSORCION_DIR",
+    "EXCHANGE_ID", "CCXT_OPTIONS", "MARKETS_SNAPSHOT_TTL", "BINANCE_WS_URL",
+    "EXCHANGE_MODO", "EXCHANGE_REPLAY_DIR",
     "SCHEMA_PRIMARY_PATH", "SCHEMA_OUTPUT_PATH",
-    "AUDIT_STRUCT_EXPORT",
+    "AUDIT_STRUCT_EXPORT", "ARTEFACTOS_CSV",
     "ensure_runtime_dirs", "load_schema_or_abort",
-    "get_db_config", "connect",
+    "get_db_config", "connect", "conexion", "motor", "cerrar_pools", "backend", "es_sqlite",
+    "cargar_frame",
+    "generar_ddl", "adaptar_frame", "tipos_de_schema", "tipos_columnas", "ensanchar", "asegurar_indices",
+    "reconstruir", "publicar", "revertir",
+    "Delta", "COLUMNA_HUELLA", "aplicar_delta", "asegurar_columna_huella", "con_huella",
+    "Criterio", "Pushdown", "compilar", "compilar_sql", "evaluar", "separar", "con_motivo_texto",
+    "TABLA_HISTORIAL", "asegurar_historial", "asegurar_particiones", "asegurar_vistas", "grabar_historial",
+    "aristas", "valuar",
+    "a_float", "cota", "texto", "truncar",
+    "ESQUEMAS", "guardar_artefacto", "leer_artefacto", "existe_artefacto",
+    "BASE_CONOCIDA", "QUOTE_CONOCIDA", "INVERTIDO", "DIRECTO", "COLUMNA_RUTEO",
+    "crear_exchange", "ExchangeReplay", "ExchangeReplayAsync", "Grabador",
+    "cargar_markets", "cargar_snapshot", "markets_hash", "exchange_con_markets",
+    "obtener_precios",
+    "iterar", "recolectar", "fetch_order_books",
+    "TablaBBO", "FeedBinance", "leer_pares_involucrados",
+    "Escalera", "LibroLocal", "GestorLibros",
+    "Extractor", "aplanar", "extractor_para", "extractores_de_schema",
 ]
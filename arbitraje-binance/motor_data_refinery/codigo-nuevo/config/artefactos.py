@@ -0,0 +1,235 @@
+# codigo/config/artefactos.py
+"""
+Artefactos tipados entre pasos: Parquet con un esquema declarado por artefacto.
+
+Los pasos 6–12 (y la copia para modulo_absorcion) ya no se pasan CSV leídos
+con `dtype=str`: cada artefacto se escribe como `<nombre>.parquet` junto a la
+ruta `.csv` de siempre, con tipos fijos:
+
+  simbolo   symbol / base / quote / cotizacion → diccionario (int32 → string)
+  precio    decimal256(76, 38): exacto para el texto decimal de `numerico.texto`
+            (hasta 38 decimales; más allá se redondea half-even)
+  ruteo     uint8 (bits de config/ruteo.py)
+  entero    int32 (`saltos` del grafo)
+  texto     string (`ruta` del grafo)
+
+Al leer, los diccionarios vuelven como texto y los precios como float64 con
+redondeo correcto (decimal → texto → float64 con el parser de Arrow, el mismo
+resultado que `float()` de Python): los pasos 7–12 operan directo sobre las
+columnas, sin re-parsear. `ruteo` y `saltos` llegan ya tipados. Quien necesite
+el decimal exacto (el truncado de modulo_absorcion) lee con `exactos=True`.
+
+Al escribir, los precios float64 pasan a decimal con su representación más
+corta (la que identifica al float), así que leer lo escrito devuelve los mismos
+float64 que viajaron en memoria. También se acepta texto decimal (paso 6b).
+
+El CSV queda como export para humanos (ARTEFACTOS_CSV, por defecto activo):
+es el único lugar donde los precios se formatean a texto (`precios_legibles`,
+`numerico.texto`). `exportar` arma la versión legible propia del paso (p. ej.
+`cotiza_vs_directo` o decimales fijos). Sin pyarrow todo sigue en CSV: al leer,
+las columnas de precio se parsean igual a float64.
+
+Uso:
+    guardar_artefacto(df, out_dir / "pares_indirectos_filtrados.csv", "pares_indirectos")
+    df = leer_artefacto(out_dir / "pares_indirectos_filtrados.csv")   # .parquet si existe, si no el .csv
+    df["1_base_equivale_x_quote"].dtype                                # float64
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation, localcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # sin pyarrow: los artefactos quedan solo en CSV
+    pa = pc = pq = None
+
+from .config import ARTEFACTOS_CSV
+from .numerico import a_float, texto
+
+Ruta = Union[str, Path]
+
+SIMBOLO, PRECIO, RUTEO, ENTERO, TEXTO = "simbolo", "precio", "ruteo", "entero", "texto"
+PRECISION_PRECIO = 76
+ESCALA_PRECIO = 38
+COMPRESION = "zstd"
+
+_CLAVE = (("symbol", SIMBOLO), ("base", SIMBOLO), ("quote", SIMBOLO))
+
+# ───── esquemas declarados (columna, tipo) por artefacto ─────
+ESQUEMAS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    # paso 6 → 7/8: datos/tratamiento_de_cotizacion/cotizador_{directo,invertido,indirecto}_<ref>
+    "cotizador": _CLAVE,
+    # paso 7 → 12: cotizaciones_directas_usdt/1_a_cotizaciones_usdt
+    "cotizaciones_usdt": _CLAVE + (("1_base_equivale_usdt", PRECIO), ("1_usdt_equivale_base", PRECIO)),
+    # paso 7 → 8a/10/11: cotizaciones_directas_usdt/2_a_usdt_equivale_base
+    "usdt_equivale_base": (("base", SIMBOLO), ("1_usdt_equivale_base", PRECIO)),
+    # paso 8a → 9 → 10/11: previo_a_cotizar/{pares_indirectos_filtrados,1_quote_…,2_solo_base_…}
+    "pares_indirectos": _CLAVE + (
+        ("1_base_equivale_x_quote", PRECIO), ("1_quote_equivale_x_base", PRECIO), ("ruteo", RUTEO),
+    ),
+    # paso 10 → 12
+    "por_quote": _CLAVE + (
+        ("1_dolar_equivale_a_quote", PRECIO), ("1_base_equivale_usdt_indirecto", PRECIO), ("ruteo", RUTEO),
+    ),
+    # paso 11 → 12
+    "por_base": _CLAVE + (("1_dolar_equivale_a_quote", PRECIO), ("ruteo", RUTEO)),
+    # paso 12 → modulo_absorcion: cotizaciones_usdt_unificadas / cotizaciones_equivalentes_1_usdt
+    "unificadas": _CLAVE + (("1_dolar_equivale_a_quote", PRECIO), ("cotizacion", SIMBOLO), ("ruteo", RUTEO)),
+    # paso 6b → modulo_absorcion (mismas rutas que el 12)
+    "grafo": _CLAVE + (
+        ("1_dolar_equivale_a_quote", PRECIO), ("cotizacion", SIMBOLO), ("saltos", ENTERO), ("ruta", TEXTO),
+    ),
+}
+
+# Columnas de precio de cualquier artefacto (lectura CSV y export legible)
+PRECIOS: FrozenSet[str] = frozenset(c for cols in ESQUEMAS.values() for c, tipo in cols if tipo == PRECIO)
+
+
+def disponible() -> bool:
+    """True si hay pyarrow (artefactos Parquet); si no, todo va a CSV."""
+    return pa is not None
+
+
+def ruta_parquet(ruta: Ruta) -> Path:
+    """`.../x.csv` → `.../x.parquet` (la ruta CSV histórica identifica al artefacto)."""
+    return Path(ruta).with_suffix(".parquet")
+
+
+def existe_artefacto(ruta: Ruta) -> bool:
+    """El artefacto está en disco (Parquet legible o CSV)."""
+    return (disponible() and ruta_parquet(ruta).exists()) or Path(ruta).exists()
+
+
+def esquema(nombre: str) -> "pa.Schema":
+    """Esquema Arrow declarado del artefacto `nombre`."""
+    tipos = {
+        SIMBOLO: pa.dictionary(pa.int32(), pa.string()),
+        PRECIO: pa.decimal256(PRECISION_PRECIO, ESCALA_PRECIO),
+        RUTEO: pa.uint8(),
+        ENTERO: pa.int32(),
+        TEXTO: pa.string(),
+    }
+    return pa.schema([(col, tipos[tipo]) for col, tipo in ESQUEMAS[nombre]])
+
+
+# ───── escritura ─────
+def _decimal(valor: Any) -> Optional[Decimal]:
+    if valor is None:
+        return None
+    try:
+        d = Decimal(str(valor).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    if not d.is_finite():
+        return None
+    if d.as_tuple().exponent < -ESCALA_PRECIO:
+        d = d.quantize(Decimal(1).scaleb(-ESCALA_PRECIO))
+    return d
+
+
+def _precios(serie: pd.Series, destino: "pa.DataType") -> "pa.Array":
+    """
+    float64 (o texto decimal) → decimal256 con los casts de Arrow: el float pasa
+    por su texto más corto, así que vuelve idéntico al leer. Fila a fila solo si
+    hay valores raros (más de ESCALA_PRECIO decimales, no-texto).
+    """
+    try:
+        if pd.api.types.is_numeric_dtype(serie.dtype):
+            x = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+            s = pc.cast(pa.array(np.where(np.isfinite(x), x, np.nan), from_pandas=True), pa.string())
+            return pc.cast(s, destino)
+        if serie.dtype == object:
+            s = pc.utf8_trim_whitespace(pa.array(serie, type=pa.string(), from_pandas=True))
+            vacio = pc.is_in(pc.utf8_lower(s), value_set=pa.array(["", "nan", "none"]))
+            return pc.cast(pc.if_else(vacio, pa.scalar(None, pa.string()), s), destino)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass  # inf, más de ESCALA_PRECIO decimales o valores no-texto
+    with localcontext() as ctx:
+        ctx.prec = PRECISION_PRECIO
+        return pa.array([_decimal(v) for v in serie.tolist()], type=destino)
+
+
+def _columna(serie: pd.Series, tipo: str, destino: "pa.DataType") -> "pa.Array":
+    if tipo == PRECIO:
+        return _precios(serie, destino)
+    if tipo == SIMBOLO:
+        return pa.array(serie.astype(object), type=pa.string(), from_pandas=True).dictionary_encode()
+    if tipo == TEXTO:
+        return pa.array(serie.astype(object), type=pa.string(), from_pandas=True)
+    return pa.array(pd.to_numeric(serie, errors="coerce"), type=destino, from_pandas=True)
+
+
+def tabla(df: pd.DataFrame, nombre: str) -> "pa.Table":
+    """Frame del DAG → tabla Arrow con el esquema declarado (columnas de más se ignoran)."""
+    sch = esquema(nombre)
+    faltan = [c for c in sch.names if c not in df.columns]
+    if faltan and len(df):
+        raise ValueError(f"❌ Artefacto '{nombre}': faltan columnas {faltan}")
+    if faltan:  # frame vacío (p. ej. sin filas cotizables): solo el esquema
+        return sch.empty_table()
+    columnas = [_columna(df[c], tipo, sch.field(c).type) for c, tipo in ESQUEMAS[nombre]]
+    return pa.Table.from_arrays(columnas, schema=sch)
+
+
+def precios_legibles(df: pd.DataFrame) -> pd.DataFrame:
+    """Copia con las columnas de precio float64 formateadas como texto decimal (solo para CSV)."""
+    cols = [c for c in df.columns if c in PRECIOS and pd.api.types.is_numeric_dtype(df[c].dtype)]
+    return df.assign(**{c: texto(df[c].to_numpy(dtype=np.float64, na_value=np.nan)) for c in cols}) if cols else df
+
+
+def guardar_artefacto(df: pd.DataFrame, ruta: Ruta, nombre: str,
+                      exportar: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> None:
+    """
+    Escribe el artefacto `nombre` en `<ruta>.parquet` y, si corresponde, el CSV
+    legible en `ruta` (`exportar` arma la versión para humanos; por defecto el
+    frame; los precios que sigan en float64 se formatean con `precios_legibles`).
+    """
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    if disponible():
+        pq.write_table(tabla(df, nombre), ruta_parquet(ruta), compression=COMPRESION)
+    if ARTEFACTOS_CSV or not disponible():
+        precios_legibles(exportar(df) if exportar else df).to_csv(ruta, index=False)
+
+
+# ───── lectura ─────
+def _serie(col: "pa.ChunkedArray", exactos: bool) -> pd.Series:
+    if pa.types.is_dictionary(col.type):
+        col = col.cast(col.type.value_type)
+    if pa.types.is_decimal(col.type) and not exactos:
+        # decimal → texto → float64: redondeo correcto (el cast directo de Arrow no lo es)
+        col = pc.cast(pc.cast(col, pa.string()), pa.float64())
+    serie = col.to_pandas()
+    if serie.dtype == object and col.null_count:
+        serie = serie.where(serie.notna(), np.nan)  # mismo faltante que read_csv(dtype=str)
+    return serie
+
+
+def a_frame(t: "pa.Table", exactos: bool = False) -> pd.DataFrame:
+    """
+    Tabla Arrow → frame del DAG: texto, precios float64 (o Decimal con `exactos`)
+    y `ruteo`/`saltos` enteros.
+    """
+    return pd.DataFrame({c: _serie(t.column(c), exactos) for c in t.column_names}, columns=t.column_names)
+
+
+def leer_artefacto(ruta: Ruta, exactos: bool = False) -> pd.DataFrame:
+    """
+    Lee el artefacto: `<ruta>.parquet` si existe (y hay pyarrow); si no, el CSV
+    con `dtype=str` y los precios parseados a float64. Con `exactos=True` los
+    precios quedan como decimales exactos (Decimal del Parquet o texto del CSV).
+    """
+    if disponible() and ruta_parquet(ruta).exists():
+        return a_frame(pq.read_table(ruta_parquet(ruta)), exactos)
+    df = pd.read_csv(ruta, dtype=str)
+    if exactos:
+        return df
+    return df.assign(**{c: a_float(df[c]) for c in df.columns if c in PRECIOS})
@@ -0,0 +1,130 @@
+# codigo/config/carga.py
+"""
+Carga masiva de DataFrames a MariaDB.
+
+Camino rápido: el frame se vuelca a un TSV temporal y entra con un único
+`LOAD DATA LOCAL INFILE` (un round trip para toda la tabla). Si el server o el
+cliente tienen LOAD DATA LOCAL deshabilitado (o DB_LOAD_DATA=0), cae a INSERT
+multi-fila por lotes de CARGA_LOTE filas. En el backend SQLite (DB_BACKEND=sqlite)
+va directo a `executemany` con una sentencia preparada de una fila (sin límite
+de variables por sentencia y sin re-parsear el SQL por lote).
+
+No hace commit: corre dentro de la transacción del llamador (`conexion()`).
+
+Uso:
+    with conexion() as conn:
+        cargar_frame(conn, "tabla_unica", df)
+        cargar_frame(conn, "sym_precision", df, reemplazar=True)   # REPLACE INTO
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import tempfile
+from typing import Any, List, Sequence
+
+import pandas as pd
+import pymysql
+from pymysql.constants import CLIENT
+
+from .db_sqlite import es_sqlite
+
+CARGA_LOTE = int(os.getenv("CARGA_LOTE", "1000"))
+DB_LOAD_DATA = os.getenv("DB_LOAD_DATA", "1") == "1"
+
+# 1148: comando no permitido · 3948: local_infile=OFF en el server · 2068: rechazado por el cliente
+_ERRORES_LOAD_DATA = {1148, 2068, 3948}
+
+
+def _dbapi(conn: Any) -> Any:
+    """Conexión PyMySQL subyacente (las del pool vienen envueltas)."""
+    return getattr(conn, "dbapi_connection", conn)
+
+
+def _celda(v: Any) -> str:
+    """Valor → campo TSV con el mismo texto que escribiría PyMySQL (NULL = \\N)."""
+    if v is None:
+        return r"\N"
+    if isinstance(v, float):
+        if math.isnan(v):
+            return r"\N"
+        return repr(v)
+    if isinstance(v, bool):
+        return "1" if v else "0"
+    s = str(v)
+    if "\\" in s or "\t" in s or "\n" in s:
+        s = s.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+    return s
+
+
+def _filas(df: pd.DataFrame) -> List[List[Any]]:
+    """Filas como tipos Python nativos, NaN → None."""
+    return df.astype(object).where(pd.notnull(df), None).values.tolist()
+
+
+def _cols(columnas: Sequence[str]) -> str:
+    return ", ".join(f"`{c}`" for c in columnas)
+
+
+def _load_data(conn: Any, tabla: str, columnas: Sequence[str], filas: List[List[Any]],
+               reemplazar: bool) -> None:
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", encoding="utf-8", newline="",
+                                     delete=False) as tmp:
+        tmp.writelines("\t".join(map(_celda, fila)) + "\n" for fila in filas)
+        ruta = tmp.name
+    try:
+        sql = (
+            f"LOAD DATA LOCAL INFILE {_dbapi(conn).escape(ruta)} "
+            f"{'REPLACE' if reemplazar else ''} INTO TABLE `{tabla}` CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+            f"({_cols(columnas)})"
+        )
+        with conn.cursor() as cur:
+            cur.execute(sql)
+    finally:
+        os.unlink(ruta)
+
+
+def _insert_por_lotes(conn: Any, tabla: str, columnas: Sequence[str], filas: List[List[Any]],
+                      reemplazar: bool, lote: int) -> None:
+    fila_sql = "(" + ", ".join(["%s"] * len(columnas)) + ")"
+    verbo = "REPLACE" if reemplazar else "INSERT"
+    with conn.cursor() as cur:
+        if es_sqlite(conn):
+            cur.executemany(f"{verbo} INTO `{tabla}` ({_cols(columnas)}) VALUES {fila_sql}", filas)
+            return
+        for i in range(0, len(filas), lote):
+            bloque = filas[i:i + lote]
+            sql = f"{verbo} INTO `{tabla}` ({_cols(columnas)}) VALUES " + ", ".join([fila_sql] * len(bloque))
+            cur.execute(sql, [v for fila in bloque for v in fila])
+
+
+def load_data_disponible(conn: Any) -> bool:
+    """LOAD DATA LOCAL habilitado por config y negociado por el cliente."""
+    raw = _dbapi(conn)
+    return DB_LOAD_DATA and bool(getattr(raw, "client_flag", 0) & CLIENT.LOCAL_FILES)
+
+
+def cargar_frame(conn: Any, tabla: str, df: pd.DataFrame, reemplazar: bool = False,
+                 lote: int = CARGA_LOTE) -> str:
+    """
+    Inserta `df` completo en `tabla` (que ya debe existir).
+    Devuelve el método usado: 'load_data', 'insert' o 'vacio'.
+    """
+    if df.empty:
+        return "vacio"
+    columnas = [str(c) for c in df.columns]
+    filas = _filas(df)
+
+    if load_data_disponible(conn):
+        try:
+            _load_data(conn, tabla, columnas, filas, reemplazar)
+            return "load_data"
+        except (pymysql.err.OperationalError, pymysql.err.InternalError) as e:
+            if not e.args or e.args[0] not in _ERRORES_LOAD_DATA:
+                raise
+            print(f"⚠️ LOAD DATA LOCAL no disponible ({e.args[0]}); uso INSERT por lotes.")
+
+    _insert_por_lotes(conn, tabla, columnas, filas, reemplazar, max(1, lote))
+    return "insert"
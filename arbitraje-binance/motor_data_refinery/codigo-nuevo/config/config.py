@@ -6,6 +6,7 @@ Config centralizada para el pipeline (Docker-friendly).
 from __future__ import annotations
 from pathlib import Path
 import importlib.util
+import os
 
 # ─────────── Rutas base ───────────
 CODIGO_DIR = Path(__file__).resolve().parents[1]     # .../<repo>/codigo
@@ -14,6 +15,9 @@ TEMP_DIR   = CODIGO_DIR / "temp"
 STATIC_DIR = CODIGO_DIR / "static"
 DATOS_DIR  = CODIGO_DIR / "datos"
 ESTRUCTURAL_DIR = DATOS_DIR / "estructural"
+SNAPSHOTS_DIR   = DATOS_DIR / "snapshots"
+CACHE_PASOS_DIR = DATOS_DIR / "cache_pasos"
+ABSORCION_DIR   = APP_DIR / "modulo_absorcion"
 
 def ensure_runtime_dirs() -> None:
     """Crea carpetas necesarias para importar módulos y exportar auditoría."""
@@ -21,6 +25,7 @@ def ensure_runtime_dirs() -> None:
     (TEMP_DIR / "__init__.py").touch(exist_ok=True)
     DATOS_DIR.mkdir(parents=True, exist_ok=True)
     ESTRUCTURAL_DIR.mkdir(parents=True, exist_ok=True)
+    SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
 
 # ─────────── Exchange / CCXT ───────────
 EXCHANGE_ID = "binance"
@@ -30,6 +35,19 @@ CCXT_OPTIONS = {
     "options": {"adjustForTimeDifference": True},
 }
 
+# Modo del exchange: "live" (CCXT real), "replay" (grabación local) o "grabar" (live + graba)
+EXCHANGE_MODO = os.getenv("EXCHANGE_MODO", "live").lower()
+EXCHANGE_REPLAY_DIR = Path(os.getenv("EXCHANGE_REPLAY_DIR", str(DATOS_DIR / "replay")))
+# Latencia inyectada en replay: ms fijos, o "grabada" para usar la medida al grabar
+EXCHANGE_REPLAY_LATENCIA_MS = os.getenv("EXCHANGE_REPLAY_LATENCIA_MS", "0")
+
+# ─────────── Feed WebSocket (bookTicker / miniTicker) ───────────
+BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443/stream")
+
+# ─────────── Snapshot de markets (load_markets compartido) ───────────
+# Segundos que un snapshot se considera vigente antes de volver a descargar.
+MARKETS_SNAPSHOT_TTL = int(os.getenv("MARKETS_SNAPSHOT_TTL", "3600"))
+
 # ─────────── Fuentes de schema ───────────
 # Obligatorio: schema manual estable
 SCHEMA_PRIMARY_PATH = STATIC_DIR / "schema_funcional.py"
@@ -39,6 +57,11 @@ SCHEMA_OUTPUT_PATH  = TEMP_DIR / "schema.py"
 # ─────────── Auditoría (export CSV de estructura) ───────────
 AUDIT_STRUCT_EXPORT = True  # ponelo en False si no querés CSVs en datos/estructural/
 
+# ─────────── Artefactos entre pasos (Parquet tipado + CSV legible) ───────────
+# Los pasos 6–12 escriben Parquet (config/artefactos.py); el CSV queda como export
+# para humanos. ARTEFACTOS_CSV=0 → solo Parquet (sin pyarrow siempre se escribe CSV).
+ARTEFACTOS_CSV = os.getenv("ARTEFACTOS_CSV", "1").strip().lower() not in ("0", "false", "no")
+
 def _import_module_from_path(path: Path):
     spec = importlib.util.spec_from_file_location(path.stem, path)
     if not spec or not spec.loader:
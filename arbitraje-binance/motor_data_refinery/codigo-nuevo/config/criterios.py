@@ -0,0 +1,226 @@
+# codigo/config/criterios.py
+"""
+Motor de criterios declarativos (static/criterios_filtrados.csv) por columnas.
+
+Cada criterio `campo → permitidos` se compila una vez a un `Criterio` con su
+bit. La evaluación normaliza cada columna sobre sus valores únicos (no por
+fila) y arma una máscara booleana por criterio; los fallos se acumulan en un
+entero por fila (`motivo_bits`, bit i = criterio i). El texto legible de
+`motivo_descartado` se genera recién al exportar, solo para las filas
+descartadas.
+
+Pushdown: `compilar_sql` traduce a un WHERE parametrizado los criterios que la
+DB puede evaluar con la misma semántica (igualdad sobre texto y booleanos
+TINYINT(1)); los demás (NOT_FIAT contra static/fiat.py, columnas numéricas)
+quedan como residuales para `evaluar`. Las condiciones son `col IN (…)` sobre
+la columna desnuda (sargables: usan los índices de `ddl.INDICES_CRITERIOS`):
+el texto llega recortado desde la carga (`ddl.adaptar_frame`) y la collation
+de la tabla no distingue mayúsculas (MariaDB por defecto; NOCASE en SQLite).
+`where` filtra los que pasan (NULL no pasa); `where_rechazo` es su complemento
+exacto, con COALESCE(…, 0) para que NULL sí aparezca entre los descartados.
+
+Uso:
+    compilados = compilar(criterios)
+    bits = evaluar(df, compilados, fiat_tokens)
+    funcional, descartados = df[bits == 0], df[bits != 0].assign(motivo_bits=bits[bits != 0])
+    descartados = con_motivo_texto(descartados, compilados)
+
+    filtro = compilar_sql(compilados, {"type": "varchar(16)", "active": "tinyint(1)", ...})
+    cur.execute(f"SELECT * FROM `tabla_unica` WHERE {filtro.where}", filtro.args)
+    cur.execute(f"SELECT * FROM `tabla_unica` WHERE {filtro.where_rechazo}", filtro.args)
+    bits = evaluar(df, filtro.residuales, fiat_tokens)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+NOT_FIAT = "NOT_FIAT"
+COLUMNA_BITS = "motivo_bits"
+COLUMNA_MOTIVO = "motivo_descartado"
+MAX_CRITERIOS = 63  # bits de un int64
+
+_VERDADEROS = {"true", "1", "yes"}
+_FALSOS = {"false", "0", "no"}
+
+
+@dataclass(frozen=True)
+class Criterio:
+    campo: str
+    permitidos: FrozenSet[str]
+    bit: int
+
+    @property
+    def not_fiat(self) -> bool:
+        return NOT_FIAT in self.permitidos
+
+    @property
+    def mascara_bit(self) -> int:
+        return 1 << self.bit
+
+
+def normalizar_valor(valor: Any) -> str:
+    """
+    Normaliza valores para comparar contra criterios.
+    - True equivalentes: "true", "1", "yes"
+    - False equivalentes: "false", "0", "no"
+    - Todo lo demás: upper
+    """
+    v = str(valor).strip().lower()
+    if v in _VERDADEROS:
+        return "TRUE"
+    if v in _FALSOS:
+        return "FALSE"
+    return v.upper()
+
+
+def normalizar_serie(s: pd.Series) -> np.ndarray:
+    """
+    `normalizar_valor` sobre una columna entera: se evalúa una vez por texto único.
+    Se factoriza sobre `str(valor)` (lo único que mira `normalizar_valor`): sobre los
+    valores crudos pandas agruparía True/1/1.0 y None/NaN en el mismo código.
+    """
+    codigos, unicos = pd.factorize(s.map(str), use_na_sentinel=False)
+    return np.array([normalizar_valor(v) for v in unicos], dtype=object)[codigos]
+
+
+def compilar(criterios: Dict[str, Set[str]]) -> List[Criterio]:
+    """Criterios ya normalizados (campo → valores permitidos) → lista con un bit cada uno."""
+    if len(criterios) > MAX_CRITERIOS:
+        raise ValueError(f"❌ Máximo {MAX_CRITERIOS} criterios (hay {len(criterios)}).")
+    return [Criterio(campo, frozenset(p), i) for i, (campo, p) in enumerate(criterios.items())]
+
+
+def evaluar(df: pd.DataFrame, compilados: Iterable[Criterio], fiat: Iterable[str]) -> np.ndarray:
+    """Bits de rechazo por fila (0 = pasa todos). Campos ausentes en `df` no se evalúan."""
+    fiat_norm = list({t.upper() for t in fiat})
+    bits = np.zeros(len(df), dtype=np.int64)
+    for c in compilados:
+        if c.campo not in df.columns:
+            continue
+        valores = normalizar_serie(df[c.campo])
+        if c.not_fiat:
+            falla = pd.Series(valores).isin(fiat_norm).to_numpy()
+        else:
+            falla = ~pd.Series(valores).isin(list(c.permitidos)).to_numpy()
+        bits[falla] |= c.mascara_bit
+    return bits
+
+
+def separar(df: pd.DataFrame, bits: np.ndarray) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(funcional, descartados con `motivo_bits`)."""
+    ok = bits == 0
+    return df[ok], df[~ok].assign(**{COLUMNA_BITS: bits[~ok]})
+
+
+def motivos_texto(df: pd.DataFrame, bits: np.ndarray, compilados: Iterable[Criterio]) -> np.ndarray:
+    """Texto de `motivo_descartado` para cada fila de `df` a partir de sus bits."""
+    texto = np.full(len(df), "", dtype=object)
+    for c in compilados:
+        marcadas = (bits & c.mascara_bit) != 0
+        if not marcadas.any() or c.campo not in df.columns:
+            continue
+        if c.not_fiat:
+            msg = np.full(int(marcadas.sum()), f"{c.campo}=FIAT", dtype=object)
+        else:
+            valores = normalizar_serie(df[c.campo][marcadas])
+            msg = np.array([f"{c.campo}='{v}' no permitido" for v in valores], dtype=object)
+        previo = texto[marcadas]
+        texto[marcadas] = np.where(previo == "", msg, previo + "; " + msg)
+    return texto
+
+
+def con_motivo_texto(df: pd.DataFrame, compilados: Iterable[Criterio]) -> pd.DataFrame:
+    """Reemplaza `motivo_bits` por `motivo_descartado` (texto) al final; frames sin bits pasan tal cual."""
+    if COLUMNA_BITS not in df.columns:
+        return df
+    bits = df[COLUMNA_BITS].to_numpy(dtype=np.int64)
+    out = df.drop(columns=[COLUMNA_BITS])
+    out[COLUMNA_MOTIVO] = motivos_texto(out, bits, list(compilados))
+    return out
+
+
+# ───── pushdown a SQL ─────
+@dataclass
+class Pushdown:
+    where: str
+    args: List[Any]
+    where_rechazo: str       # NOT (where) con NULL como falla (mismos args que `where`)
+    bits_sql: str            # expresión con los bits de los criterios en SQL (para los descartados)
+    bits_args: List[Any]
+    en_sql: List[Criterio]
+    residuales: List[Criterio]
+
+
+def _lista(valores: Iterable[Any]) -> str:
+    return ", ".join(["%s"] * len(list(valores)))
+
+
+def condicion_sql(c: Criterio, tipo_sql: str) -> Optional[Tuple[str, List[Any]]]:
+    """
+    (condición, args) equivalente a `evaluar` para `c`; None si debe quedar en
+    Python. La condición puede dar NULL (columna NULL): `compilar_sql` decide.
+    """
+    if c.not_fiat:
+        return None
+    col = f"`{c.campo}`"
+    otros = sorted(c.permitidos - {"TRUE", "FALSE"})
+    args: List[Any] = []
+    tipo = tipo_sql.lower()
+
+    if tipo.startswith("tinyint(1)"):
+        if otros:
+            return None
+        args = [valor for etiqueta, valor in (("TRUE", 1), ("FALSE", 0)) if etiqueta in c.permitidos]
+    elif tipo.startswith(("varchar", "char", "text")):
+        if {"NAN", "NONE"} & set(otros):
+            return None  # NULL se normaliza a texto en Python: no hay equivalente limpio
+        for etiqueta, conjunto in (("TRUE", _VERDADEROS), ("FALSE", _FALSOS)):
+            if etiqueta in c.permitidos:
+                args.extend(sorted(conjunto))
+        args.extend(otros)
+    else:
+        return None
+
+    if not args:
+        return "0", []
+    return f"{col} IN ({_lista(args)})", args
+
+
+def compilar_sql(compilados: Iterable[Criterio], tipos_sql: Dict[str, str]) -> Pushdown:
+    """
+    Separa los criterios en WHERE parametrizado y residuales. `tipos_sql` son
+    los tipos de la tabla (SHOW COLUMNS); campos ausentes no filtran (igual que `evaluar`).
+    """
+    conds: List[str] = []
+    args: List[Any] = []
+    bits: List[str] = []
+    bits_args: List[Any] = []
+    en_sql: List[Criterio] = []
+    residuales: List[Criterio] = []
+    for c in compilados:
+        if c.campo not in tipos_sql:
+            continue
+        traducida = condicion_sql(c, tipos_sql[c.campo])
+        if traducida is None:
+            residuales.append(c)
+            continue
+        cond, cargs = traducida
+        conds.append(cond)
+        args.extend(cargs)
+        bits.append(f"(CASE WHEN {cond} THEN 0 ELSE {c.mascara_bit} END)")  # NULL → ELSE
+        bits_args.extend(cargs)
+        en_sql.append(c)
+    return Pushdown(
+        where=" AND ".join(conds) or "1 = 1",
+        args=args,
+        where_rechazo="NOT ({})".format(" AND ".join(f"COALESCE({c}, 0)" for c in conds) or "1 = 1"),
+        bits_sql=" + ".join(bits) or "0",
+        bits_args=bits_args,
+        en_sql=en_sql,
+        residuales=residuales,
+    )
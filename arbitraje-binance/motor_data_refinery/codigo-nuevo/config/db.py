@@ -1,25 +1,159 @@
 # codigo/config/db.py
 """
-Conector DB centralizado.
+Conector DB centralizado: un engine SQLAlchemy con pool por perfil de entorno.
+
+- Perfil = prefijo de variables: "DB" (DB_HOST, DB_USER, ...) o "DB2" (DB2_*).
+- Pool con pre-ping (descarta conexiones muertas antes de entregarlas) y
+  reciclado periódico; tamaño por DB_POOL_SIZE / DB_MAX_OVERFLOW.
+- `connect()` entrega una conexión PyMySQL del pool con cursores dict;
+  `close()` la devuelve al pool en vez de cerrarla.
+- `conexion()` es la forma recomendada: commit al salir, rollback si hay error.
+- Backend por perfil: {prefijo}_BACKEND (o DB_BACKEND) = "mysql" (default) | "sqlite".
+  Con "sqlite" el perfil es un archivo embebido en WAL ({prefijo}_SQLITE_PATH,
+  default datos/refineria_<perfil>.sqlite) y la conexión traduce el SQL de
+  MariaDB que usan los pasos (ver config/db_sqlite.py).
+
+Uso:
+    with conexion() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT ...")
+    df = pd.read_sql(query, motor())
 """
 from __future__ import annotations
+
 import os
-from typing import Any, Dict
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+from urllib.parse import quote_plus
+
 import pymysql
 from dotenv import load_dotenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+from .config import DATOS_DIR
+from . import db_sqlite
 
 # Carga variables de entorno
 load_dotenv()
 
-def get_db_config() -> Dict[str, Any]:
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # segundos (< wait_timeout del server)
+DB_LOCAL_INFILE = os.getenv("DB_LOCAL_INFILE", "1") == "1"   # habilita LOAD DATA LOCAL (config/carga.py)
+
+BACKENDS = ("mysql", "sqlite")
+
+_motores: Dict[str, Engine] = {}
+_lock = threading.Lock()
+
+
+def get_db_config(prefijo: str = "DB") -> Dict[str, Any]:
     return {
-        "host": os.getenv("DB_HOST", "localhost"),
-        "user": os.getenv("DB_USER", "root"),
-        "password": os.getenv("DB_PASSWORD", ""),
-        "database": os.getenv("DB_NAME", ""),
+        "host": os.getenv(f"{prefijo}_HOST", "localhost"),
+        "port": int(os.getenv(f"{prefijo}_PORT", "3306")),
+        "user": os.getenv(f"{prefijo}_USER", "root"),
+        "password": os.getenv(f"{prefijo}_PASSWORD", ""),
+        "database": os.getenv(f"{prefijo}_NAME", ""),
         "charset": "utf8mb4",
         "cursorclass": pymysql.cursors.DictCursor,
     }
 
-def connect():
-    return pymysql.connect(**get_db_config())
+
+def backend(prefijo: str = "DB") -> str:
+    valor = (os.getenv(f"{prefijo}_BACKEND") or os.getenv("DB_BACKEND") or "mysql").strip().lower()
+    if valor not in BACKENDS:
+        raise ValueError(f"❌ {prefijo}_BACKEND='{valor}' no soportado (usar {' | '.join(BACKENDS)}).")
+    return valor
+
+
+def ruta_sqlite(prefijo: str = "DB") -> str:
+    return os.getenv(f"{prefijo}_SQLITE_PATH") or str(DATOS_DIR / f"refineria_{prefijo.lower()}.sqlite")
+
+
+def _al_devolver(dbapi_conn: Any, _registro: Any) -> None:
+    # La conexión vuelve al pool con el estado por defecto que espera SQLAlchemy
+    dbapi_conn.cursorclass = pymysql.cursors.Cursor
+    try:
+        dbapi_conn.autocommit(False)
+    except Exception:
+        pass
+
+
+def motor(prefijo: str = "DB") -> Engine:
+    """Engine compartido (uno por perfil y proceso)."""
+    with _lock:
+        eng = _motores.get(prefijo)
+        if eng is None and backend(prefijo) == "sqlite":
+            ruta = ruta_sqlite(prefijo)
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+            eng = create_engine(
+                f"sqlite:///{ruta}",
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                connect_args={"check_same_thread": False, "timeout": 30},
+            )
+            event.listen(eng, "connect", db_sqlite.configurar)
+            event.listen(eng, "checkin", db_sqlite.al_devolver)
+            _motores[prefijo] = eng
+        elif eng is None:
+            cfg = get_db_config(prefijo)
+            url = (
+                f"mysql+pymysql://{quote_plus(cfg['user'] or '')}:{quote_plus(cfg['password'] or '')}"
+                f"@{cfg['host']}:{cfg['port']}/{cfg['database']}?charset={cfg['charset']}"
+            )
+            # Sin cursorclass en connect_args: SQLAlchemy necesita cursores tupla.
+            eng = create_engine(
+                url,
+                pool_pre_ping=True,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_recycle=DB_POOL_RECYCLE,
+                connect_args={"local_infile": DB_LOCAL_INFILE},
+            )
+            event.listen(eng, "checkin", _al_devolver)
+            _motores[prefijo] = eng
+        return eng
+
+
+def connect(prefijo: str = "DB", autocommit: bool = False):
+    """
+    Conexión del pool con la misma interfaz que `pymysql.connect(**get_db_config())`
+    (cursores dict, commit/rollback). `close()` la devuelve al pool.
+    """
+    conn = motor(prefijo).raw_connection()
+    if backend(prefijo) == "sqlite":
+        conn = db_sqlite.ConexionSQLite(conn)
+        conn.autocommit(autocommit)
+        return conn
+    conn.dbapi_connection.cursorclass = pymysql.cursors.DictCursor
+    if autocommit:
+        conn.dbapi_connection.autocommit(True)
+    return conn
+
+
+@contextmanager
+def conexion(prefijo: str = "DB", autocommit: bool = False) -> Iterator[Any]:
+    """Checkout con contexto: commit al salir, rollback ante error, siempre devuelve al pool."""
+    conn = connect(prefijo, autocommit=autocommit)
+    try:
+        yield conn
+        if not autocommit:
+            conn.commit()
+    except BaseException:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        conn.close()
+
+
+def cerrar_pools() -> None:
+    """Cierra todas las conexiones ociosas de todos los perfiles."""
+    with _lock:
+        for eng in _motores.values():
+            eng.dispose()
+        _motores.clear()
@@ -0,0 +1,208 @@
+# codigo/config/db_sqlite.py
+"""
+Backend SQLite embebido (DB_BACKEND=sqlite) para corridas de un solo nodo u offline.
+
+`ConexionSQLite` envuelve la conexión sqlite3 del pool y expone la misma
+interfaz que usan los pasos con PyMySQL: `with conn.cursor() as cur`, `%s` como
+placeholder, filas dict (o tupla si se pide un cursor no-dict, p.ej. SSCursor),
+commit/rollback/close. Las sentencias propias de MariaDB que usa la refinería se
+traducen al vuelo:
+
+  SHOW [FULL] TABLES [LIKE %s]          → sqlite_master (tablas y vistas)
+  SHOW COLUMNS FROM t                   → pragma_table_info (Field, Type, Key)
+  ENGINE=… / CHARSET=… / CHARACTER SET  → se descartan
+  `c` VARCHAR(n) / TEXT en CREATE TABLE → + COLLATE NOCASE (compara como la
+                                          collation _ci por defecto de MariaDB)
+  ON DUPLICATE KEY UPDATE c=VALUES(c)   → ON CONFLICT DO UPDATE SET c=excluded.c
+  INSERT IGNORE                         → INSERT OR IGNORE
+  RENAME TABLE a TO b, c TO d           → ALTER TABLE … RENAME dentro de un SAVEPOINT
+                                          (atómico; los índices idx_<a>_* pasan a idx_<b>_*)
+
+El archivo se abre en modo WAL (lectores concurrentes con un escritor).
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import re
+import sqlite3
+from decimal import Decimal
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pymysql
+
+# Tipos que PyMySQL acepta y sqlite3 no: mismo texto/valor que guardaría MariaDB
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(_dt.datetime, lambda d: d.isoformat(" "))
+sqlite3.register_adapter(_dt.date, lambda d: d.isoformat())
+sqlite3.register_adapter(pd.Timestamp, lambda t: t.isoformat(" "))
+sqlite3.register_adapter(np.int64, int)
+sqlite3.register_adapter(np.int32, int)
+sqlite3.register_adapter(np.bool_, int)
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=30000",
+)
+
+_RE_SHOW_TABLES = re.compile(r"^\s*SHOW\s+(FULL\s+)?TABLES(?:\s+LIKE\s+(%s))?\s*;?\s*$", re.I)
+_RE_SHOW_COLUMNS = re.compile(r"^\s*SHOW\s+COLUMNS\s+FROM\s+`?(\w+)`?\s*;?\s*$", re.I)
+_RE_RENAME = re.compile(r"^\s*RENAME\s+TABLE\s+(.+?)\s*;?\s*$", re.I | re.S)
+_RE_PAR_RENAME = re.compile(r"`?(\w+)`?\s+TO\s+`?(\w+)`?", re.I)
+_RE_OPCIONES_TABLA = re.compile(
+    r"\s*(?:ENGINE\s*=\s*\w+|DEFAULT\s+CHARSET\s*=\s*\w+|(?:DEFAULT\s+)?CHARACTER\s+SET\s*=?\s*\w+)", re.I
+)
+_RE_CREATE_TABLE = re.compile(r"^\s*CREATE\s+TABLE\b", re.I)
+_RE_COLUMNA_TEXTO = re.compile(r"(`\s+(?:VARCHAR\s*\(\s*\d+\s*\)|TEXT))(?!\s+COLLATE)", re.I)
+_RE_ON_DUPLICATE = re.compile(r"ON\s+DUPLICATE\s+KEY\s+UPDATE", re.I)
+_RE_INSERT_IGNORE = re.compile(r"^\s*INSERT\s+IGNORE\b", re.I)
+_RE_VALUES_FN = re.compile(r"VALUES\s*\(\s*`?(\w+)`?\s*\)", re.I)
+
+
+def configurar(dbapi_conn: sqlite3.Connection, _registro: Any = None) -> None:
+    """Listener `connect` del engine: WAL y timeouts por conexión."""
+    for pragma in PRAGMAS:
+        dbapi_conn.execute(pragma)
+
+
+def traducir(sql: str, con_args: bool) -> str:
+    """Sentencia MariaDB de la refinería → SQLite (sin RENAME, que se ejecuta aparte)."""
+    m = _RE_SHOW_TABLES.match(sql)
+    if m:
+        tipo = ", CASE type WHEN 'view' THEN 'VIEW' ELSE 'BASE TABLE' END AS Table_type" if m.group(1) else ""
+        filtro = " AND name LIKE %s ESCAPE '\\'" if m.group(2) else ""
+        sql = (f"SELECT name AS Tables_in_db{tipo} FROM sqlite_master "
+               f"WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\'{filtro} ORDER BY name")
+    else:
+        m = _RE_SHOW_COLUMNS.match(sql)
+        if m:
+            sql = (f"SELECT name AS Field, type AS Type, CASE WHEN pk > 0 THEN 'PRI' ELSE '' END AS `Key` "
+                   f"FROM pragma_table_info('{m.group(1)}') ORDER BY cid")
+        else:
+            sql = _RE_OPCIONES_TABLA.sub("", sql)
+            if _RE_CREATE_TABLE.match(sql):
+                sql = _RE_COLUMNA_TEXTO.sub(r"\1 COLLATE NOCASE", sql)
+            sql = _RE_INSERT_IGNORE.sub("INSERT OR IGNORE", sql)
+            partes = _RE_ON_DUPLICATE.split(sql, maxsplit=1)
+            if len(partes) == 2:
+                sql = partes[0] + "ON CONFLICT DO UPDATE SET" + _RE_VALUES_FN.sub(r"excluded.\1", partes[1])
+    if con_args:
+        # mismo criterio que PyMySQL: el formateo con % solo aplica si hay args
+        sql = sql.replace("%s", "?").replace("%%", "%")
+    return sql.strip().rstrip(";")
+
+
+class CursorSQLite:
+    def __init__(self, raw: sqlite3.Connection, filas_dict: bool = True) -> None:
+        self._raw = raw
+        self._cur = raw.cursor()
+        self._dict = filas_dict
+
+    # ───── ejecución ─────
+    def execute(self, sql: str, args: Optional[Sequence[Any]] = None) -> int:
+        m = _RE_RENAME.match(sql)
+        if m:
+            self._renombrar(_RE_PAR_RENAME.findall(m.group(1)))
+            return 0
+        self._cur.execute(traducir(sql, args is not None), tuple(args) if args is not None else ())
+        return self._cur.rowcount
+
+    def executemany(self, sql: str, filas: Iterable[Sequence[Any]]) -> int:
+        self._cur.executemany(traducir(sql, True), [tuple(f) for f in filas])
+        return self._cur.rowcount
+
+    def _renombrar(self, pares: List[Tuple[str, str]]) -> None:
+        """RENAME TABLE múltiple como una unidad; arrastra los índices nombrados idx_<tabla>_*."""
+        c = self._raw
+        c.execute("SAVEPOINT renombrar")
+        try:
+            for viejo, nuevo in pares:
+                c.execute(f'ALTER TABLE "{viejo}" RENAME TO "{nuevo}"')
+                prefijo = f"idx_{viejo}_"
+                indices = c.execute(
+                    "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                    (nuevo,),
+                ).fetchall()
+                for nombre, sql in indices:
+                    if nombre.startswith(prefijo):
+                        c.execute(f'DROP INDEX "{nombre}"')
+                        c.execute(sql.replace(nombre, f"idx_{nuevo}_" + nombre[len(prefijo):], 1))
+            c.execute("RELEASE renombrar")
+        except BaseException:
+            c.execute("ROLLBACK TO renombrar")
+            c.execute("RELEASE renombrar")
+            raise
+
+    # ───── lectura ─────
+    def _fila(self, fila: Optional[tuple]) -> Any:
+        if fila is None or not self._dict:
+            return fila
+        return {d[0]: v for d, v in zip(self._cur.description, fila)}
+
+    def fetchone(self) -> Any:
+        return self._fila(self._cur.fetchone())
+
+    def fetchmany(self, n: int = 1) -> List[Any]:
+        return [self._fila(f) for f in self._cur.fetchmany(n)]
+
+    def fetchall(self) -> List[Any]:
+        return [self._fila(f) for f in self._cur.fetchall()]
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    @property
+    def rowcount(self) -> int:
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._cur.lastrowid
+
+    def close(self) -> None:
+        self._cur.close()
+
+    def __enter__(self) -> "CursorSQLite":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class ConexionSQLite:
+    """Conexión del pool con la interfaz PyMySQL que usan los pasos."""
+
+    def __init__(self, fairy: Any) -> None:
+        self._fairy = fairy
+        self.dbapi_connection: sqlite3.Connection = fairy.dbapi_connection
+
+    def cursor(self, cursorclass: Optional[type] = None) -> CursorSQLite:
+        filas_dict = cursorclass is None or issubclass(cursorclass, pymysql.cursors.DictCursorMixin)
+        return CursorSQLite(self.dbapi_connection, filas_dict)
+
+    def autocommit(self, valor: bool) -> None:
+        self.dbapi_connection.isolation_level = None if valor else ""
+
+    def commit(self) -> None:
+        self.dbapi_connection.commit()
+
+    def rollback(self) -> None:
+        self.dbapi_connection.rollback()
+
+    def close(self) -> None:
+        self._fairy.close()  # vuelve al pool
+
+
+def al_devolver(dbapi_conn: sqlite3.Connection, _registro: Any) -> None:
+    dbapi_conn.isolation_level = ""
+
+
+def es_sqlite(conn: Any) -> bool:
+    return isinstance(conn, ConexionSQLite)
@@ -0,0 +1,249 @@
+# codigo/config/ddl.py
+"""
+DDL tipado a partir de `static/schema_funcional.py`.
+
+Tipos declarados → columnas SQL:
+  float → DOUBLE        (round-trip exacto del float de CCXT, sin re-parseo)
+  int   → BIGINT
+  bool  → TINYINT(1)
+  str   → VARCHAR(n)    (n: tamaño declarado en VARCHAR_BASE o el máximo observado,
+                         redondeado a potencia de 2; > 255 → TEXT)
+  row_hash → BIGINT (huella por fila del upsert delta, config/delta.py)
+Columnas fuera del schema (auditoría, motivo_descartado, campos no declarados) siguen en TEXT.
+
+Tablas persistentes (`si_no_existe=True`, las `sym_*` del upsert delta): nunca
+se reconstruyen, así que no se dimensionan por lo observado en la primera carga.
+Las columnas clave (VARCHAR_BASE) van a VARCHAR(VARCHAR_MAX) y el resto de los
+`str` a TEXT. `ensanchar` amplía en MariaDB los VARCHAR de tablas ya creadas
+cuando llega un valor más largo que el declarado (evita "Data too long").
+
+Índices secundarios: `quote` y `(base, quote)`; el compuesto también sirve
+las búsquedas por `base` sola (prefijo izquierdo), así que no se duplica.
+`tabla_unica` suma INDICES_CRITERIOS: las columnas que el paso 5 filtra en el
+WHERE (config/criterios.py, `col IN (…)` sobre la columna desnuda). Por eso
+`adaptar_frame` recorta los `str` al cargar: la comparación queda en manos de
+la collation (sin mayúsculas/minúsculas) y del índice, sin TRIM/UPPER por fila.
+Se emiten como sentencias `CREATE INDEX IF NOT EXISTS` aparte (MariaDB y SQLite).
+Para las tablas persistentes los índices salen de los tipos *reales* de la tabla
+(`asegurar_indices`), no del DDL generado: una `sym_*` previa puede tener otro DDL.
+
+Uso:
+    tipos = tipos_columnas()
+    df = adaptar_frame(df, tipos)
+    create_sql, indices = generar_ddl("tabla_unica", df, tipos, indices=INDICES + INDICES_CRITERIOS)
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import load_schema_or_abort
+from .db_sqlite import es_sqlite
+from .delta import columnas_declaradas
+from .extractor import claves_de_schema
+
+TIPOS_SQL = {"float": "DOUBLE", "int": "BIGINT", "bool": "TINYINT(1)", "huella": "BIGINT"}
+
+# Columnas estructurales (no salen del schema) y tamaño mínimo de los VARCHAR conocidos
+TIPOS_FIJOS = {"exchange": "str", "symbol_id": "str", "symbol": "str", "base": "str", "quote": "str",
+               "row_hash": "huella"}
+VARCHAR_BASE = {"exchange": 32, "symbol_id": 96, "symbol": 64, "base": 32, "quote": 32}
+VARCHAR_DEFAULT = 64
+VARCHAR_MAX = 255
+
+INDICES: Tuple[Tuple[str, ...], ...] = (("quote",), ("base", "quote"))
+# Columnas del pushdown de criterios del paso 5 (static/criterios_filtrados.csv)
+INDICES_CRITERIOS: Tuple[Tuple[str, ...], ...] = (("type",), ("active",), ("info_status",))
+# Tipos indexables sin largo de prefijo (TEXT no)
+_INDEXABLES = ("VARCHAR", "TINYINT", "BIGINT")
+
+_VERDADEROS = {"true", "1", "1.0", "yes"}
+_FALSOS = {"false", "0", "0.0", "no"}
+
+
+def _sanitizar(nombre: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", nombre)
+
+
+def tipos_de_schema(schema: Dict[str, Any]) -> Dict[str, str]:
+    """Columna aplanada (como la nombran los pasos 2/4/5) → tipo declarado."""
+    tipos: Dict[str, str] = {}
+    for clave, ruta in claves_de_schema(schema):
+        nodo: Any = schema
+        for paso in ruta:
+            nodo = nodo[paso]
+        if isinstance(nodo, str):
+            tipos[_sanitizar(clave)] = nodo
+    return {**tipos, **TIPOS_FIJOS}
+
+
+@lru_cache(maxsize=1)
+def tipos_columnas() -> Dict[str, str]:
+    """Tipos del schema funcional vigente (se carga una vez por proceso)."""
+    return tipos_de_schema(load_schema_or_abort())
+
+
+# ───── adaptación de valores ─────
+def _a_bool(v: Any) -> Optional[int]:
+    if v is None or (isinstance(v, float) and np.isnan(v)) or v is pd.NA:
+        return None
+    if isinstance(v, (bool, np.bool_)):
+        return int(v)
+    s = str(v).strip().lower()
+    if s in _VERDADEROS:
+        return 1
+    if s in _FALSOS:
+        return 0
+    return None
+
+
+def adaptar_frame(df: pd.DataFrame, tipos: Dict[str, str]) -> pd.DataFrame:
+    """
+    Convierte cada columna tipada al valor que espera su columna SQL
+    (bool → 0/1, numéricos → float/int, str recortado, NaN → None). Valores no
+    convertibles → NULL.
+    """
+    out = df.copy()
+    for col in out.columns:
+        tipo = tipos.get(col)
+        if tipo == "str":
+            out[col] = [v.strip() if isinstance(v, str) else v for v in out[col].tolist()]
+        elif tipo == "bool":
+            out[col] = [_a_bool(v) for v in out[col].tolist()]
+        elif tipo == "float":
+            out[col] = pd.to_numeric(out[col], errors="coerce")
+        elif tipo == "int":
+            out[col] = pd.to_numeric(out[col], errors="coerce").astype("Int64")
+    return out.astype(object).where(pd.notnull(out), None)
+
+
+# ───── DDL ─────
+def _largo(serie: Optional[pd.Series]) -> int:
+    if serie is None or not len(serie):
+        return 0
+    return int(serie.dropna().astype(str).str.len().max() or 0)
+
+
+def _varchar(col: str, serie: Optional[pd.Series], persistente: bool = False) -> str:
+    if persistente:
+        return f"VARCHAR({VARCHAR_MAX})" if col in VARCHAR_BASE else "TEXT"
+    n = VARCHAR_BASE.get(col, VARCHAR_DEFAULT)
+    largo = _largo(serie)
+    while n < largo:
+        n *= 2
+    return "TEXT" if n > VARCHAR_MAX else f"VARCHAR({n})"
+
+
+def tipo_sql(col: str, tipos: Dict[str, str], serie: Optional[pd.Series] = None,
+             persistente: bool = False) -> str:
+    tipo = tipos.get(col)
+    if tipo in TIPOS_SQL:
+        return TIPOS_SQL[tipo]
+    if tipo == "str":
+        return _varchar(col, serie, persistente)
+    return "TEXT"
+
+
+def generar_ddl(
+    tabla: str,
+    df: pd.DataFrame,
+    tipos: Dict[str, str],
+    pk: Optional[str] = "symbol_id",
+    si_no_existe: bool = False,
+    indices: Tuple[Tuple[str, ...], ...] = INDICES,
+) -> Tuple[str, List[str]]:
+    """(CREATE TABLE, [CREATE INDEX ...]) para las columnas de `df`."""
+    sql = {str(c): tipo_sql(str(c), tipos, df[c], persistente=si_no_existe) for c in df.columns}
+    defs = [f"`{c}` {t}" for c, t in sql.items()]
+    if pk and pk in sql:
+        defs.append(f"PRIMARY KEY (`{pk}`)")
+
+    create_sql = "CREATE TABLE {}`{}` (\n    {}\n) CHARACTER SET utf8mb4;".format(
+        "IF NOT EXISTS " if si_no_existe else "", tabla, ",\n    ".join(defs)
+    )
+    return create_sql, indices_para(tabla, sql, indices)
+
+
+def indices_para(tabla: str, tipos_sql: Dict[str, str],
+                 indices: Tuple[Tuple[str, ...], ...] = INDICES) -> List[str]:
+    """Índices secundarios aplicables (solo sobre columnas presentes de tipo indexable)."""
+    out: List[str] = []
+    for idx in indices:
+        if all(tipos_sql.get(c, "").upper().startswith(_INDEXABLES) for c in idx):
+            nombre = f"idx_{tabla}_{'_'.join(idx)}"[:64]
+            out.append(
+                f"CREATE INDEX IF NOT EXISTS `{nombre}` ON `{tabla}` ({', '.join(f'`{c}`' for c in idx)});"
+            )
+    return out
+
+
+_VARCHAR = re.compile(r"varchar\((\d+)\)", re.IGNORECASE)
+_TEXTO = re.compile(r"(tiny|medium|long)?text", re.IGNORECASE)
+
+
+def asegurar_indices(conn: Any, tabla: str,
+                     indices: Tuple[Tuple[str, ...], ...] = INDICES) -> List[str]:
+    """
+    Crea los índices secundarios según los tipos reales de `tabla`, que puede
+    existir de antes con otro DDL (`CREATE TABLE IF NOT EXISTS` no la toca; las
+    `sym_*` de la línea base tienen todo en TEXT). En MariaDB las columnas clave
+    (VARCHAR_BASE) en TEXT pasan a VARCHAR(VARCHAR_MAX) si sus valores caben; si
+    no, el índice se omite (TEXT sin largo de prefijo → error 1170). SQLite
+    indexa cualquier tipo. Devuelve las sentencias ejecutadas.
+    """
+    tipos = columnas_declaradas(conn, tabla)
+    sqlite = es_sqlite(conn)
+    if not sqlite:
+        for col in sorted({c for idx in indices for c in idx}):
+            tipo = tipos.get(col, "")
+            if col not in VARCHAR_BASE or not _TEXTO.fullmatch(tipo.strip()):
+                continue
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT MAX(CHAR_LENGTH(`{col}`)) AS largo FROM `{tabla}`")
+                fila = cur.fetchone()
+            largo = int((fila["largo"] if isinstance(fila, dict) else fila[0]) or 0) if fila else 0
+            if largo > VARCHAR_MAX:
+                print(f"⚠️ `{tabla}`.`{col}` queda en {tipo} (valor de {largo} caracteres): sin índice")
+                continue
+            nuevo = f"VARCHAR({VARCHAR_MAX})"
+            with conn.cursor() as cur:
+                cur.execute(f"ALTER TABLE `{tabla}` MODIFY `{col}` {nuevo}")
+            print(f"↔️ `{tabla}`.`{col}`: {tipo} → {nuevo} (indexable)")
+            tipos[col] = nuevo
+    sentencias = indices_para(tabla, {c: "VARCHAR" for c in tipos} if sqlite else tipos, indices)
+    with conn.cursor() as cur:
+        for sql in sentencias:
+            cur.execute(sql)
+    return sentencias
+
+
+def ensanchar(conn: Any, tabla: str, df: pd.DataFrame) -> List[str]:
+    """
+    Amplía los VARCHAR(n) de una tabla existente donde `df` trae valores más
+    largos que n (potencia de 2 siguiente; > VARCHAR_MAX → TEXT). Solo MariaDB:
+    SQLite no aplica el largo de VARCHAR. Devuelve las columnas modificadas.
+    """
+    if es_sqlite(conn):
+        return []
+    cambiadas: List[str] = []
+    for col, tipo in columnas_declaradas(conn, tabla).items():
+        m = _VARCHAR.fullmatch(tipo.strip())
+        if not m or col not in df.columns:
+            continue
+        n = int(m.group(1))
+        largo = _largo(df[col])
+        if largo <= n:
+            continue
+        while n < largo:
+            n *= 2
+        nuevo = "TEXT" if n > VARCHAR_MAX else f"VARCHAR({n})"
+        with conn.cursor() as cur:
+            cur.execute(f"ALTER TABLE `{tabla}` MODIFY `{col}` {nuevo}")
+        print(f"↔️ `{tabla}`.`{col}`: {tipo} → {nuevo} (valor de {largo} caracteres)")
+        cambiadas.append(col)
+    return cambiadas
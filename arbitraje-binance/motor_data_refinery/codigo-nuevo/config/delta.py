@@ -0,0 +1,134 @@
+# codigo/config/delta.py
+"""
+Upsert delta para tablas de estructura (`sym_*`).
+
+Cada fila guarda una huella de su contenido (`row_hash`, BIGINT con signo: cabe igual en MariaDB y SQLite). En
+cada corrida se lee solo (symbol_id, row_hash) de la tabla, se compara contra
+las filas entrantes y se escriben únicamente:
+  nuevas     → símbolos que no estaban        (REPLACE vía carga masiva)
+  cambiadas  → huella distinta                (REPLACE vía carga masiva)
+  borradas   → símbolos que ya no vienen      (DELETE por lotes)
+En estado estable (markets sin cambios) no se escribe nada.
+
+Con `ambito` (p.ej. {"exchange": "binance"}) el delta se limita a esas filas:
+no borra símbolos de otros exchanges que compartan la tabla.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .carga import CARGA_LOTE, cargar_frame
+
+COLUMNA_HUELLA = "row_hash"
+
+
+@dataclass
+class Delta:
+    nuevas: int = 0
+    cambiadas: int = 0
+    borradas: int = 0
+    iguales: int = 0
+
+    @property
+    def escritas(self) -> int:
+        return self.nuevas + self.cambiadas + self.borradas
+
+    def __str__(self) -> str:
+        return f"+{self.nuevas} ~{self.cambiadas} -{self.borradas} ={self.iguales}"
+
+
+def huellas_filas(df: pd.DataFrame) -> pd.Series:
+    """Huella de 64 bits por fila (vectorizada), sobre los valores ya adaptados a SQL (int64, mismos bits que el uint64)."""
+    h = pd.util.hash_pandas_object(df, index=False)
+    return pd.Series(h.values.view(np.int64), index=h.index)
+
+
+def con_huella(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.drop(columns=[COLUMNA_HUELLA], errors="ignore")
+    out[COLUMNA_HUELLA] = huellas_filas(out).values
+    return out
+
+
+def columnas_declaradas(conn: Any, tabla: str) -> Dict[str, str]:
+    """Columna → tipo SQL declarado."""
+    with conn.cursor() as cur:
+        cur.execute(f"SHOW COLUMNS FROM `{tabla}`")
+        filas = cur.fetchall()
+    return {(r["Field"] if isinstance(r, dict) else r[0]): str(r["Type"] if isinstance(r, dict) else r[1])
+            for r in filas}
+
+
+def asegurar_columna_huella(conn: Any, tabla: str) -> None:
+    """
+    Tablas creadas antes del delta: agrega `row_hash` (NULL → primera corrida reescribe todo).
+    Si quedó como BIGINT UNSIGNED (huella sin signo) se pasa a BIGINT y se invalida.
+    """
+    tipo = columnas_declaradas(conn, tabla).get(COLUMNA_HUELLA)
+    with conn.cursor() as cur:
+        if tipo is None:
+            cur.execute(f"ALTER TABLE `{tabla}` ADD COLUMN `{COLUMNA_HUELLA}` BIGINT NULL")
+        elif "unsigned" in tipo.lower():
+            cur.execute(f"UPDATE `{tabla}` SET `{COLUMNA_HUELLA}` = NULL")
+            cur.execute(f"ALTER TABLE `{tabla}` MODIFY `{COLUMNA_HUELLA}` BIGINT NULL")
+
+
+def huellas_guardadas(conn: Any, tabla: str, clave: str,
+                      ambito: Optional[Dict[str, Any]] = None) -> Dict[Any, Optional[int]]:
+    where, args = "", ()
+    if ambito:
+        where = " WHERE " + " AND ".join(f"`{c}` = %s" for c in ambito)
+        args = tuple(ambito.values())
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT `{clave}`, `{COLUMNA_HUELLA}` FROM `{tabla}`{where}", args)
+        filas = cur.fetchall()
+    if filas and isinstance(filas[0], dict):
+        return {r[clave]: r[COLUMNA_HUELLA] for r in filas}
+    return {r[0]: r[1] for r in filas}
+
+
+def aplicar_delta(
+    conn: Any,
+    tabla: str,
+    df: pd.DataFrame,
+    clave: str = "symbol_id",
+    ambito: Optional[Dict[str, Any]] = None,
+    lote: int = CARGA_LOTE,
+) -> Delta:
+    """
+    Sincroniza `tabla` con `df` (valores ya adaptados, con o sin `row_hash`)
+    escribiendo solo las diferencias. No hace commit.
+    """
+    df = con_huella(df)
+    guardadas = huellas_guardadas(conn, tabla, clave, ambito)
+
+    claves = df[clave].tolist()
+    es_nueva = [k not in guardadas for k in claves]
+    cambio = [
+        not nueva and (guardadas[k] is None or int(guardadas[k]) != int(h))
+        for k, h, nueva in zip(claves, df[COLUMNA_HUELLA].tolist(), es_nueva)
+    ]
+    a_escribir = df[[n or c for n, c in zip(es_nueva, cambio)]]
+    borrar = sorted(set(guardadas) - set(claves))
+
+    if len(a_escribir):
+        cargar_frame(conn, tabla, a_escribir, reemplazar=True, lote=lote)
+    if borrar:
+        with conn.cursor() as cur:
+            for i in range(0, len(borrar), lote):
+                bloque = borrar[i:i + lote]
+                cur.execute(
+                    f"DELETE FROM `{tabla}` WHERE `{clave}` IN ({', '.join(['%s'] * len(bloque))})",
+                    bloque,
+                )
+
+    return Delta(
+        nuevas=sum(es_nueva),
+        cambiadas=sum(cambio),
+        borradas=len(borrar),
+        iguales=len(df) - len(a_escribir),
+    )
@@ -0,0 +1,165 @@
+# codigo/config/depth_replay.py
+"""
+Stand-in local de profundidad: snapshot + stream `depthUpdate` reproducible.
+
+Parte de un snapshot en formato CCXT (p.ej. modulo_absorcion/datos/kraken_orderbook_realtime.json)
+y emite diffs desde un JSONL grabado o generados de forma determinística
+(semilla). Mantiene su propio libro "verdad" para servir snapshots de resync
+coherentes con la posición actual del stream, y puede descartar eventos a
+propósito para forzar huecos.
+
+Uso:
+    python -m config.depth_replay                         # 5000 diffs sintéticos, 3 huecos
+    python -m config.depth_replay --snapshot otro.json --eventos grabados.jsonl
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from .config import ABSORCION_DIR
+from .orderbook import GestorLibros
+
+SNAPSHOT_DEFAULT = ABSORCION_DIR / "datos" / "kraken_orderbook_realtime.json"
+
+
+class FuenteReplay:
+    def __init__(
+        self,
+        snapshot_path: Path = SNAPSHOT_DEFAULT,
+        eventos_path: Optional[Path] = None,
+        n_sinteticos: int = 5000,
+        semilla: int = 0,
+        descartar: Iterable[int] = (),
+    ) -> None:
+        snap = json.loads(Path(snapshot_path).read_text(encoding="utf-8"))
+        self.symbol: str = snap.get("symbol") or "BTC/USDT"
+        self.id_stream = self.symbol.replace("/", "")
+        self.last_update_id = int(snap.get("lastUpdateId") or snap.get("nonce") or 1000)
+        self.verdad = {
+            "bids": {float(p): float(q) for p, q, *_ in snap.get("bids") or []},
+            "asks": {float(p): float(q) for p, q, *_ in snap.get("asks") or []},
+        }
+        self.eventos_path = eventos_path
+        self.n_sinteticos = n_sinteticos
+        self.rng = random.Random(semilla)
+        self.descartar: Set[int] = set(descartar)
+        self.descartados = 0
+
+    # ───── snapshot REST (lo que devolvería fetch_order_book) ─────
+    def snapshot(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "lastUpdateId": self.last_update_id,
+            "bids": sorted(([p, q] for p, q in self.verdad["bids"].items()), reverse=True),
+            "asks": sorted([p, q] for p, q in self.verdad["asks"].items()),
+        }
+
+    # ───── stream de diffs ─────
+    def _sintetico(self) -> Dict[str, Any]:
+        ev: Dict[str, Any] = {"e": "depthUpdate", "s": self.id_stream, "b": [], "a": []}
+        for lado, clave in (("bids", "b"), ("asks", "a")):
+            libro = self.verdad[lado]
+            precios = sorted(libro, reverse=(lado == "bids"))[:20]
+            for _ in range(self.rng.randint(1, 4)):
+                r = self.rng.random()
+                if precios and r < 0.3:
+                    ev[clave].append([self.rng.choice(precios), 0.0])                      # borra nivel
+                elif precios and r < 0.7:
+                    ev[clave].append([self.rng.choice(precios), round(self.rng.uniform(0.001, 5), 6)])
+                else:
+                    ref = precios[0] if precios else 100.0
+                    paso = self.rng.randint(1, 50) * 0.1 * self.rng.choice((-1, 1))
+                    nuevo = round(ref - paso if lado == "bids" else ref + paso, 1)
+                    # sin cruzar el otro lado
+                    otro = self.verdad["asks" if lado == "bids" else "bids"]
+                    if otro and (nuevo >= min(otro) if lado == "bids" else nuevo <= max(otro)):
+                        nuevo = round(ref - abs(paso) if lado == "bids" else ref + abs(paso), 1)
+                    ev[clave].append([nuevo, round(self.rng.uniform(0.001, 5), 6)])
+        return ev
+
+    def _crudos(self) -> Iterator[Dict[str, Any]]:
+        if self.eventos_path is not None:
+            with Path(self.eventos_path).open(encoding="utf-8") as f:
+                for linea in f:
+                    if linea.strip():
+                        obj = json.loads(linea)
+                        yield obj.get("data", obj)
+            return
+        for _ in range(self.n_sinteticos):
+            yield self._sintetico()
+
+    def eventos(self) -> Iterator[Dict[str, Any]]:
+        """
+        Eventos con U/u consecutivos. Cada evento se aplica a la verdad; los
+        índices en `descartar` no se entregan (hueco para el consumidor).
+        """
+        for n, ev in enumerate(self._crudos()):
+            if "U" not in ev:
+                ev["U"] = self.last_update_id + 1
+                ev["u"] = ev["U"] + self.rng.randint(0, 3)
+            for lado, clave in (("bids", "b"), ("asks", "a")):
+                for p, q, *_ in ev.get(clave, ()):
+                    p, q = float(p), float(q)
+                    if q == 0:
+                        self.verdad[lado].pop(p, None)
+                    else:
+                        self.verdad[lado][p] = q
+            self.last_update_id = int(ev["u"])
+            if n in self.descartar:
+                self.descartados += 1
+                continue
+            yield ev
+
+
+def correr_replay(fuente: FuenteReplay, slippages: List[float] = (0.001, 0.003, 0.005)) -> Dict[str, Any]:
+    gestor = GestorLibros(lambda _s: fuente.snapshot(), [fuente.symbol], {fuente.symbol: fuente.id_stream})
+    gestor.resincronizar(fuente.symbol)
+    t0 = time.perf_counter()
+    for ev in fuente.eventos():
+        gestor.procesar(ev)
+    dur = time.perf_counter() - t0
+
+    libro = gestor.libros[fuente.symbol]
+    verdad = fuente.snapshot()
+    coincide = (libro.bids.niveles() == verdad["bids"] and libro.asks.niveles() == verdad["asks"])
+
+    t1 = time.perf_counter()
+    simulaciones = {s: libro.simular_absorcion(s) for s in slippages}
+    dur_sim = (time.perf_counter() - t1) / max(1, len(slippages))
+    return {
+        "symbol": fuente.symbol,
+        "eventos_aplicados": libro.eventos,
+        "descartados": fuente.descartados,
+        "gaps": libro.gaps,
+        "resyncs": libro.resyncs,
+        "coincide_con_verdad": coincide,
+        "us_por_evento": dur / max(1, libro.eventos) * 1e6,
+        "us_por_simulacion": dur_sim * 1e6,
+        "simulaciones": simulaciones,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay de profundidad contra el order book local")
+    parser.add_argument("--snapshot", type=Path, default=SNAPSHOT_DEFAULT)
+    parser.add_argument("--eventos", type=Path, default=None, help="JSONL de depthUpdate grabados")
+    parser.add_argument("--n", type=int, default=5000, help="diffs sintéticos si no hay --eventos")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--huecos", type=int, nargs="*", default=[1000, 2500, 4000],
+                        help="índices de eventos a descartar (fuerzan resync)")
+    args = parser.parse_args()
+
+    res = correr_replay(FuenteReplay(args.snapshot, args.eventos, args.n, args.semilla, args.huecos))
+    for k, v in res.items():
+        if k != "simulaciones":
+            print(f"  {k}: {v:.2f}" if isinstance(v, float) else f"  {k}: {v}")
+    for s, (quote, niveles, limite) in res["simulaciones"].items():
+        print(f"  slip {s:.3%}: quote={quote:.6f} niveles={niveles} limite={limite:.6f}")
+    print("✅ Libro local coincide con la verdad" if res["coincide_con_verdad"] else "❌ Libro local divergió")
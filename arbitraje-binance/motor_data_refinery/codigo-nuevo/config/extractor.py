@@ -0,0 +1,170 @@
+# codigo/config/extractor.py
+"""
+Extractor de campos compilado: reemplaza el `flatten_json` recursivo de los pasos 0, 2 y 3.
+
+Una clave aplanada ('precision_amount', 'limits_price_min', 'info_filters_0_tickSize')
+se compila una sola vez a una ruta directa dentro del market (('precision', 'amount'), ...).
+Por cada market se leen solo esas rutas: el costo escala con la cantidad de
+campos que se conservan, no con el tamaño del payload CCXT (ni con `info`).
+
+Semántica idéntica a `flatten_json`:
+- dicts se unen con '_', listas con el índice;
+- solo se devuelven hojas escalares (un dict/list en la ruta = clave ausente);
+- una clave ausente no aparece en el resultado de `extraer()`.
+
+Las rutas salen del schema cuando se conocen (schema_funcional) y, para claves
+planas sueltas (MAPPING, columnas de DB), se resuelven contra el primer market
+que las contiene y quedan cacheadas.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+Ruta = Tuple[Any, ...]
+_AUSENTE = object()
+
+
+def aplanar(value: Any, prefix: str = "") -> Dict[str, Any]:
+    """
+    Aplanado completo de referencia (mismo resultado que el antiguo `flatten_json`).
+    Solo para casos sin schema; el camino rápido es `Extractor`.
+    """
+    out: Dict[str, Any] = {}
+    pila: List[Tuple[str, Any]] = [(prefix, value)]
+    while pila:
+        pre, v = pila.pop()
+        if isinstance(v, dict):
+            pila.extend((f"{pre}{k}_", x) for k, x in reversed(list(v.items())))
+        elif isinstance(v, list):
+            pila.extend((f"{pre}{idx}_", v[idx]) for idx in reversed(range(len(v))))
+        else:
+            out[pre[:-1]] = v
+    return out
+
+
+def claves_de_schema(node: Any, prefix: str = "") -> List[Tuple[str, Ruta]]:
+    """
+    (clave aplanada, ruta) para cada hoja de un (sub)schema dict.
+    Mismas claves que `flatten_schema_keys` del paso 2.
+    """
+    out: List[Tuple[str, Ruta]] = []
+
+    def _rec(n: Any, pre: str, ruta: Ruta) -> None:
+        for k, v in n.items():
+            if isinstance(v, dict):
+                _rec(v, pre + k + "_", ruta + (k,))
+            else:
+                out.append(((pre + k).rstrip("_"), ruta + (k,)))
+
+    if isinstance(node, dict):
+        _rec(node, prefix, ())
+    return out
+
+
+def _leer(nodo: Any, ruta: Ruta) -> Any:
+    for paso in ruta:
+        if isinstance(nodo, dict):
+            nodo = nodo.get(paso, _AUSENTE)
+        elif isinstance(nodo, list) and isinstance(paso, int) and paso < len(nodo):
+            nodo = nodo[paso]
+        else:
+            return _AUSENTE
+        if nodo is _AUSENTE:
+            return _AUSENTE
+    if isinstance(nodo, (dict, list)):
+        return _AUSENTE  # flatten_json nunca devuelve nodos internos
+    return nodo
+
+
+def resolver(nodo: Any, clave: str) -> Optional[Ruta]:
+    """Busca en `nodo` la ruta cuya versión aplanada es `clave` (claves con '_' incluidas)."""
+    segmentos = clave.split("_")
+
+    def _rec(n: Any, i: int) -> Optional[Ruta]:
+        if i == len(segmentos):
+            return () if not isinstance(n, (dict, list)) else None
+        if isinstance(n, dict):
+            for j in range(i + 1, len(segmentos) + 1):
+                k = "_".join(segmentos[i:j])
+                if k in n:
+                    sub = _rec(n[k], j)
+                    if sub is not None:
+                        return (k,) + sub
+            return None
+        if isinstance(n, list) and segmentos[i].isdigit():
+            idx = int(segmentos[i])
+            if idx < len(n):
+                sub = _rec(n[idx], i + 1)
+                if sub is not None:
+                    return (idx,) + sub
+        return None
+
+    return _rec(nodo, 0)
+
+
+class Extractor:
+    """Lector compilado de un conjunto fijo de claves aplanadas."""
+
+    def __init__(self, claves: Iterable[str] = (), rutas: Optional[Dict[str, Ruta]] = None) -> None:
+        self.rutas: Dict[str, Optional[Ruta]] = dict(rutas or {})
+        # rutas conocidas de antemano (schema): no se re-resuelven por market
+        self._fijas = frozenset(self.rutas)
+        for c in claves:
+            self.rutas.setdefault(c, None)
+        self.claves = tuple(self.rutas)
+
+    @classmethod
+    def desde_schema(cls, schema_sub: Dict[str, Any], prefix: str = "") -> "Extractor":
+        """
+        Rutas tomadas del schema, relativas al nodo del sub-schema; `prefix` solo
+        nombra las claves (p.ej. 'precision_' → 'precision_amount').
+        """
+        return cls(rutas=dict(claves_de_schema(schema_sub, prefix)))
+
+    def _valor(self, market: Dict[str, Any], clave: str) -> Any:
+        ruta = self.rutas[clave]
+        if ruta is not None:
+            v = _leer(market, ruta)
+            if v is not _AUSENTE or clave in self._fijas:
+                return v
+        # primera vez (o estructura distinta en este market): resolver contra el market
+        nueva = resolver(market, clave)
+        if nueva is None:
+            return _AUSENTE
+        if ruta is None:
+            self.rutas[clave] = nueva
+        return _leer(market, nueva)
+
+    def extraer(self, market: Dict[str, Any]) -> Dict[str, Any]:
+        """Solo las claves presentes (como el dict aplanado filtrado)."""
+        out: Dict[str, Any] = {}
+        for clave in self.claves:
+            v = self._valor(market, clave)
+            if v is not _AUSENTE:
+                out[clave] = v
+        return out
+
+    def get(self, market: Dict[str, Any], clave: str, default: Any = None) -> Any:
+        """Equivalente a `flatten_json(market).get(clave, default)`."""
+        if clave not in self.rutas:
+            self.rutas[clave] = None
+            self.claves = tuple(self.rutas)
+        v = self._valor(market, clave)
+        return default if v is _AUSENTE else v
+
+
+@lru_cache(maxsize=64)
+def extractor_para(claves: Tuple[str, ...]) -> Extractor:
+    """Extractor compartido por conjunto de claves (se compila una vez por proceso)."""
+    return Extractor(claves)
+
+
+def extractores_de_schema(schema: Dict[str, Any]) -> Dict[str, Extractor]:
+    """Un extractor por clave anidada del schema (tablas `sym_<clave>`), se aplica a `market[clave]`."""
+    return {
+        k: Extractor.desde_schema(v, prefix=f"{k}_")
+        for k, v in schema.items()
+        if isinstance(v, dict)
+    }
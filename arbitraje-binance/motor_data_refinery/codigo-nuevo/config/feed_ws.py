@@ -0,0 +1,256 @@
+# codigo/config/feed_ws.py
+"""
+Feed WebSocket de Binance (bookTicker + miniTicker) → tabla BBO en memoria.
+
+`TablaBBO` es una tabla preasignada (arrays numpy indexados por símbolo) con
+bid/bid_qty/ask/ask_qty/last y timestamps. `FeedBinance` se suscribe a los
+streams de los símbolos de `pares_involucrados.csv`, la mantiene actualizada y
+se reconecta solo. Puede correr en un hilo propio y el resto del código lee la
+tabla sin tocar la red.
+
+Uso:
+    python -m config.feed_ws                       # Binance real
+    python -m config.feed_ws --url ws://127.0.0.1:8765/stream   # stand-in local (config.ws_replay)
+    python -m config.feed_ws --grabar datos/ws/sesion.jsonl     # graba mensajes crudos
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+from .config import ABSORCION_DIR, BINANCE_WS_URL, EXCHANGE_ID
+
+PARES_INVOLUCRADOS_CSV = ABSORCION_DIR / "pares_involucrados.csv"
+STREAMS = ("bookTicker", "miniTicker")
+# Binance acepta hasta 1024 streams por conexión; SUBSCRIBE en lotes chicos
+STREAMS_POR_SUBSCRIBE = 200
+
+CAMPOS = ("bid", "bid_qty", "ask", "ask_qty", "last", "ts_bbo", "ts_last")
+
+
+def _ahora_ms() -> float:
+    return time.time() * 1000.0
+
+
+class TablaBBO:
+    """
+    Tabla preasignada symbol → bid/ask/qty/last/timestamps.
+
+    Escribe un solo hilo (el loop del feed). Los lectores usan `fila()`, que
+    valida con un contador de versión por fila (seqlock) para no leer una
+    fila a medio escribir.
+    """
+
+    def __init__(self, symbols: Iterable[str]) -> None:
+        self.symbols: List[str] = list(dict.fromkeys(symbols))
+        self.indice: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        n = len(self.symbols)
+        self.datos = np.full((n, len(CAMPOS)), np.nan, dtype=np.float64)
+        self.update_id = np.zeros(n, dtype=np.int64)
+        self.version = np.zeros(n, dtype=np.int64)
+        self.mensajes = 0
+
+    # ───── escritura (hilo del feed) ─────
+    def _escribir(self, i: int, columnas: List[int], valores: tuple) -> None:
+        self.version[i] += 1          # impar: escritura en curso
+        self.datos[i, columnas] = valores
+        self.version[i] += 1
+        self.mensajes += 1
+
+    def aplicar_book_ticker(self, i: int, d: Dict[str, Any]) -> None:
+        u = int(d.get("u") or 0)
+        if u and u <= self.update_id[i]:
+            return  # mensaje viejo o repetido
+        self.update_id[i] = u
+        self._escribir(i, [0, 1, 2, 3, 5], (float(d["b"]), float(d["B"]), float(d["a"]), float(d["A"]), _ahora_ms()))
+
+    def aplicar_mini_ticker(self, i: int, d: Dict[str, Any]) -> None:
+        self._escribir(i, [4, 6], (float(d["c"]), float(d.get("E") or _ahora_ms())))
+
+    # ───── lectura (cualquier hilo) ─────
+    def fila(self, symbol: str) -> Optional[Dict[str, float]]:
+        i = self.indice.get(symbol)
+        if i is None:
+            return None
+        while True:
+            v0 = self.version[i]
+            if v0 % 2:
+                continue
+            valores = self.datos[i].copy()
+            if self.version[i] == v0:
+                return dict(zip(CAMPOS, valores.tolist()))
+
+    def mejor(self, symbol: str) -> tuple[float, float]:
+        f = self.fila(symbol) or {}
+        return f.get("bid", np.nan), f.get("ask", np.nan)
+
+    def frame(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.datos.copy(), index=pd.Index(self.symbols, name="symbol"), columns=list(CAMPOS))
+        df["update_id"] = self.update_id.copy()
+        return df
+
+
+def leer_pares_involucrados(path: Path = PARES_INVOLUCRADOS_CSV) -> List[str]:
+    if not path.exists():
+        raise FileNotFoundError(f"❌ No existe {path}")
+    with path.open(newline="", encoding="utf-8") as f:
+        return [r["symbol"].strip() for r in csv.DictReader(f) if r.get("symbol", "").strip()]
+
+
+def ids_de_stream(symbols: Iterable[str], markets: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """symbol CCXT → id de stream Binance (minúsculas), usando el snapshot de markets."""
+    if markets is None:
+        from .markets import cargar_markets
+        try:
+            markets = cargar_markets(EXCHANGE_ID)
+        except RuntimeError as e:
+            print(f"⚠️ Sin snapshot de markets ({e}); ids derivados del symbol.")
+            markets = {}
+    out = {}
+    for s in symbols:
+        mid = (markets.get(s) or {}).get("id") or s.replace("/", "")
+        out[s] = str(mid).lower()
+    return out
+
+
+class FeedBinance:
+    """Cliente WS (aiohttp) que mantiene `self.tabla` al día."""
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        markets: Optional[Dict[str, Any]] = None,
+        url: str = BINANCE_WS_URL,
+        streams: Iterable[str] = STREAMS,
+        grabar: Optional[Path] = None,
+    ) -> None:
+        self.tabla = TablaBBO(symbols)
+        self.url = url
+        self.streams = tuple(streams)
+        ids = ids_de_stream(self.tabla.symbols, markets)
+        # id de stream (en mayúsculas, como viene en "s") → fila
+        self._fila_por_id = {ids[s].upper(): i for s, i in self.tabla.indice.items()}
+        self._params = [f"{ids[s]}@{st}" for s in self.tabla.symbols for st in self.streams]
+        self.grabar = grabar
+        self.conectado = threading.Event()
+        self._detener: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._hilo: Optional[threading.Thread] = None
+
+    # ───── mensajes ─────
+    def procesar(self, raw: str) -> None:
+        msg = json.loads(raw)
+        d = msg.get("data", msg)
+        if not isinstance(d, dict) or "s" not in d:
+            return  # respuestas a SUBSCRIBE, pings lógicos, etc.
+        i = self._fila_por_id.get(str(d["s"]).upper())
+        if i is None:
+            return
+        stream = msg.get("stream", "")
+        if d.get("e") == "24hrMiniTicker" or stream.endswith("@miniTicker"):
+            self.tabla.aplicar_mini_ticker(i, d)
+        elif "b" in d and "a" in d:
+            self.tabla.aplicar_book_ticker(i, d)
+
+    async def _suscribir(self, ws) -> None:
+        for n, k in enumerate(range(0, len(self._params), STREAMS_POR_SUBSCRIBE), start=1):
+            await ws.send_json({"method": "SUBSCRIBE", "params": self._params[k:k + STREAMS_POR_SUBSCRIBE], "id": n})
+
+    async def _sesion(self, session: aiohttp.ClientSession, salida) -> None:
+        async with session.ws_connect(self.url, heartbeat=30, max_msg_size=0) as ws:
+            # cierra el socket apenas se pide detener (aunque no lleguen mensajes)
+            vigia = asyncio.ensure_future(self._detener.wait())
+            vigia.add_done_callback(lambda f: f.cancelled() or asyncio.ensure_future(ws.close()))
+            try:
+                await self._suscribir(ws)
+                self.conectado.set()
+                print(f"🔌 Feed conectado: {self.url} ({len(self._params)} streams)")
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        if salida is not None:
+                            salida.write(json.dumps({"t": _ahora_ms(), "m": msg.data}) + "\n")
+                        self.procesar(msg.data)
+                    elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+            finally:
+                vigia.cancel()
+                self.conectado.clear()
+
+    async def correr(self) -> None:
+        """Loop con reconexión (backoff + jitter) hasta `detener()`."""
+        self._detener = asyncio.Event()
+        salida = None
+        if self.grabar is not None:
+            self.grabar.parent.mkdir(parents=True, exist_ok=True)
+            salida = self.grabar.open("a", encoding="utf-8")
+        espera = 0.5
+        try:
+            async with aiohttp.ClientSession() as session:
+                while not self._detener.is_set():
+                    try:
+                        await self._sesion(session, salida)
+                        espera = 0.5
+                    except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                        print(f"⚠️ Feed desconectado ({e}); reintento en {espera:.1f}s")
+                    if self._detener.is_set():
+                        break
+                    try:
+                        await asyncio.wait_for(self._detener.wait(), espera * random.uniform(0.5, 1.5))
+                    except asyncio.TimeoutError:
+                        pass
+                    espera = min(espera * 2, 30.0)
+        finally:
+            if salida is not None:
+                salida.close()
+
+    # ───── hilo de fondo ─────
+    def iniciar_en_hilo(self) -> "FeedBinance":
+        def _run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.correr())
+            self._loop.close()
+
+        self._hilo = threading.Thread(target=_run, name="feed_ws", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self, timeout: float = 5.0) -> None:
+        if self._loop is not None and self._detener is not None:
+            self._loop.call_soon_threadsafe(self._detener.set)
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Feed WS bookTicker/miniTicker → tabla BBO")
+    parser.add_argument("--url", default=BINANCE_WS_URL)
+    parser.add_argument("--pares", type=Path, default=PARES_INVOLUCRADOS_CSV)
+    parser.add_argument("--grabar", type=Path, default=None, help="JSONL de mensajes crudos (para ws_replay)")
+    parser.add_argument("--segundos", type=float, default=0, help="0 = hasta Ctrl+C")
+    args = parser.parse_args()
+
+    feed = FeedBinance(leer_pares_involucrados(args.pares), url=args.url, grabar=args.grabar).iniciar_en_hilo()
+    t0 = time.time()
+    try:
+        while not args.segundos or time.time() - t0 < args.segundos:
+            time.sleep(2)
+            df = feed.tabla.frame()
+            print(f"📈 {feed.tabla.mensajes} msgs | {int(df['bid'].notna().sum())}/{len(df)} con BBO")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        feed.detener()
+    print(feed.tabla.frame().to_string())
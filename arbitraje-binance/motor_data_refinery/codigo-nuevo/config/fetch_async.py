@@ -0,0 +1,153 @@
+# codigo/config/fetch_async.py
+"""
+Capa de fetch concurrente sobre `ccxt.async_support`.
+
+- Concurrencia acotada con semáforo (FETCH_CONCURRENCIA).
+- Timeout por request (FETCH_TIMEOUT, segundos).
+- Reintentos con backoff exponencial + jitter ante errores de red / rate limit.
+- Resultados en streaming: `iterar()` los entrega a medida que terminan.
+
+El throttler interno de CCXT (enableRateLimit, espaciado según `exchange.rateLimit`)
+queda activo por defecto, como en el resto del motor: el semáforo acota las
+conexiones abiertas y el throttler el ritmo de requests que ve el exchange
+(Kraken banea la IP ante ráfagas). FETCH_RATE_LIMIT=0 lo desactiva a
+conciencia (p. ej. contra el replay local); ahí solo quedan el semáforo y los
+reintentos con backoff ante 429/DDoS.
+
+Uso (sync):
+    libros = recolectar("kraken", "fetch_order_book", symbols)
+Uso (async, streaming):
+    async for r in iterar("kraken", "fetch_order_book", symbols):
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+import ccxt
+
+from .replay_exchange import crear_exchange
+
+FETCH_CONCURRENCIA = int(os.getenv("FETCH_CONCURRENCIA", "20"))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "10"))
+FETCH_REINTENTOS = int(os.getenv("FETCH_REINTENTOS", "3"))
+FETCH_BACKOFF = float(os.getenv("FETCH_BACKOFF", "0.5"))
+FETCH_RATE_LIMIT = os.getenv("FETCH_RATE_LIMIT", "1") != "0"  # "0" → opt-in explícito sin throttler
+
+# Errores transitorios: se reintentan. El resto (BadSymbol, etc.) falla al toque.
+REINTENTABLES = (asyncio.TimeoutError, ccxt.NetworkError)
+
+
+@dataclass
+class Resultado:
+    symbol: str
+    valor: Any = None
+    error: Optional[BaseException] = None
+    intentos: int = 0
+    duracion: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def crear_exchange_async(exchange_id: str, opciones: Optional[Dict[str, Any]] = None):
+    """Exchange async según EXCHANGE_MODO (live / replay / grabar)."""
+    return crear_exchange(exchange_id, {"enableRateLimit": FETCH_RATE_LIMIT, **(opciones or {})}, asincronico=True)
+
+
+async def _con_reintentos(fn, symbol: str, args: tuple, kwargs: dict,
+                          timeout: float, reintentos: int, backoff: float) -> Resultado:
+    t0 = time.perf_counter()
+    intento = 0
+    while True:
+        intento += 1
+        try:
+            valor = await asyncio.wait_for(fn(symbol, *args, **kwargs), timeout)
+            return Resultado(symbol, valor, None, intento, time.perf_counter() - t0)
+        except REINTENTABLES as e:
+            if intento > reintentos:
+                return Resultado(symbol, None, e, intento, time.perf_counter() - t0)
+            espera = backoff * (2 ** (intento - 1))
+            await asyncio.sleep(espera * random.uniform(0.5, 1.5))
+        except Exception as e:
+            return Resultado(symbol, None, e, intento, time.perf_counter() - t0)
+
+
+async def iterar(
+    exchange_id: str,
+    metodo: str,
+    symbols: Iterable[str],
+    *args: Any,
+    markets: Optional[Dict[str, Any]] = None,
+    concurrencia: int = FETCH_CONCURRENCIA,
+    timeout: float = FETCH_TIMEOUT,
+    reintentos: int = FETCH_REINTENTOS,
+    backoff: float = FETCH_BACKOFF,
+    exchange=None,
+    **kwargs: Any,
+) -> AsyncIterator[Resultado]:
+    """
+    Ejecuta `exchange.<metodo>(symbol, *args, **kwargs)` para cada symbol y
+    entrega cada `Resultado` apenas termina (orden de finalización, no de entrada).
+    Si no se pasa `exchange`, crea uno y lo cierra al final.
+    """
+    propio = exchange is None
+    ex = exchange or crear_exchange_async(exchange_id)
+    sem = asyncio.Semaphore(max(1, concurrencia))
+
+    async def _uno(symbol: str) -> Resultado:
+        async with sem:
+            return await _con_reintentos(getattr(ex, metodo), symbol, args, kwargs,
+                                         timeout, reintentos, backoff)
+
+    try:
+        if markets is not None:
+            ex.set_markets(markets)
+        else:
+            await ex.load_markets()
+        tareas = [asyncio.ensure_future(_uno(s)) for s in dict.fromkeys(symbols)]
+        try:
+            for fut in asyncio.as_completed(tareas):
+                yield await fut
+        finally:
+            for t in tareas:
+                t.cancel()
+    finally:
+        if propio:
+            await ex.close()
+
+
+async def recolectar_async(exchange_id: str, metodo: str, symbols: Iterable[str],
+                           *args: Any, **kwargs: Any) -> List[Resultado]:
+    return [r async for r in iterar(exchange_id, metodo, symbols, *args, **kwargs)]
+
+
+def recolectar(exchange_id: str, metodo: str, symbols: Iterable[str],
+               *args: Any, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Wrapper sync: dict symbol → valor (solo los exitosos). Los errores se
+    informan por consola, igual que en los loops seriales que reemplaza.
+    """
+    out: Dict[str, Any] = {}
+    for r in asyncio.run(recolectar_async(exchange_id, metodo, symbols, *args, **kwargs)):
+        if r.ok:
+            out[r.symbol] = r.valor
+        else:
+            print(f"⚠️ Error {r.symbol} ({r.intentos} intentos): {r.error}")
+    return out
+
+
+def fetch_order_books(exchange_id: str, symbols: Iterable[str], limit: Optional[int] = None,
+                      **kwargs: Any) -> Dict[str, Any]:
+    return recolectar(exchange_id, "fetch_order_book", symbols, limit, **kwargs)
+
+
+def fetch_tickers_individuales(exchange_id: str, symbols: Iterable[str], **kwargs: Any) -> Dict[str, Any]:
+    return recolectar(exchange_id, "fetch_ticker", symbols, **kwargs)
@@ -0,0 +1,108 @@
+# codigo/config/grafo.py
+"""
+Valuación de activos sobre el grafo de monedas.
+
+Nodos = activos, aristas = pares con precio. Un par BASE/QUOTE con precio p
+(1 BASE = p QUOTE) da dos aristas dirigidas:
+  QUOTE → BASE  factor 1/p   (conocido QUOTE, se valúa BASE)
+  BASE  → QUOTE factor p     (conocido BASE,  se valúa QUOTE)
+
+`valuar` recorre el grafo por niveles (BFS) desde la moneda de referencia:
+cada nivel es un merge vectorizado aristas × frontera, así que el costo es
+O(aristas) por nivel y la cantidad de niveles es el diámetro del grafo (2–4 en
+la práctica). Cada activo queda con el camino más corto disponible:
+  unidades  → cuántas unidades del activo rinde 1 unidad de referencia (Decimal)
+  saltos    → largo del camino
+  via       → par de la última arista
+  ruta      → pares recorridos desde la referencia ("BTC/USDT > ETH/BTC")
+
+Desempate entre caminos del mismo largo: menor `preferencia` del par, luego la
+arista QUOTE → BASE (cotización directa), luego orden alfabético del símbolo.
+
+Uso:
+    valuados = valuar(aristas(pares), "USDT")   # pares: symbol, base, quote, precio[, preferencia]
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation, localcontext
+from typing import Any, Optional
+
+import pandas as pd
+
+PRECISION = 50
+SEPARADOR_RUTA = " > "
+COLUMNAS_VALUACION = ["activo", "unidades", "saltos", "via", "ruta"]
+
+
+def a_decimal(valor: Any) -> Optional[Decimal]:
+    """Precio → Decimal positivo; None si falta o no es válido."""
+    if valor is None:
+        return None
+    try:
+        d = Decimal(str(valor).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    return d if d.is_finite() and d > 0 else None
+
+
+def aristas(pares: pd.DataFrame) -> pd.DataFrame:
+    """Pares (symbol, base, quote, precio[, preferencia]) → aristas dirigidas en ambos sentidos."""
+    if "preferencia" not in pares.columns:
+        pares = pares.assign(preferencia=0)
+    pares = pares.assign(precio=[a_decimal(p) for p in pares["precio"].tolist()])
+    pares = pares[pares["precio"].notna() & (pares["base"] != pares["quote"])]
+
+    precios = pares["precio"].tolist()
+    with localcontext() as ctx:
+        ctx.prec = PRECISION
+        inversos = [Decimal(1) / p for p in precios]
+
+    pref = pares["preferencia"].astype(int).to_numpy() * 2
+    ida = pd.DataFrame({
+        "origen": pares["quote"].to_numpy(), "destino": pares["base"].to_numpy(),
+        "factor": pd.Series(inversos, dtype=object), "symbol": pares["symbol"].to_numpy(), "pref": pref,
+    })
+    vuelta = pd.DataFrame({
+        "origen": pares["base"].to_numpy(), "destino": pares["quote"].to_numpy(),
+        "factor": pd.Series(precios, dtype=object), "symbol": pares["symbol"].to_numpy(), "pref": pref + 1,
+    })
+    return pd.concat([ida, vuelta], ignore_index=True)
+
+
+def valuar(aristas_df: pd.DataFrame, referencia: str, max_saltos: Optional[int] = None) -> pd.DataFrame:
+    """
+    Camino más corto desde `referencia` a cada activo alcanzable.
+    Devuelve un frame indexado por activo con COLUMNAS_VALUACION.
+    """
+    valuados = pd.DataFrame({
+        "activo": [referencia], "unidades": pd.Series([Decimal(1)], dtype=object),
+        "saltos": [0], "via": [""], "ruta": [""],
+    })
+    frontera = valuados
+    vistos = {referencia}
+    nivel = 0
+
+    with localcontext() as ctx:
+        ctx.prec = PRECISION
+        while len(frontera) and (max_saltos is None or nivel < max_saltos):
+            nivel += 1
+            cand = aristas_df.merge(frontera[["activo", "unidades", "ruta"]],
+                                    left_on="origen", right_on="activo")
+            cand = cand[~cand["destino"].isin(vistos)]
+            if cand.empty:
+                break
+            cand = cand.sort_values(["destino", "pref", "symbol"]).drop_duplicates("destino")
+
+            rutas = cand["ruta"].where(cand["ruta"] == "", cand["ruta"] + SEPARADOR_RUTA)
+            frontera = pd.DataFrame({
+                "activo": cand["destino"].to_numpy(),
+                "unidades": pd.Series([u * f for u, f in zip(cand["unidades"], cand["factor"])], dtype=object),
+                "saltos": nivel,
+                "via": cand["symbol"].to_numpy(),
+                "ruta": (rutas + cand["symbol"]).to_numpy(),
+            })
+            vistos.update(frontera["activo"])
+            valuados = pd.concat([valuados, frontera], ignore_index=True)
+
+    return valuados[COLUMNAS_VALUACION].set_index("activo")
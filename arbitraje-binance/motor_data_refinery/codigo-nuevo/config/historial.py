@@ -0,0 +1,169 @@
+# codigo/config/historial.py
+"""
+Historial de absorción en una sola tabla de serie temporal.
+
+`absorcion_historial` guarda todas las corridas del simulador de absorción con
+clave (symbol, ts) e índice secundario por ts; en MariaDB va particionada por
+mes (RANGE sobre TO_DAYS(ts)), así las consultas por ventana de tiempo solo
+leen las particiones del rango. Cada snapshot entra con una única carga
+masiva (config/carga.py) en lugar de dos INSERT por símbolo.
+
+Compatibilidad: las viejas tablas `absorcion_<symbol>` pasan a ser vistas
+sobre el historial (mismas columnas). Si todavía existe la tabla física, sus
+filas se migran al historial antes de reemplazarla por la vista.
+
+Uso:
+    asegurar_historial(conn)
+    asegurar_particiones(conn, ts)
+    asegurar_vistas(conn, {"BTC/EUR": "EUR", ...})
+    grabar_historial(conn, df)        # columnas: ts, symbol, quote + COLUMNAS_METRICAS
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from .carga import cargar_frame
+from .db_sqlite import es_sqlite
+
+TABLA_HISTORIAL = "absorcion_historial"
+PREFIJO_VISTA = "absorcion_"
+PARTICION_MAX = "p_max"
+
+COLUMNAS_METRICAS = (
+    "capital_simulado_quote",
+    "capital_quote_max_003_slip",
+    "capital_usdt_equiv_003_slip",
+    "niveles_usados_003_slip",
+    "precio_limite_003_slip",
+)
+COLUMNAS_HISTORIAL = ("ts", "symbol", "quote") + COLUMNAS_METRICAS
+
+_DDL_HISTORIAL = f"""
+    CREATE TABLE IF NOT EXISTS {TABLA_HISTORIAL} (
+        ts DATETIME NOT NULL,
+        symbol VARCHAR(50) NOT NULL,
+        quote VARCHAR(20),
+        capital_simulado_quote DECIMAL(32,12),
+        capital_quote_max_003_slip DECIMAL(32,12),
+        capital_usdt_equiv_003_slip DECIMAL(32,12),
+        niveles_usados_003_slip INT,
+        precio_limite_003_slip DECIMAL(32,12),
+        PRIMARY KEY (symbol, ts)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+_PARTICIONADO = f" PARTITION BY RANGE (TO_DAYS(ts)) (PARTITION {PARTICION_MAX} VALUES LESS THAN MAXVALUE)"
+
+
+def nombre_vista(symbol: str) -> str:
+    """Mismo nombre que usaba la tabla por símbolo (`absorcion_btc_eur`)."""
+    return f"{PREFIJO_VISTA}{symbol.lower().replace('/', '_').replace(' ', '').replace('.', '')}"
+
+
+def asegurar_historial(conn: Any) -> None:
+    with conn.cursor() as cur:
+        cur.execute(_DDL_HISTORIAL if es_sqlite(conn) else _DDL_HISTORIAL + _PARTICIONADO)
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLA_HISTORIAL}_ts ON {TABLA_HISTORIAL} (ts)")
+
+
+# ───── particiones (solo MariaDB) ─────
+def _mes(ts: datetime, desplazamiento: int = 0) -> datetime:
+    n = ts.year * 12 + ts.month - 1 + desplazamiento
+    return datetime(n // 12, n % 12 + 1, 1)
+
+
+def asegurar_particiones(conn: Any, ts: datetime, meses: int = 2) -> List[str]:
+    """
+    Parte `p_max` para que el mes de `ts` y los siguientes (`meses` en total)
+    tengan partición propia. Devuelve las particiones creadas.
+    """
+    if es_sqlite(conn):
+        return []
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL",
+            (TABLA_HISTORIAL,),
+        )
+        existentes = sorted(
+            (r["PARTITION_NAME"] if isinstance(r, dict) else r[0]) for r in cur.fetchall()
+        )
+        if not existentes:
+            return []  # tabla creada sin particionar: se usa tal cual
+        ultima = max((p for p in existentes if p != PARTICION_MAX), default="")
+
+        creadas: List[str] = []
+        for i in range(meses):
+            inicio = _mes(ts, i)
+            nombre = f"p{inicio:%Y%m}"
+            if nombre <= ultima:
+                continue  # ya cubierto (RANGE solo admite partir el tramo final)
+            hasta = _mes(ts, i + 1)
+            cur.execute(
+                f"ALTER TABLE {TABLA_HISTORIAL} REORGANIZE PARTITION {PARTICION_MAX} INTO ("
+                f"PARTITION {nombre} VALUES LESS THAN (TO_DAYS('{hasta:%Y-%m-%d}')), "
+                f"PARTITION {PARTICION_MAX} VALUES LESS THAN MAXVALUE)"
+            )
+            creadas.append(nombre)
+            ultima = nombre
+    return creadas
+
+
+# ───── vistas de compatibilidad ─────
+def _objetos(conn: Any) -> Dict[str, str]:
+    """Nombre → 'BASE TABLE' | 'VIEW' para todo lo que empieza con `absorcion_`."""
+    with conn.cursor() as cur:
+        cur.execute("SHOW FULL TABLES LIKE %s", (PREFIJO_VISTA.replace("_", "\\_") + "%",))
+        filas = cur.fetchall()
+    out: Dict[str, str] = {}
+    for r in filas:
+        nombre, tipo = list(r.values())[:2] if isinstance(r, dict) else r[:2]
+        out[nombre] = tipo
+    return out
+
+
+def migrar_tabla(conn: Any, tabla: str, symbol: str, quote: Any) -> int:
+    """Copia una tabla por símbolo al historial (sin pisar filas ya migradas) y la elimina."""
+    metricas = ", ".join(COLUMNAS_METRICAS)
+    with conn.cursor() as cur:
+        cur.execute(
+            f"INSERT IGNORE INTO {TABLA_HISTORIAL} (ts, symbol, quote, {metricas}) "
+            f"SELECT timestamp_utc, %s, %s, {metricas} FROM {tabla} WHERE timestamp_utc IS NOT NULL",
+            (symbol, quote),
+        )
+        migradas = cur.rowcount
+        cur.execute(f"DROP TABLE {tabla}")
+    return migradas
+
+
+def asegurar_vistas(conn: Any, simbolos: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Una vista `absorcion_<symbol>` por símbolo (symbol → quote). Las tablas
+    físicas heredadas se migran primero. Devuelve {vistas_creadas, filas_migradas}.
+    """
+    existentes = _objetos(conn)
+    creadas = migradas = 0
+    for symbol, quote in simbolos.items():
+        vista = nombre_vista(symbol)
+        tipo = existentes.get(vista)
+        if tipo == "VIEW":
+            continue
+        if tipo is not None:
+            migradas += migrar_tabla(conn, vista, symbol, quote)
+        literal = symbol.replace("'", "''")
+        with conn.cursor() as cur:
+            cur.execute(
+                f"CREATE VIEW {vista} AS SELECT ts AS timestamp_utc, {', '.join(COLUMNAS_METRICAS)} "
+                f"FROM {TABLA_HISTORIAL} WHERE symbol = '{literal}'"
+            )
+        creadas += 1
+    return {"vistas_creadas": creadas, "filas_migradas": migradas}
+
+
+# ───── escritura ─────
+def grabar_historial(conn: Any, df: pd.DataFrame) -> str:
+    """Un snapshot completo en una sola carga masiva (REPLACE: re-grabar el mismo ts es idempotente)."""
+    return cargar_frame(conn, TABLA_HISTORIAL, df[list(COLUMNAS_HISTORIAL)], reemplazar=True)
@@ -0,0 +1,118 @@
+# codigo/config/huellas.py
+"""
+Huellas de contenido y caché de salidas para la ejecución incremental de pasos.
+
+Un paso cuya huella de entradas (hash de markets, CSV/py de `static/`, código
+del paso y de `config/`, y hashes de artefactos upstream) coincide con la de su última corrida
+exitosa se salta y reutiliza las salidas guardadas en `datos/cache_pasos/`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from .config import CACHE_PASOS_DIR
+
+# (path, mtime_ns, size) -> sha256; evita releer archivos que no cambiaron
+_HUELLAS_ARCHIVO: Dict[Tuple[str, int, int], str] = {}
+
+
+def combinar(*partes: Optional[str]) -> str:
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(b"\x00" if parte is None else parte.encode("utf-8"))
+        h.update(b"|")
+    return h.hexdigest()
+
+
+def huella_archivo(path: Path) -> str:
+    """sha256 del contenido (None-safe: archivo inexistente → huella fija)."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return combinar("ausente", str(path))
+    clave = (str(path), st.st_mtime_ns, st.st_size)
+    if clave not in _HUELLAS_ARCHIVO:
+        _HUELLAS_ARCHIVO[clave] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return _HUELLAS_ARCHIVO[clave]
+
+
+def huella_frame(df: pd.DataFrame) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def huella_objeto(obj: Any) -> str:
+    """Hash de contenido de un artefacto (DataFrame, dict de frames o estructura JSON)."""
+    if isinstance(obj, pd.DataFrame):
+        return huella_frame(obj)
+    if isinstance(obj, dict) and obj and all(isinstance(v, pd.DataFrame) for v in obj.values()):
+        return combinar(*(f"{k}={huella_frame(obj[k])}" for k in sorted(obj)))
+    canon = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+class CachePasos:
+    """Estado por paso en `<dir>/<paso>/estado.json` + salidas en `<salida>.pkl`."""
+
+    def __init__(self, directorio: Path = CACHE_PASOS_DIR) -> None:
+        self.directorio = directorio
+
+    def _dir(self, paso: str) -> Path:
+        return self.directorio / paso
+
+    def estado(self, paso: str) -> Optional[Dict[str, Any]]:
+        path = self._dir(paso) / "estado.json"
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except ValueError:
+            return None
+
+    def vigente(self, paso: str, huella: str) -> Optional[Dict[str, Any]]:
+        """Estado del paso si su última corrida exitosa tiene la misma huella."""
+        est = self.estado(paso)
+        if not est or est.get("huella") != huella:
+            return None
+        if not all((self._dir(paso) / f"{s}.pkl").exists() for s in est.get("salidas", {})):
+            return None
+        return est
+
+    def cargar_salidas(self, paso: str, nombres: Iterable[str]) -> Tuple[Any, ...]:
+        salidas = []
+        for nombre in nombres:
+            with (self._dir(paso) / f"{nombre}.pkl").open("rb") as f:
+                salidas.append(pickle.load(f))
+        return tuple(salidas)
+
+    def guardar(
+        self,
+        paso: str,
+        huella: str,
+        salidas: Dict[str, Any],
+        huellas_salidas: Dict[str, Optional[str]],
+    ) -> None:
+        d = self._dir(paso)
+        d.mkdir(parents=True, exist_ok=True)
+        for nombre, valor in salidas.items():
+            tmp = d / f"{nombre}.pkl.tmp"
+            with tmp.open("wb") as f:
+                pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, d / f"{nombre}.pkl")
+        self._escribir_estado(paso, {"huella": huella, "salidas": huellas_salidas})
+
+    def _escribir_estado(self, paso: str, est: Dict[str, Any]) -> None:
+        path = self._dir(paso) / "estado.json"
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(est, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
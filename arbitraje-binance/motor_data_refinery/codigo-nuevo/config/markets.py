@@ -0,0 +1,158 @@
+# codigo/config/markets.py
+"""
+Snapshot compartido de markets (un solo `load_markets()` por corrida).
+
+El primer paso que necesita markets los descarga de CCXT y los guarda en
+`datos/snapshots/markets_<exchange>.json.gz` (versionado, compacto, con TTL y
+hash de contenido). El resto de los pasos los leen desde disco en milisegundos.
+
+Uso:
+    python -m config.markets              # asegura snapshot vigente
+    python -m config.markets --refrescar  # fuerza descarga
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import ccxt
+
+from .config import EXCHANGE_ID, SNAPSHOTS_DIR, MARKETS_SNAPSHOT_TTL
+from .replay_exchange import crear_exchange
+
+SNAPSHOT_VERSION = 1
+
+# Cache en proceso: exchange_id -> payload completo del snapshot
+_CACHE: Dict[str, Dict[str, Any]] = {}
+
+
+def snapshot_path(exchange_id: str = EXCHANGE_ID) -> Path:
+    return SNAPSHOTS_DIR / f"markets_{exchange_id}.json.gz"
+
+
+def hash_markets(markets: Dict[str, Any]) -> str:
+    """Hash de contenido estable (claves ordenadas, sin espacios)."""
+    canon = json.dumps(markets, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+def descargar_markets(exchange_id: str = EXCHANGE_ID) -> Dict[str, Any]:
+    """Única llamada de red: instancia el exchange y ejecuta `load_markets()`."""
+    exchange = crear_exchange(exchange_id)
+    return exchange.load_markets()
+
+
+def guardar_snapshot(markets: Dict[str, Any], exchange_id: str = EXCHANGE_ID) -> Dict[str, Any]:
+    """Escribe el snapshot de forma atómica (tmp + replace) y devuelve su payload."""
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "exchange_id": exchange_id,
+        "creado_ts": time.time(),
+        "sha256": hash_markets(markets),
+        "n_markets": len(markets),
+        "markets": markets,
+    }
+    path = snapshot_path(exchange_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=5) as f:
+        json.dump(payload, f, separators=(",", ":"), default=str)
+    os.replace(tmp, path)
+    _CACHE[exchange_id] = payload
+    return payload
+
+
+def leer_snapshot(exchange_id: str = EXCHANGE_ID, verificar: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Lee el snapshot de disco. Devuelve None si no existe, es de otra versión
+    o (con `verificar=True`) su hash no coincide con el contenido.
+    """
+    path = snapshot_path(exchange_id)
+    if not path.exists():
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError) as exc:
+        print(f"⚠️ Snapshot ilegible {path}: {exc}")
+        return None
+
+    if payload.get("version") != SNAPSHOT_VERSION or payload.get("exchange_id") != exchange_id:
+        return None
+    if verificar and hash_markets(payload["markets"]) != payload.get("sha256"):
+        print(f"⚠️ Hash inválido en {path}; se descarta el snapshot.")
+        return None
+    return payload
+
+
+def _vigente(payload: Dict[str, Any], ttl: int) -> bool:
+    return (time.time() - float(payload.get("creado_ts", 0))) <= ttl
+
+
+def cargar_snapshot(
+    exchange_id: str = EXCHANGE_ID,
+    ttl: int = MARKETS_SNAPSHOT_TTL,
+    refrescar: bool = False,
+) -> Dict[str, Any]:
+    """
+    Devuelve el payload del snapshot vigente (memoria → disco → red).
+    Solo descarga si no hay snapshot, está vencido o se pide `refrescar`.
+    """
+    if not refrescar:
+        payload = _CACHE.get(exchange_id)
+        if payload and _vigente(payload, ttl):
+            return payload
+        payload = leer_snapshot(exchange_id)
+        if payload and _vigente(payload, ttl):
+            _CACHE[exchange_id] = payload
+            return payload
+
+    try:
+        markets = descargar_markets(exchange_id)
+    except Exception as exc:
+        raise RuntimeError(f"❌ Error al cargar markets de {exchange_id}: {exc}") from exc
+    payload = guardar_snapshot(markets, exchange_id)
+    print(f"📦 Snapshot de markets actualizado: {snapshot_path(exchange_id)} ({payload['n_markets']} markets)")
+    return payload
+
+
+def cargar_markets(
+    exchange_id: str = EXCHANGE_ID,
+    ttl: int = MARKETS_SNAPSHOT_TTL,
+    refrescar: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """Loader rápido: dict symbol → market (mismo formato que `exchange.markets`)."""
+    return cargar_snapshot(exchange_id, ttl, refrescar)["markets"]
+
+
+def markets_hash(exchange_id: str = EXCHANGE_ID) -> str:
+    """Hash de contenido del snapshot vigente (para huellas de pasos)."""
+    return cargar_snapshot(exchange_id)["sha256"]
+
+
+def exchange_con_markets(
+    exchange_id: str = EXCHANGE_ID,
+    markets: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> "ccxt.Exchange":
+    """Exchange (CCXT, replay o grabador) con los markets inyectados (del snapshot si no se pasan), sin exchangeInfo."""
+    exchange = crear_exchange(exchange_id)
+    exchange.set_markets(markets if markets is not None else cargar_markets(exchange_id))
+    return exchange
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Snapshot compartido de markets")
+    parser.add_argument("--exchange", default=EXCHANGE_ID)
+    parser.add_argument("--refrescar", action="store_true", help="fuerza descarga aunque esté vigente")
+    args = parser.parse_args()
+
+    p = cargar_snapshot(args.exchange, refrescar=args.refrescar)
+    print(f"✅ {args.exchange}: {p['n_markets']} markets | sha256={p['sha256'][:16]}…")
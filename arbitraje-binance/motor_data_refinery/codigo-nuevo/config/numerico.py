@@ -0,0 +1,150 @@
+# codigo/config/numerico.py
+"""
+Núcleo numérico de las cotizaciones: float64 vectorizado adentro, Decimal solo en el borde.
+
+Camino rápido
+    `a_float` parsea columnas enteras (texto de los CSV o floats de CCXT) a
+    float64; divisiones y productos se hacen con numpy sobre la columna. Cada
+    operación IEEE-754 tiene error relativo ≤ U = 2⁻⁵³; una cadena de n
+    operaciones queda acotada por `cota(n)` = nU / (1 − nU). Las cadenas de la
+    refinería son cortas (parseo de cada entrada, 1/p, p/q o x·y, y el texto de
+    salida: n ≤ 4), así que el error relativo es < cota(4) ≈ 4.4e-16: 15
+    dígitos significativos garantizados contra el cálculo Decimal(prec=50).
+
+Borde
+    `texto` formatea una sola vez al exportar: decimal más corto que identifica
+    al float (formato str(Decimal)) o punto fijo a los decimales de salida.
+    `texto_exacto` da el texto de un decimal exacto (Parquet con `exactos=True`).
+    `truncar` corta texto decimal a la precisión del exchange directamente en
+    Decimal sobre el texto de entrada (exacto, nunca pasa por float).
+
+Uso:
+    p = a_float(df["1_base_equivale_x_quote"])      # float64 de un artefacto: sin costo
+    df["1_quote_equivale_x_base"] = 1.0 / p           # float64 también entre pasos
+    csv = texto(df["1_quote_equivale_x_base"])          # texto solo al exportar
+    df["1m"] = truncar(df["1_dolar_equivale_a_quote"], escala=6, decimales=precisiones)
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation, localcontext
+from typing import Any, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+U = 2.0 ** -53          # redondeo unitario de float64
+PRECISION_BORDE = 50    # contexto Decimal del borde (misma precisión que los pasos históricos)
+
+
+def cota(operaciones: int) -> float:
+    """Cota del error relativo acumulado tras `operaciones` operaciones float64."""
+    nu = operaciones * U
+    return nu / (1.0 - nu)
+
+
+def _float(valor: Any) -> float:
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def a_float(valores: Union[pd.Series, Iterable[Any]]) -> np.ndarray:
+    """
+    Columna de texto/números → float64 (redondeo correcto: float() de Python,
+    no el parser rápido de pd.to_numeric, que pierde el último dígito);
+    vacíos, 'nan' o inválidos → NaN.
+    """
+    s = valores if isinstance(valores, pd.Series) else pd.Series(list(valores), dtype=object)
+    if s.dtype != object:
+        return s.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.fromiter((_float(v) for v in s.tolist()), dtype=np.float64, count=len(s))
+
+
+def positivos(x: np.ndarray) -> np.ndarray:
+    """Máscara de valores finitos y > 0 (precios utilizables)."""
+    with np.errstate(invalid="ignore"):
+        return np.isfinite(x) & (x > 0)
+
+
+def equivalencias(df: pd.DataFrame, clave: str, valor: str) -> pd.DataFrame:
+    """
+    Tabla clave → valor float64 a partir de la columna de precios (float64 de un
+    artefacto o texto). Se ignoran vacíos, 'nan' e inválidos; si una clave se
+    repite, gana la última.
+    """
+    claves = df.get(clave, pd.Series("", index=df.index)).astype(str).str.strip()
+    valores = a_float(df.get(valor, pd.Series(np.nan, index=df.index)))
+    validos = (claves != "") & ~np.isnan(valores)
+    return (
+        pd.DataFrame({"clave": claves, "valor": valores})[validos]
+        .drop_duplicates("clave", keep="last")
+        .set_index("clave")
+    )
+
+
+# ───── borde: float → texto ─────
+def texto(valores: np.ndarray, decimales: Optional[int] = None) -> np.ndarray:
+    """
+    float64 → texto. Sin `decimales`: decimal más corto que identifica al float,
+    con el formato de str(Decimal); con `decimales`: punto fijo redondeado
+    (half-even sobre el valor binario exacto). NaN/inf → "".
+    """
+    xs = np.asarray(valores, dtype=np.float64)
+    finitos = np.isfinite(xs).tolist()
+    if decimales is None:
+        return np.array([str(Decimal(repr(x))) if f else "" for x, f in zip(xs.tolist(), finitos)], dtype=object)
+    return np.array([f"{x:.{decimales}f}" if f else "" for x, f in zip(xs.tolist(), finitos)], dtype=object)
+
+
+def texto_exacto(valores: Iterable[Any]) -> np.ndarray:
+    """
+    Decimal (o texto decimal) → texto en punto fijo sin ceros de cola
+    ('120.000…' → '120'); faltantes o inválidos → "". Para columnas leídas con
+    `leer_artefacto(..., exactos=True)`.
+    """
+    out = []
+    for v in valores:
+        try:
+            d = v if isinstance(v, Decimal) else Decimal(str(v).strip())
+        except (InvalidOperation, ValueError):
+            out.append("")
+            continue
+        out.append(format(d.normalize(), "f") if d.is_finite() else "")
+    return np.array(out, dtype=object)
+
+
+# ───── borde: truncado exacto ─────
+def _truncar(valor: str, escala: int, decimales: int) -> str:
+    try:
+        bruto = Decimal(valor).scaleb(escala)
+        paso = Decimal(1).scaleb(-decimales)
+        return str((bruto // paso) * paso)
+    except (InvalidOperation, ValueError):
+        return ""
+
+
+def truncar(valores: Union[pd.Series, Iterable[Any]], escala: int,
+            decimales: Union[int, Iterable[int]]) -> np.ndarray:
+    """
+    (valor · 10^escala) truncado hacia cero a `decimales` (uno por fila o fijo),
+    exacto en Decimal sobre el texto de entrada: mismo resultado que
+    `str((bruto // paso) * paso)` fila a fila, sin el costo de `df.apply`.
+    """
+    textos = [str(v).strip() for v in valores]
+    decs = [decimales] * len(textos) if np.isscalar(decimales) else [int(d) for d in decimales]
+    with localcontext() as ctx:
+        ctx.prec = PRECISION_BORDE
+        return np.array([_truncar(t, escala, d) for t, d in zip(textos, decs)], dtype=object)
+
+
+def decimales_de(valores: Iterable[Any]) -> np.ndarray:
+    """Decimales significativos de cada precio (−exponente de Decimal.normalize()): '0.0100' → 2, '100' → −2."""
+    out = []
+    for v in valores:
+        try:
+            out.append(-Decimal(str(v).strip()).normalize().as_tuple().exponent)
+        except (InvalidOperation, ValueError):
+            out.append(0)
+    return np.asarray(out, dtype=np.int64)
@@ -0,0 +1,233 @@
+# codigo/config/orderbook.py
+"""
+Order book local sincronizado por snapshot + diffs `depthUpdate` (protocolo Binance).
+
+- `Escalera`: un lado del libro en arrays numpy ordenados (bids desc, asks asc),
+  con inserción/borrado in-place por búsqueda binaria.
+- `LibroLocal`: aplica snapshot (lastUpdateId / nonce) y diffs (U/u) validando
+  secuencia. Ante un hueco se marca desincronizado y pide resync.
+- `GestorLibros`: varios símbolos; resincroniza solo con `obtener_snapshot`.
+- `simular_absorcion`: mismo resultado que en modulo_absorcion, pero sobre la
+  escalera en memoria (sin REST ni parseo).
+
+Reglas de sincronización (Binance spot):
+  1. Bufferizar eventos del stream.
+  2. Snapshot REST con lastUpdateId.
+  3. Descartar eventos con u <= lastUpdateId.
+  4. El primero aplicado debe cumplir U <= lastUpdateId+1 <= u.
+  5. Luego cada evento debe cumplir U == u_anterior + 1; si no → resync.
+  6. Cantidad 0 → se elimina el nivel.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class Escalera:
+    """Un lado del libro. Internamente guarda claves ascendentes (signo * precio)."""
+
+    def __init__(self, descendente: bool, capacidad: int = 256) -> None:
+        self._signo = -1.0 if descendente else 1.0
+        self._claves = np.empty(capacidad, dtype=np.float64)
+        self._cant = np.empty(capacidad, dtype=np.float64)
+        self.n = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _crecer(self) -> None:
+        cap = max(16, 2 * len(self._claves))
+        for nombre in ("_claves", "_cant"):
+            viejo = getattr(self, nombre)
+            nuevo = np.empty(cap, dtype=np.float64)
+            nuevo[: self.n] = viejo[: self.n]
+            setattr(self, nombre, nuevo)
+
+    def cargar(self, niveles: Iterable[Iterable[Any]]) -> None:
+        """Reemplaza el lado completo (niveles `[precio, cantidad, ...]`)."""
+        arr = np.array([(float(p), float(q)) for p, q, *_ in niveles if float(q) > 0], dtype=np.float64)
+        arr = arr.reshape(-1, 2)
+        claves = self._signo * arr[:, 0]
+        orden = np.argsort(claves, kind="stable")
+        self.n = len(orden)
+        while len(self._claves) < self.n:
+            self._crecer()
+        self._claves[: self.n] = claves[orden]
+        self._cant[: self.n] = arr[orden, 1]
+
+    def actualizar(self, precio: float, cantidad: float) -> None:
+        clave = self._signo * precio
+        n = self.n
+        i = int(np.searchsorted(self._claves[:n], clave))
+        existe = i < n and self._claves[i] == clave
+        if cantidad == 0:
+            if existe:
+                self._claves[i:n - 1] = self._claves[i + 1:n]
+                self._cant[i:n - 1] = self._cant[i + 1:n]
+                self.n -= 1
+            return
+        if existe:
+            self._cant[i] = cantidad
+            return
+        if n == len(self._claves):
+            self._crecer()
+        self._claves[i + 1:n + 1] = self._claves[i:n]
+        self._cant[i + 1:n + 1] = self._cant[i:n]
+        self._claves[i] = clave
+        self._cant[i] = cantidad
+        self.n += 1
+
+    def precios(self) -> np.ndarray:
+        return self._signo * self._claves[: self.n]
+
+    def cantidades(self) -> np.ndarray:
+        return self._cant[: self.n]
+
+    def mejor(self) -> Optional[Tuple[float, float]]:
+        if not self.n:
+            return None
+        return float(self._signo * self._claves[0]), float(self._cant[0])
+
+    def niveles(self, k: Optional[int] = None) -> List[List[float]]:
+        k = self.n if k is None else min(k, self.n)
+        return np.column_stack((self.precios()[:k], self._cant[:k])).tolist()
+
+    def simular_absorcion(self, slippage_pct: float) -> Tuple[float, int, float]:
+        """
+        Recorre niveles desde el mejor precio sin pasar el slippage tolerado.
+        Devuelve (quote_usado, niveles_usados, precio_limite) como la versión de modulo_absorcion.
+        """
+        n = self.n
+        if not n:
+            return 0.0, 0, 0.0
+        mejor = self._signo * self._claves[0]
+        limite = mejor * (1 + self._signo * slippage_pct)
+        k = int(np.searchsorted(self._claves[:n], self._signo * limite, side="right"))
+        precios = self._signo * self._claves[:k]
+        return float(precios @ self._cant[:k]), k, float(limite)
+
+
+class LibroLocal:
+    def __init__(self, symbol: str, capacidad: int = 256) -> None:
+        self.symbol = symbol
+        self.bids = Escalera(descendente=True, capacidad=capacidad)
+        self.asks = Escalera(descendente=False, capacidad=capacidad)
+        self.last_update_id: Optional[int] = None   # None = sin snapshot / desincronizado
+        self.sincronizado = False                   # True tras aplicar el primer diff válido
+        self.buffer: Deque[Dict[str, Any]] = deque()
+        self.eventos = 0
+        self.gaps = 0
+        self.resyncs = 0
+
+    @property
+    def listo(self) -> bool:
+        return self.last_update_id is not None
+
+    def aplicar_snapshot(self, snapshot: Dict[str, Any]) -> bool:
+        """
+        Carga el snapshot (formato REST Binance o CCXT con `nonce`) y reaplica
+        el buffer. Devuelve False si el buffer ya revela un hueco (hay que pedir otro).
+        """
+        lid = snapshot.get("lastUpdateId", snapshot.get("nonce"))
+        self.bids.cargar(snapshot.get("bids") or [])
+        self.asks.cargar(snapshot.get("asks") or [])
+        self.last_update_id = int(lid or 0)
+        self.sincronizado = False
+        pendientes = list(self.buffer)
+        self.buffer.clear()
+        for ev in pendientes:
+            if not self._aplicar(ev):
+                return False
+        return True
+
+    def procesar(self, evento: Dict[str, Any]) -> bool:
+        """Aplica (o bufferiza) un `depthUpdate`. False → hay que resincronizar."""
+        if self.last_update_id is None:
+            self.buffer.append(evento)
+            return True
+        return self._aplicar(evento)
+
+    def _aplicar(self, ev: Dict[str, Any]) -> bool:
+        primero, ultimo = int(ev["U"]), int(ev["u"])
+        if ultimo <= self.last_update_id:
+            return True  # ya contenido en el snapshot
+        esperado = self.last_update_id + 1
+        if (not self.sincronizado and primero > esperado) or (self.sincronizado and primero != esperado):
+            self._desincronizar(ev)
+            return False
+        for p, q, *_ in ev.get("b", ()):
+            self.bids.actualizar(float(p), float(q))
+        for p, q, *_ in ev.get("a", ()):
+            self.asks.actualizar(float(p), float(q))
+        self.last_update_id = ultimo
+        self.sincronizado = True
+        self.eventos += 1
+        return True
+
+    def _desincronizar(self, ev: Dict[str, Any]) -> None:
+        self.gaps += 1
+        self.last_update_id = None
+        self.sincronizado = False
+        self.buffer.clear()
+        self.buffer.append(ev)
+
+    def simular_absorcion(self, slippage_pct: float, lado: str = "asks") -> Tuple[float, int, float]:
+        return (self.asks if lado == "asks" else self.bids).simular_absorcion(slippage_pct)
+
+    def a_dict(self, profundidad: Optional[int] = None) -> Dict[str, Any]:
+        """Formato CCXT (`bids`/`asks`/`nonce`) para compatibilidad con código existente."""
+        return {
+            "symbol": self.symbol,
+            "bids": self.bids.niveles(profundidad),
+            "asks": self.asks.niveles(profundidad),
+            "nonce": self.last_update_id,
+        }
+
+
+class GestorLibros:
+    """
+    Libros locales por símbolo. `obtener_snapshot(symbol)` se llama para el
+    snapshot inicial y en cada resync (p.ej. `exchange.fetch_order_book(s, 1000)`).
+    """
+
+    MAX_RESYNCS_SEGUIDOS = 5
+
+    def __init__(
+        self,
+        obtener_snapshot: Callable[[str], Dict[str, Any]],
+        symbols: Iterable[str],
+        ids: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.obtener_snapshot = obtener_snapshot
+        self.libros: Dict[str, LibroLocal] = {s: LibroLocal(s) for s in symbols}
+        # id del exchange (campo "s" del evento, p.ej. BTCUSDT) → symbol CCXT
+        ids = ids or {s: s.replace("/", "") for s in self.libros}
+        self._por_id = {str(v).upper(): k for k, v in ids.items()}
+
+    def resincronizar(self, symbol: str) -> None:
+        libro = self.libros[symbol]
+        for _ in range(self.MAX_RESYNCS_SEGUIDOS):
+            libro.resyncs += 1
+            if libro.aplicar_snapshot(self.obtener_snapshot(symbol)):
+                return
+        print(f"⚠️ {symbol}: no se pudo resincronizar tras {self.MAX_RESYNCS_SEGUIDOS} snapshots")
+
+    def procesar(self, evento: Dict[str, Any]) -> Optional[str]:
+        """Enruta un `depthUpdate` por su campo `s`. Devuelve el symbol afectado."""
+        symbol = evento.get("symbol") or self._por_id.get(str(evento.get("s", "")).upper())
+        libro = self.libros.get(symbol) if symbol else None
+        if libro is None:
+            return None
+        if not libro.procesar(evento) or not libro.listo:
+            self.resincronizar(symbol)
+        return symbol
+
+    def simular_absorcion(self, symbol: str, slippage_pct: float, lado: str = "asks") -> Tuple[float, int, float]:
+        libro = self.libros[symbol]
+        if not libro.listo:
+            self.resincronizar(symbol)
+        return libro.simular_absorcion(slippage_pct, lado)
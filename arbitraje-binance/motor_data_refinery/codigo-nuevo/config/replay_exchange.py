@@ -0,0 +1,368 @@
+# codigo/config/replay_exchange.py
+"""
+Exchange de replay determinístico + grabador de sesiones, y la fábrica
+`crear_exchange()` que usan todos los pasos en lugar de `getattr(ccxt, ...)`.
+
+Implementa el subconjunto de CCXT que usa el pipeline: `load_markets`,
+`set_markets`, `markets`, `symbols`, `fetch_ticker`, `fetch_tickers`,
+`fetch_bids_asks`, `fetch_order_book` y `close`, en versión sync y async.
+
+Formato de grabación (`EXCHANGE_REPLAY_DIR/<exchange>/`):
+- markets.json.gz   dict symbol → market
+- llamadas.jsonl    una línea por llamada:
+                    {"metodo", "clave", "ts", "latencia_ms", "resultado"}
+
+Modo (EXCHANGE_MODO): live | replay | grabar.
+
+Uso:
+    EXCHANGE_MODO=grabar python orquestador.py ...          # graba una corrida real
+    python -m config.replay_exchange --grabar --exchange kraken   # tickers + libros de pares_involucrados
+    EXCHANGE_MODO=replay EXCHANGE_REPLAY_LATENCIA_MS=grabada python orquestador.py ...
+    python -m config.replay_exchange --info
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import threading
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import ccxt
+import ccxt.async_support as ccxt_async
+
+from .config import (
+    CCXT_OPTIONS, EXCHANGE_ID, EXCHANGE_MODO,
+    EXCHANGE_REPLAY_DIR, EXCHANGE_REPLAY_LATENCIA_MS,
+)
+
+GRABABLES = ("fetch_ticker", "fetch_tickers", "fetch_bids_asks", "fetch_order_book")
+TODOS = "*"  # clave de las llamadas de todo el universo
+
+
+def dir_sesion(exchange_id: str, base: Path = EXCHANGE_REPLAY_DIR) -> Path:
+    return Path(base) / exchange_id
+
+
+# ───────────────────────── Grabación ─────────────────────────
+class Grabador:
+    """Proxy sobre un exchange CCXT (sync o async) que graba cada llamada relevante."""
+
+    def __init__(self, exchange, directorio: Optional[Path] = None) -> None:
+        self._ex = exchange
+        self._dir = directorio or dir_sesion(exchange.id)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def __getattr__(self, nombre: str):
+        attr = getattr(self._ex, nombre)
+        if nombre in GRABABLES:
+            return self._envolver(nombre, attr)
+        if nombre in ("load_markets", "set_markets"):
+            return self._envolver_markets(attr)
+        return attr
+
+    def _clave(self, args: tuple) -> str:
+        primero = args[0] if args else None
+        if primero is None:
+            return TODOS
+        return primero if isinstance(primero, str) else ",".join(sorted(primero))
+
+    def _escribir(self, metodo: str, args: tuple, t0: float, resultado: Any) -> None:
+        linea = json.dumps({
+            "metodo": metodo,
+            "clave": self._clave(args),
+            "ts": time.time(),
+            "latencia_ms": (time.perf_counter() - t0) * 1000.0,
+            "resultado": resultado,
+        }, separators=(",", ":"), default=str)
+        with self._lock, (self._dir / "llamadas.jsonl").open("a", encoding="utf-8") as f:
+            f.write(linea + "\n")
+
+    def _envolver(self, metodo: str, fn):
+        if asyncio.iscoroutinefunction(fn):
+            async def envuelta_async(*args, **kwargs):
+                t0 = time.perf_counter()
+                r = await fn(*args, **kwargs)
+                self._escribir(metodo, args, t0, r)
+                return r
+            return envuelta_async
+
+        def envuelta(*args, **kwargs):
+            t0 = time.perf_counter()
+            r = fn(*args, **kwargs)
+            self._escribir(metodo, args, t0, r)
+            return r
+        return envuelta
+
+    def _guardar_markets(self, markets: Dict[str, Any]) -> None:
+        with self._lock, gzip.open(self._dir / "markets.json.gz", "wt", encoding="utf-8") as f:
+            json.dump(markets, f, separators=(",", ":"), default=str)
+
+    def _envolver_markets(self, fn):
+        if asyncio.iscoroutinefunction(fn):
+            async def envuelta_async(*args, **kwargs):
+                r = await fn(*args, **kwargs)
+                self._guardar_markets(self._ex.markets)
+                return r
+            return envuelta_async
+
+        def envuelta(*args, **kwargs):
+            r = fn(*args, **kwargs)
+            self._guardar_markets(self._ex.markets)
+            return r
+        return envuelta
+
+
+# ───────────────────────── Replay ─────────────────────────
+class Grabacion:
+    """Índice en memoria de una sesión grabada (se comparte entre instancias)."""
+
+    _cache: Dict[Path, "Grabacion"] = {}
+
+    def __init__(self, directorio: Path) -> None:
+        self.directorio = directorio
+        path_markets = directorio / "markets.json.gz"
+        if not path_markets.exists():
+            raise RuntimeError(f"❌ No hay grabación de markets en {path_markets}")
+        with gzip.open(path_markets, "rt", encoding="utf-8") as f:
+            self.markets: Dict[str, Any] = json.load(f)
+        # (metodo, clave) → [(latencia_ms, resultado), ...] en orden de grabación
+        self.llamadas: Dict[Tuple[str, str], List[Tuple[float, Any]]] = defaultdict(list)
+        for nombre in ("llamadas.jsonl", "llamadas.jsonl.gz"):
+            path = directorio / nombre
+            if not path.exists():
+                continue
+            abrir = gzip.open if nombre.endswith(".gz") else open
+            with abrir(path, "rt", encoding="utf-8") as f:
+                for linea in f:
+                    if linea.strip():
+                        r = json.loads(linea)
+                        self.llamadas[(r["metodo"], r["clave"])].append((float(r.get("latencia_ms") or 0), r["resultado"]))
+        # último ticker / bid-ask conocido por símbolo (para armar respuestas parciales)
+        self.tickers = self._ultimos("fetch_ticker", "fetch_tickers")
+        self.bids_asks = self._ultimos(None, "fetch_bids_asks")
+
+    @classmethod
+    def cargar(cls, directorio: Path) -> "Grabacion":
+        directorio = Path(directorio)
+        if directorio not in cls._cache:
+            cls._cache[directorio] = Grabacion(directorio)
+        return cls._cache[directorio]
+
+    def _ultimos(self, individual: Optional[str], masivo: str) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for (metodo, clave), respuestas in self.llamadas.items():
+            if metodo == masivo:
+                for _, r in respuestas:
+                    out.update(r or {})
+        if individual:
+            for (metodo, clave), respuestas in self.llamadas.items():
+                if metodo == individual and respuestas:
+                    out[clave] = respuestas[-1][1]
+        return out
+
+
+class ExchangeReplay:
+    """Exchange offline: responde desde una `Grabacion` con latencia inyectada determinística."""
+
+    def __init__(
+        self,
+        exchange_id: str = EXCHANGE_ID,
+        directorio: Optional[Path] = None,
+        latencia_ms: str = EXCHANGE_REPLAY_LATENCIA_MS,
+        jitter_ms: float = 0.0,
+        semilla: int = 0,
+    ) -> None:
+        self.id = exchange_id
+        self.grabacion = Grabacion.cargar(directorio or dir_sesion(exchange_id))
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.semilla = semilla
+        self.has = {"fetchTicker": True, "fetchTickers": True, "fetchBidsAsks": True, "fetchOrderBook": True}
+        self.markets: Dict[str, Any] = {}
+        self.symbols: List[str] = []
+        self.markets_by_id: Dict[str, Any] = {}
+        self._cursores: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    # ───── markets ─────
+    def set_markets(self, markets: Dict[str, Any], currencies=None) -> Dict[str, Any]:
+        self.markets = dict(markets)
+        self.symbols = sorted(self.markets)
+        self.markets_by_id = {m.get("id"): [m] for m in self.markets.values() if isinstance(m, dict)}
+        return self.markets
+
+    def _load_markets(self, reload: bool = False) -> Dict[str, Any]:
+        if reload or not self.markets:
+            self.set_markets(self.grabacion.markets)
+        return self.markets
+
+    # ───── respuestas ─────
+    def _siguiente(self, metodo: str, clave: str) -> Optional[Tuple[float, Any]]:
+        """Respuestas grabadas en orden; al agotarse se repite la última."""
+        respuestas = self.grabacion.llamadas.get((metodo, clave))
+        if not respuestas:
+            return None
+        with self._lock:
+            n = self._cursores[(metodo, clave)]
+            self._cursores[(metodo, clave)] = n + 1
+        return respuestas[min(n, len(respuestas) - 1)]
+
+    def _latencia(self, metodo: str, clave: str, grabada: float) -> float:
+        base = grabada if self.latencia_ms == "grabada" else float(self.latencia_ms or 0)
+        if self.jitter_ms:
+            h = zlib.crc32(f"{self.semilla}|{metodo}|{clave}|{self._cursores[(metodo, clave)]}".encode())
+            base += (h / 0xFFFFFFFF) * self.jitter_ms
+        return base / 1000.0
+
+    def _responder(self, metodo: str, *args) -> Tuple[float, Any]:
+        primero = args[0] if args else None
+        if metodo in ("fetch_ticker", "fetch_order_book"):
+            grab = self._siguiente(metodo, primero)
+            if grab is None and metodo == "fetch_ticker" and primero in self.grabacion.tickers:
+                grab = (0.0, self.grabacion.tickers[primero])
+            if grab is None:
+                raise ccxt.BadSymbol(f"{self.id} replay: sin grabación de {metodo}({primero})")
+            lat, r = grab
+            if metodo == "fetch_order_book" and len(args) > 1 and args[1]:
+                r = {**r, "bids": r["bids"][: args[1]], "asks": r["asks"][: args[1]]}
+            return self._latencia(metodo, primero, lat), r
+
+        # fetch_tickers / fetch_bids_asks
+        universo = self.grabacion.tickers if metodo == "fetch_tickers" else self.grabacion.bids_asks
+        grab = self._siguiente(metodo, TODOS)
+        lat, todos = grab if grab is not None else (0.0, universo)
+        if primero is None:
+            return self._latencia(metodo, TODOS, lat), dict(todos)
+        out = {s: todos.get(s) or universo[s] for s in primero if (todos.get(s) or universo.get(s))}
+        return self._latencia(metodo, TODOS, lat), out
+
+    def _llamar(self, metodo: str, *args):
+        espera, r = self._responder(metodo, *args)
+        if espera > 0:
+            time.sleep(espera)
+        return r
+
+    # ───── API CCXT (sync) ─────
+    def load_markets(self, reload: bool = False, params=None) -> Dict[str, Any]:
+        return self._load_markets(reload)
+
+    def fetch_ticker(self, symbol: str, params=None):
+        return self._llamar("fetch_ticker", symbol)
+
+    def fetch_tickers(self, symbols: Optional[List[str]] = None, params=None):
+        return self._llamar("fetch_tickers", symbols)
+
+    def fetch_bids_asks(self, symbols: Optional[List[str]] = None, params=None):
+        return self._llamar("fetch_bids_asks", symbols)
+
+    def fetch_order_book(self, symbol: str, limit: Optional[int] = None, params=None):
+        return self._llamar("fetch_order_book", symbol, limit)
+
+    def close(self) -> None:
+        pass
+
+
+class ExchangeReplayAsync(ExchangeReplay):
+    """Misma grabación, API async (para config.fetch_async)."""
+
+    async def _llamar_async(self, metodo: str, *args):
+        espera, r = self._responder(metodo, *args)
+        if espera > 0:
+            await asyncio.sleep(espera)
+        return r
+
+    async def load_markets(self, reload: bool = False, params=None) -> Dict[str, Any]:
+        return self._load_markets(reload)
+
+    async def fetch_ticker(self, symbol: str, params=None):
+        return await self._llamar_async("fetch_ticker", symbol)
+
+    async def fetch_tickers(self, symbols: Optional[List[str]] = None, params=None):
+        return await self._llamar_async("fetch_tickers", symbols)
+
+    async def fetch_bids_asks(self, symbols: Optional[List[str]] = None, params=None):
+        return await self._llamar_async("fetch_bids_asks", symbols)
+
+    async def fetch_order_book(self, symbol: str, limit: Optional[int] = None, params=None):
+        return await self._llamar_async("fetch_order_book", symbol, limit)
+
+    async def close(self) -> None:
+        pass
+
+
+# ───────────────────────── Fábrica ─────────────────────────
+def crear_exchange(
+    exchange_id: str = EXCHANGE_ID,
+    opciones: Optional[Dict[str, Any]] = None,
+    asincronico: bool = False,
+    modo: Optional[str] = None,
+):
+    """
+    Punto único de creación de exchanges. Según `modo` (por defecto EXCHANGE_MODO):
+    - live:   CCXT real (sync o async_support)
+    - replay: ExchangeReplay / ExchangeReplayAsync desde EXCHANGE_REPLAY_DIR
+    - grabar: CCXT real envuelto en `Grabador`
+    """
+    modo = (modo or EXCHANGE_MODO).lower()
+    if modo == "replay":
+        return (ExchangeReplayAsync if asincronico else ExchangeReplay)(exchange_id)
+    if modo not in ("live", "grabar"):
+        raise RuntimeError(f"❌ EXCHANGE_MODO inválido: {modo!r} (live | replay | grabar)")
+    modulo = ccxt_async if asincronico else ccxt
+    ex = getattr(modulo, exchange_id)({**CCXT_OPTIONS, **(opciones or {})})
+    return Grabador(ex) if modo == "grabar" else ex
+
+
+def es_ccxt_real(exchange) -> bool:
+    return isinstance(exchange, ccxt.Exchange)
+
+
+if __name__ == "__main__":
+    import argparse
+    import csv
+
+    from .config import ABSORCION_DIR
+
+    parser = argparse.ArgumentParser(description="Grabación / inspección de sesiones de replay")
+    parser.add_argument("--exchange", default=EXCHANGE_ID)
+    parser.add_argument("--grabar", action="store_true", help="graba markets, tickers y libros (red)")
+    parser.add_argument("--pares", type=Path, default=ABSORCION_DIR / "pares_involucrados.csv",
+                        help="símbolos cuyo order book se graba")
+    parser.add_argument("--info", action="store_true")
+    args = parser.parse_args()
+
+    if args.grabar:
+        ex = crear_exchange(args.exchange, modo="grabar")
+        ex.load_markets()
+        for metodo in ("fetchTickers", "fetchBidsAsks"):
+            if ex.has.get(metodo):
+                try:
+                    getattr(ex, {"fetchTickers": "fetch_tickers", "fetchBidsAsks": "fetch_bids_asks"}[metodo])()
+                except Exception as e:
+                    print(f"⚠️ {metodo}: {e}")
+        if args.pares.exists():
+            with args.pares.open(newline="", encoding="utf-8") as f:
+                pares = [r["symbol"] for r in csv.DictReader(f)]
+            for s in pares:
+                if s in ex.markets:
+                    try:
+                        ex.fetch_order_book(s)
+                    except Exception as e:
+                        print(f"⚠️ {s}: {e}")
+        print(f"✅ Sesión grabada en {dir_sesion(args.exchange)}")
+
+    if args.info or not args.grabar:
+        g = Grabacion.cargar(dir_sesion(args.exchange))
+        conteo: Dict[str, int] = defaultdict(int)
+        for (metodo, _), respuestas in g.llamadas.items():
+            conteo[metodo] += len(respuestas)
+        print(f"📼 {g.directorio}: {len(g.markets)} markets | tickers={len(g.tickers)} | bids_asks={len(g.bids_asks)}")
+        for metodo, n in sorted(conteo.items()):
+            print(f"   {metodo}: {n} llamadas")
@@ -0,0 +1,138 @@
+# codigo/config/ruteo.py
+"""
+Ruteabilidad de pares indirectos como campo de bits (columna `ruteo`).
+
+Reemplaza las banderas de texto que viajaban entre pasos ('base:OK|quote:NONE'
+en 8a, 'base:X; quote:Y' en 8) por un entero chico por fila:
+
+  BASE_CONOCIDA   la BASE tiene equivalencia directa contra la referencia
+  QUOTE_CONOCIDA  el QUOTE tiene equivalencia directa contra la referencia
+  INVERTIDO       el QUOTE engancha en un par invertido (BASE == referencia)
+  DIRECTO         el par cotiza directo contra la referencia (QUOTE == referencia)
+
+Los cortes de los pasos 8–11 son máscaras sobre la columna (`tiene`,
+`quote_calculable`, `solo_base`, `ruteable`). El texto se arma recién al
+exportar (`texto_8a`, `texto_8`, `origen`), con el mismo formato de antes;
+`desde_texto` lee CSV viejos que solo traen `cotiza_vs_directo`.
+
+Uso:
+    ruteo = bits(base_ok=..., quote_ok=...)
+    df_quote, df_base = df[quote_calculable(df[COLUMNA_RUTEO])], df[solo_base(df[COLUMNA_RUTEO])]
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+COLUMNA_RUTEO = "ruteo"
+COLUMNA_TEXTO = "cotiza_vs_directo"
+
+BASE_CONOCIDA = 1
+QUOTE_CONOCIDA = 2
+INVERTIDO = 4
+DIRECTO = 8
+
+DTYPE = np.uint8
+
+Mascara = Union[np.ndarray, pd.Series]
+
+
+def _arr(x: Optional[Mascara], n: int) -> np.ndarray:
+    return np.zeros(n, dtype=bool) if x is None else np.asarray(x, dtype=bool)
+
+
+def bits(base_ok: Mascara, quote_ok: Optional[Mascara] = None,
+         invertido: Optional[Mascara] = None, directo: Optional[Mascara] = None) -> np.ndarray:
+    """Máscaras booleanas por fila → columna `ruteo`."""
+    b = np.asarray(base_ok, dtype=bool)
+    n = len(b)
+    out = b.astype(DTYPE) * DTYPE(BASE_CONOCIDA)
+    out |= _arr(quote_ok, n).astype(DTYPE) * DTYPE(QUOTE_CONOCIDA)
+    out |= _arr(invertido, n).astype(DTYPE) * DTYPE(INVERTIDO)
+    out |= _arr(directo, n).astype(DTYPE) * DTYPE(DIRECTO)
+    return out
+
+
+def _valores(ruteo: Mascara) -> np.ndarray:
+    return np.asarray(ruteo).astype(np.int64)
+
+
+def tiene(ruteo: Mascara, mascara: int) -> np.ndarray:
+    """True donde están prendidos todos los bits de `mascara`."""
+    return (_valores(ruteo) & mascara) == mascara
+
+
+def alguno(ruteo: Mascara, mascara: int) -> np.ndarray:
+    """True donde está prendido al menos un bit de `mascara`."""
+    return (_valores(ruteo) & mascara) != 0
+
+
+def quote_calculable(ruteo: Mascara) -> np.ndarray:
+    """Paso 9 → 10: el QUOTE se valúa directo (la BASE puede o no)."""
+    return tiene(ruteo, QUOTE_CONOCIDA)
+
+
+def solo_base(ruteo: Mascara) -> np.ndarray:
+    """Paso 9 → 11: solo la BASE se valúa directo."""
+    v = _valores(ruteo)
+    return ((v & BASE_CONOCIDA) != 0) & ((v & QUOTE_CONOCIDA) == 0)
+
+
+def ruteable(ruteo: Mascara) -> np.ndarray:
+    """Paso 8: engancha por BASE, por QUOTE o por invertido."""
+    return alguno(ruteo, BASE_CONOCIDA | QUOTE_CONOCIDA | INVERTIDO)
+
+
+# ───── texto (solo exportación) ─────
+def texto_8a(ruteo: Mascara) -> np.ndarray:
+    """'base:OK|quote:NONE' y variantes (formato de pares_indirectos_filtrados.csv)."""
+    v = _valores(ruteo)
+    return np.char.add(
+        np.where((v & BASE_CONOCIDA) != 0, "base:OK", "base:NONE"),
+        np.where((v & QUOTE_CONOCIDA) != 0, "|quote:OK", "|quote:NONE"),
+    ).astype(object)
+
+
+def texto_8(ruteo: Mascara, base: pd.Series, quote: pd.Series) -> np.ndarray:
+    """'base:BTC; quote:ETH' / 'base:NONE; quote:NONE' (formato de ruteables_<ref>.csv)."""
+    v = _valores(ruteo)
+    base, quote = base.astype(str).reset_index(drop=True), quote.astype(str).reset_index(drop=True)
+    b = ("base:" + base).where((v & BASE_CONOCIDA) != 0, "base:NONE")
+    q = ("quote:" + quote).where((v & (QUOTE_CONOCIDA | INVERTIDO)) != 0, "quote:NONE")
+    return (b + "; " + q).to_numpy(dtype=object)
+
+
+def origen(ruteo: Mascara) -> np.ndarray:
+    """'invertido' | 'indirecto' | 'NONE' (columna `origen` del paso 8)."""
+    v = _valores(ruteo)
+    return np.where((v & INVERTIDO) != 0, "invertido",
+                    np.where((v & (BASE_CONOCIDA | QUOTE_CONOCIDA)) != 0, "indirecto", "NONE")).astype(object)
+
+
+def con_texto(df: pd.DataFrame, textos: np.ndarray) -> pd.DataFrame:
+    """Copia para exportar con `cotiza_vs_directo` delante de `ruteo` (no toca el frame del DAG)."""
+    out = df.copy()
+    pos = out.columns.get_loc(COLUMNA_RUTEO) if COLUMNA_RUTEO in out.columns else len(out.columns)
+    out.insert(pos, COLUMNA_TEXTO, textos)
+    return out
+
+
+def desde_texto(texto: pd.Series) -> np.ndarray:
+    """`cotiza_vs_directo` de CSV anteriores ('base:…|quote:…' o 'base:…; quote:…') → bits."""
+    t = texto.fillna("").astype(str)
+    return bits(
+        base_ok=(t.str.contains("base:", regex=False) & ~t.str.contains("base:NONE", regex=False)).to_numpy(),
+        quote_ok=(t.str.contains("quote:", regex=False) & ~t.str.contains("quote:NONE", regex=False)).to_numpy(),
+    )
+
+
+def columna(df: pd.DataFrame) -> np.ndarray:
+    """`ruteo` del frame; si no está (CSV viejo), se deriva de `cotiza_vs_directo`."""
+    if COLUMNA_RUTEO in df.columns:
+        return pd.to_numeric(df[COLUMNA_RUTEO], errors="coerce").fillna(0).to_numpy().astype(DTYPE)
+    if COLUMNA_TEXTO in df.columns:
+        return desde_texto(df[COLUMNA_TEXTO])
+    raise RuntimeError(f"❌ Falta la columna '{COLUMNA_RUTEO}' (o '{COLUMNA_TEXTO}') en el CSV de entrada.")
@@ -0,0 +1,107 @@
+# codigo/config/swap.py
+"""
+Reconstrucción de tablas con swap atómico (sin ventana de tabla vacía).
+
+La tabla nueva se crea y llena como `<tabla>__nueva`; al terminar se publica con
+un único RENAME TABLE (atómico en MariaDB):
+
+    RENAME TABLE t TO t__anterior, t__nueva TO t
+
+Los lectores ven la generación vieja completa o la nueva completa, nunca una
+tabla a medio llenar. La generación previa queda en `<tabla>__anterior` para
+rollback instantáneo con `revertir()`.
+
+Con DB_SWAP=0 se vuelve al DROP + CREATE directo sobre la tabla.
+
+Uso:
+    with reconstruir(conn, "tabla_unica") as destino:
+        cur.execute(f"CREATE TABLE `{destino}` ...")
+        cargar_frame(conn, destino, df)
+
+    python -m config.swap --revertir tabla_unica
+"""
+
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+DB_SWAP = os.getenv("DB_SWAP", "1") == "1"
+
+SUFIJO_NUEVA = "__nueva"
+SUFIJO_ANTERIOR = "__anterior"
+_SUFIJO_TMP = "__swap"
+
+
+def _existe(conn: Any, tabla: str) -> bool:
+    with conn.cursor() as cur:
+        cur.execute("SHOW TABLES LIKE %s", (tabla.replace("_", "\\_"),))  # '_' es comodín en LIKE
+        return cur.fetchone() is not None
+
+
+def publicar(conn: Any, tabla: str) -> None:
+    """Publica `<tabla>__nueva` como `<tabla>`; la actual pasa a `<tabla>__anterior`."""
+    nueva, anterior = tabla + SUFIJO_NUEVA, tabla + SUFIJO_ANTERIOR
+    conn.commit()  # filas de la sombra confirmadas antes de publicarla
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS `{anterior}`;")
+        if _existe(conn, tabla):
+            cur.execute(f"RENAME TABLE `{tabla}` TO `{anterior}`, `{nueva}` TO `{tabla}`;")
+        else:
+            cur.execute(f"RENAME TABLE `{nueva}` TO `{tabla}`;")
+
+
+@contextmanager
+def reconstruir(conn: Any, tabla: str, swap: bool = DB_SWAP) -> Iterator[str]:
+    """
+    Entrega el nombre de la tabla a crear y llenar. Al salir sin error la publica;
+    ante error descarta la sombra y la tabla publicada queda intacta.
+    """
+    if not swap:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS `{tabla}`;")
+        yield tabla
+        return
+
+    nueva = tabla + SUFIJO_NUEVA
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS `{nueva}`;")  # restos de una corrida cortada
+    try:
+        yield nueva
+    except BaseException:
+        try:
+            conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS `{nueva}`;")
+        except Exception:
+            pass
+        raise
+    publicar(conn, tabla)
+
+
+def revertir(conn: Any, tabla: str) -> None:
+    """Intercambia `<tabla>` y `<tabla>__anterior` en un solo RENAME (se puede volver a revertir)."""
+    anterior, tmp = tabla + SUFIJO_ANTERIOR, tabla + _SUFIJO_TMP
+    if not _existe(conn, anterior):
+        raise RuntimeError(f"❌ No hay generación anterior de `{tabla}` para revertir.")
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS `{tmp}`;")
+        cur.execute(
+            f"RENAME TABLE `{tabla}` TO `{tmp}`, `{anterior}` TO `{tabla}`, `{tmp}` TO `{anterior}`;"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .db import conexion
+
+    parser = argparse.ArgumentParser(description="Rollback de tablas publicadas con swap")
+    parser.add_argument("--revertir", metavar="TABLA", required=True,
+                        help="vuelve a la generación anterior (p.ej. tabla_unica, funcional_spot_spot)")
+    args = parser.parse_args()
+
+    with conexion() as conn:
+        revertir(conn, args.revertir)
+    print(f"↩️ `{args.revertir}` revertida a la generación anterior.")
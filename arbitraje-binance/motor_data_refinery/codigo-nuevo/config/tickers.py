@@ -0,0 +1,111 @@
+# codigo/config/tickers.py
+"""
+Cotización masiva: una (o pocas) llamadas para todo el universo.
+
+Usa los endpoints de todos-los-símbolos (`fetch_tickers` → ticker/24hr y
+`fetch_bids_asks` → bookTicker) y devuelve una tabla indexada por symbol con
+last/bid/ask tomada en el mismo instante. Solo los símbolos que falten se piden
+uno a uno con `fetch_ticker`.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import ccxt
+import pandas as pd
+
+from .fetch_async import fetch_tickers_individuales
+from .replay_exchange import ExchangeReplay, Grabador
+
+# Con más símbolos que esto conviene pedir el universo completo en una llamada
+UMBRAL_UNIVERSO = 100
+# Tamaño de lote cuando se piden símbolos explícitos
+TAMANO_LOTE = 100
+
+COLUMNAS = ["last", "bid", "ask", "ts", "origen"]
+
+
+def _precio_last(ticker: Dict[str, Any]) -> Optional[float]:
+    return ticker.get("last") or ticker.get("close") or (ticker.get("info", {}) or {}).get("lastPrice")
+
+
+def _lotes(items: List[str], n: int) -> Iterable[List[str]]:
+    for i in range(0, len(items), n):
+        yield items[i:i + n]
+
+
+def _pedir_masivo(exchange, symbols: List[str], metodo: str) -> Dict[str, Dict[str, Any]]:
+    if not exchange.has.get(metodo):
+        return {}
+    fn = getattr(exchange, {"fetchTickers": "fetch_tickers", "fetchBidsAsks": "fetch_bids_asks"}[metodo])
+    try:
+        if len(symbols) > UMBRAL_UNIVERSO:
+            return fn()
+        out: Dict[str, Dict[str, Any]] = {}
+        for lote in _lotes(symbols, TAMANO_LOTE):
+            out.update(fn(lote))
+        return out
+    except Exception as e:
+        print(f"⚠️ {metodo} masivo falló ({e}); se usará fallback por símbolo.")
+        return {}
+
+
+def _pedir_individuales(exchange, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """fetch_ticker por símbolo: concurrente (config.fetch_async) si viene de `crear_exchange`."""
+    if not symbols:
+        return {}
+    if isinstance(exchange, (ccxt.Exchange, ExchangeReplay, Grabador)):
+        return fetch_tickers_individuales(exchange.id, symbols, markets=exchange.markets)
+    out: Dict[str, Dict[str, Any]] = {}
+    for symbol in symbols:
+        try:
+            out[symbol] = exchange.fetch_ticker(symbol)
+        except Exception as e:
+            print(f"⚠️ Error {symbol}: {e}")
+    return out
+
+
+def obtener_precios(exchange, symbols: Iterable[str]) -> pd.DataFrame:
+    """
+    Tabla symbol → last, bid, ask, ts, origen ('masivo' | 'individual').
+    Los símbolos sin precio quedan fuera de la tabla.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    ts_lote = int(time.time() * 1000)
+    tickers = _pedir_masivo(exchange, symbols, "fetchTickers")
+    libros = _pedir_masivo(exchange, symbols, "fetchBidsAsks")
+
+    filas: Dict[str, Dict[str, Any]] = {}
+    for symbol in symbols:
+        t = tickers.get(symbol)
+        b = libros.get(symbol) or {}
+        if not t and not b:
+            continue
+        t = t or {}
+        filas[symbol] = {
+            "last": _precio_last(t),
+            "bid": b.get("bid") or t.get("bid"),
+            "ask": b.get("ask") or t.get("ask"),
+            "ts": ts_lote,
+            "origen": "masivo",
+        }
+
+    # Fallback solo para los faltantes (o sin last)
+    faltantes = [s for s in symbols if not (filas.get(s) or {}).get("last")]
+    if faltantes:
+        print(f"↪️ Fallback individual para {len(faltantes)}/{len(symbols)} símbolos")
+    for symbol, t in _pedir_individuales(exchange, faltantes).items():
+        previo = filas.get(symbol) or {}
+        filas[symbol] = {
+            "last": _precio_last(t),
+            "bid": t.get("bid") or previo.get("bid"),
+            "ask": t.get("ask") or previo.get("ask"),
+            "ts": t.get("timestamp") or int(time.time() * 1000),
+            "origen": "individual",
+        }
+
+    df = pd.DataFrame.from_dict(filas, orient="index", columns=COLUMNAS)
+    df.index.name = "symbol"
+    return df
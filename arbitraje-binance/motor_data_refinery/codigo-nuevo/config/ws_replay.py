@@ -0,0 +1,103 @@
+# codigo/config/ws_replay.py
+"""
+Stand-in local de WebSocket: reproduce mensajes grabados por `config.feed_ws --grabar`.
+
+Formato de entrada (JSONL): una línea por mensaje {"t": <ms recepción>, "m": "<texto crudo>"}.
+También acepta líneas que sean directamente el mensaje crudo (sin "t"/"m").
+
+Responde los SUBSCRIBE como Binance ({"result": null, "id": n}) y luego envía
+los mensajes respetando los tiempos originales (escalados con --velocidad;
+0 = lo más rápido posible).
+
+Uso:
+    python -m config.ws_replay datos/ws/sesion.jsonl --puerto 8765 --velocidad 1
+    python -m config.feed_ws --url ws://127.0.0.1:8765/stream
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from aiohttp import WSMsgType, web
+
+
+def leer_grabacion(path: Path) -> List[Tuple[Optional[float], str]]:
+    mensajes: List[Tuple[Optional[float], str]] = []
+    with path.open(encoding="utf-8") as f:
+        for linea in f:
+            linea = linea.strip()
+            if not linea:
+                continue
+            obj = json.loads(linea)
+            if isinstance(obj, dict) and "m" in obj:
+                m = obj["m"] if isinstance(obj["m"], str) else json.dumps(obj["m"])
+                mensajes.append((obj.get("t"), m))
+            else:
+                mensajes.append((None, linea))
+    return mensajes
+
+
+def crear_app(mensajes: List[Tuple[Optional[float], str]], velocidad: float = 0.0,
+              ruta: str = "/stream", cerrar_al_final: bool = False) -> web.Application:
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+
+        async def responder_subscribes() -> None:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    req = json.loads(msg.data)
+                except ValueError:
+                    continue
+                if isinstance(req, dict) and "id" in req:
+                    await ws.send_json({"result": None, "id": req["id"]})
+
+        lector = asyncio.ensure_future(responder_subscribes())
+        try:
+            t_prev = None
+            for t, m in mensajes:
+                if velocidad > 0 and t is not None and t_prev is not None and t > t_prev:
+                    await asyncio.sleep((t - t_prev) / 1000.0 / velocidad)
+                t_prev = t if t is not None else t_prev
+                if ws.closed:
+                    break
+                await ws.send_str(m)
+            if cerrar_al_final:
+                await ws.close()
+            else:
+                await lector
+        finally:
+            lector.cancel()
+        return ws
+
+    app = web.Application()
+    app.router.add_get(ruta, handler)
+    return app
+
+
+async def iniciar(path: Path, host: str = "127.0.0.1", puerto: int = 8765,
+                  velocidad: float = 0.0, cerrar_al_final: bool = False) -> web.AppRunner:
+    """Arranca el servidor dentro del loop actual (para pruebas); devolver runner → `await runner.cleanup()`."""
+    runner = web.AppRunner(crear_app(leer_grabacion(path), velocidad, cerrar_al_final=cerrar_al_final))
+    await runner.setup()
+    await web.TCPSite(runner, host, puerto).start()
+    return runner
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stand-in WS que reproduce mensajes grabados")
+    parser.add_argument("grabacion", type=Path)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--velocidad", type=float, default=1.0, help="1 = tiempo real, 0 = sin pausas")
+    args = parser.parse_args()
+
+    print(f"🎞️ Replay WS {args.grabacion} en ws://{args.host}:{args.puerto}/stream")
+    web.run_app(crear_app(leer_grabacion(args.grabacion), args.velocidad), host=args.host, port=args.puerto)
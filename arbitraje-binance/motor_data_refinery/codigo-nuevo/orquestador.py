@@ -0,0 +1,366 @@
+# codigo/orquestador.py
+"""
+Orquestador en proceso de la refinería: pasos 0–12 declarados como DAG.
+
+Cada paso declara sus entradas y salidas por nombre; los DataFrames viajan en
+memoria de un paso al siguiente (sin ida y vuelta por CSV/DB) y la persistencia
+queda como *sink* opcional:
+  --archivos  → exporta los mismos artefactos (Parquet tipado + CSV, config/artefactos.py) y .py que los scripts sueltos
+  --db        → escribe las mismas tablas en MariaDB
+
+El paso 3 valida lo persistido: solo entra al DAG con --db, donde la escritura
+de las `sym_*` deja de ser sink y pasa a ser el paso `2_persistir`; `3_validar`
+corre después y relee las tablas de la DB (config/db.py) para compararlas con el
+exchange, como el script suelto. Sin --db no hay nada persistido que validar
+(las `sym_*` en memoria salen de los mismos markets: la comparación no puede fallar).
+
+Ramas independientes (0/1/2, 3/4, 7/8, 10/11 y los sinks) corren en paralelo.
+`6a` no forma parte del DAG: el cotizador directo sale del paso 6.
+Con --grafo, la cadena 6 → 12 se reemplaza por `6b_grafo` (valuación por grafo
+de monedas, config/grafo.py), que produce `cotizaciones_unificadas` directo.
+
+Ejecución incremental: cada paso calcula una huella de sus entradas (hash del
+snapshot de markets, archivos de `static/`, su propio código y hashes de los
+artefactos upstream). Si coincide con la última corrida exitosa, el paso se
+salta y se reutilizan sus salidas cacheadas (`datos/cache_pasos/`). Los pasos
+que consultan precios en vivo (7, 8a) siempre corren. `--sin-cache` fuerza todo.
+La huella incluye todo el paquete `config/` (ahí vive buena parte de la lógica
+de los pasos: criterios, numérico, ruteo, artefactos, ddl/delta…). Los sinks
+pedidos (--archivos/--db) corren siempre, también con salidas cacheadas: el
+destino puede haber cambiado (otra DB, CSV borrados) y la escritura en DB ya
+es incremental (config/delta.py).
+
+Uso:
+    python codigo/orquestador.py
+    python codigo/orquestador.py --archivos --db
+    python codigo/orquestador.py --hasta 7_directas
+    python codigo/orquestador.py --sin-cache
+    python codigo/orquestador.py --grafo --archivos
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+THIS_DIR = Path(__file__).resolve().parent
+CONFIG_DIR = THIS_DIR / "config"
+sys.path.insert(0, str(THIS_DIR))
+from config import (  # type: ignore
+    EXCHANGE_ID, SCHEMA_OUTPUT_PATH, SCHEMA_PRIMARY_PATH, STATIC_DIR,
+    ensure_runtime_dirs, load_schema_or_abort,
+    conexion, cargar_markets, markets_hash, exchange_con_markets,
+)
+from config.huellas import CachePasos, combinar, huella_archivo, huella_objeto  # type: ignore
+
+# Scripts numerados (no importables por nombre: empiezan con dígito)
+ARCHIVOS_PASOS = {
+    "0": "0_mapear_campos_estandar.py",
+    "1": "1_generar_schemas.py",
+    "2": "2_crear_estructura_y_llenar.py",
+    "3": "3_validar_binance.py",
+    "4": "4_generar_tabla_unificada.py",
+    "5": "5_generar_tabla_filtrada_activos.py",
+    "6": "6_symbolos_separacion.py",
+    "6b": "6b_valuacion_grafo.py",
+    "7": "7_generar_cotizaciones_directas.py",
+    "8": "8_generar_ruteables.py",
+    "8a": "8a_preparar_pares_indirectos_filtrados.py",
+    "9": "9_ordenamiento_quote-o-solo-base.py",
+    "10": "10_generar_cotizaciones_indirectas_por_quote.py",
+    "11": "11_generar_cotizaciones_indirectas_por_base.py",
+    "12": "12_unificador_cotizaciones_reales.py",
+}
+
+
+@dataclass(frozen=True)
+class Paso:
+    """Nodo del DAG. `ejecutar` recibe las entradas en orden y devuelve las salidas en orden."""
+    nombre: str
+    ejecutar: Callable[..., Any]
+    entradas: Tuple[str, ...] = ()
+    salidas: Tuple[str, ...] = ()
+    archivos: Optional[Callable[..., None]] = None  # sink CSV/.py (recibe las salidas)
+    db: Optional[Callable[..., None]] = None        # sink MariaDB (recibe las salidas)
+    dependencias: Tuple[Path, ...] = ()             # código/config que entra en la huella
+    cache: bool = True                              # False: siempre corre (datos en vivo)
+    huella: Optional[Callable[..., Tuple[Optional[str], ...]]] = None  # hash propio de salidas
+
+
+def _cargar_modulo(archivo: str) -> ModuleType:
+    path = THIS_DIR / archivo
+    spec = importlib.util.spec_from_file_location(f"paso_{path.stem.replace('-', '_')}", path)
+    if not spec or not spec.loader:
+        raise RuntimeError(f"❌ No pude crear spec para importar: {path}")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)  # type: ignore[attr-defined]
+    return mod
+
+
+def _deps(clave: str, *static: str) -> Tuple[Path, ...]:
+    """Script del paso + módulos de `config/` + archivos de `static/` que condicionan su resultado."""
+    return (THIS_DIR / ARCHIVOS_PASOS[clave], *sorted(CONFIG_DIR.glob("*.py")), *(STATIC_DIR / s for s in static))
+
+
+# ────────────────────────── Definición del DAG ──────────────────────────
+# Pasos que `6b_grafo` reemplaza con --grafo
+CADENA_COTIZACION = ("6_separacion", "7_directas", "8_ruteables", "8a_indirectos",
+                     "9_ordenamiento", "10_por_quote", "11_por_base", "12_unificador")
+# Pasos que solo existen con --db
+PASOS_DB = ("2_persistir", "3_validar")
+
+
+def construir_dag(grafo: bool = False, db: bool = False) -> List[Paso]:
+    m = {k: _cargar_modulo(v) for k, v in ARCHIVOS_PASOS.items()}
+
+    schema_local = load_schema_or_abort()
+    criterios, output_name = m["5"].cargar_criterios()
+    interesado_sep = m["6"].cargar_config()["interesado_en"]
+    interesado_ind = m["8"].cargar_config()["interesado_en"]
+
+    def _db_filtrados(funcional, descartados):
+        m["5"].guardar_resultados_db(funcional, descartados, criterios, output_name)
+
+    def _persistir_sym(sym_tablas):
+        with conexion() as conn:
+            m["2"].persistir_tablas(conn, sym_tablas)
+        return sorted(sym_tablas)
+
+    # Solo con --db (ver docstring): escritura de las sym_* + validación releyendo la DB
+    validacion_db = [
+        Paso("2_persistir", _persistir_sym,
+             ("sym_tablas",), ("sym_persistidas",),
+             cache=False),
+        Paso("3_validar", m["3"].validar_persistidas,
+             ("markets", "sym_persistidas"), ("errores_validacion",),
+             archivos=m["3"].exportar_diff,
+             cache=False),
+    ] if db else []
+
+    pasos = [
+        Paso("markets", lambda: cargar_markets(EXCHANGE_ID), (), ("markets",),
+             cache=False, huella=lambda markets: (markets_hash(EXCHANGE_ID),)),
+        Paso("exchange", lambda markets: exchange_con_markets(EXCHANGE_ID, markets),
+             ("markets",), ("exchange",),
+             cache=False, huella=lambda exchange: (None,)),
+        Paso("0_estandar", lambda markets: m["0"].generar_estandar(markets, EXCHANGE_ID),
+             ("markets",), ("symbols_estandar",),
+             archivos=lambda df: m["0"].guardar_estandar(df, EXCHANGE_ID),
+             dependencias=_deps("0", "campos_estandar.py")),
+        Paso("1_schemas", lambda markets: m["1"].inferir_schema(markets, EXCHANGE_ID),
+             ("markets",), ("schema_inferido",),
+             archivos=lambda schema: m["1"].persistir_schema(schema, EXCHANGE_ID, Path(SCHEMA_OUTPUT_PATH)),
+             dependencias=_deps("1")),
+        Paso("2_estructura", lambda markets: m["2"].construir_tablas(markets, schema_local, EXCHANGE_ID),
+             ("markets",), ("sym_tablas",),
+             dependencias=(*_deps("2"), Path(SCHEMA_PRIMARY_PATH))),
+        *validacion_db,
+        Paso("4_unificada", m["4"].unificar,
+             ("sym_tablas",), ("tabla_unica",),
+             archivos=m["4"].exportar_csv, db=m["4"].guardar_tabla_unica,
+             dependencias=_deps("4", "referencia_tabla_unica.py")),
+        Paso("5_funcional", lambda df: m["5"].aplicar_criterios(df, criterios),
+             ("tabla_unica",), ("funcional", "descartados"),
+             archivos=lambda f, d: m["5"].guardar_resultados_csv(f, d, criterios, output_name),
+             db=_db_filtrados,
+             dependencias=_deps("5", "criterios_filtrados.csv", "fiat.py")),
+        Paso("6_separacion", lambda df: m["6"].separar(df, interesado_sep),
+             ("funcional",), ("cotizador_directo", "cotizador_invertido", "cotizador_indirecto"),
+             archivos=lambda d, i, x: m["6"].exportar(d, i, x, interesado_sep),
+             dependencias=_deps("6", "config_separador.csv")),
+        Paso("7_directas", m["7"].cotizar_directos,
+             ("cotizador_directo", "exchange"), ("cotizaciones_directas", "equivalencias_usdt"),
+             archivos=m["7"].guardar_directos,
+             cache=False),
+        Paso("8_ruteables", m["8"].rutear,
+             ("cotizador_indirecto", "cotizador_directo", "cotizador_invertido"), ("ruteables", "no_ruteables"),
+             archivos=lambda r, n: m["8"].guardar_ruteables(r, n, interesado_ind),
+             dependencias=_deps("8", "config_cotizacion_indirecta.csv")),
+        Paso("8a_indirectos", m["8a"].preparar_pares,
+             ("exchange", "equivalencias_usdt"), ("pares_indirectos",),
+             archivos=m["8a"].guardar_pares,
+             cache=False),
+        Paso("9_ordenamiento", m["9"].ordenar,
+             ("pares_indirectos",), ("quote_calculable", "solo_base"),
+             archivos=m["9"].guardar,
+             dependencias=_deps("9")),
+        Paso("10_por_quote", m["10"].cotizar_por_quote,
+             ("quote_calculable", "equivalencias_usdt"), ("cotizaciones_por_quote",),
+             archivos=m["10"].guardar,
+             dependencias=_deps("10")),
+        Paso("11_por_base", m["11"].cotizar_por_base,
+             ("solo_base", "equivalencias_usdt"), ("cotizaciones_por_base",),
+             archivos=m["11"].guardar,
+             dependencias=_deps("11")),
+        Paso("12_unificador", m["12"].unificar,
+             ("cotizaciones_por_quote", "cotizaciones_por_base", "cotizaciones_directas"),
+             ("cotizaciones_unificadas",),
+             archivos=m["12"].guardar,
+             dependencias=_deps("12")),
+    ]
+    if not grafo:
+        return pasos
+    return [p for p in pasos if p.nombre not in CADENA_COTIZACION] + [
+        Paso("6b_grafo", m["6b"].valuar_pares,
+             ("funcional", "exchange"), ("cotizaciones_unificadas",),
+             archivos=m["6b"].guardar,
+             cache=False),
+    ]
+
+
+# ────────────────────────── Ejecución ──────────────────────────
+def seleccionar(pasos: List[Paso], objetivos: Optional[Iterable[str]]) -> List[Paso]:
+    """Devuelve los pasos necesarios para producir `objetivos` (todos si es None)."""
+    por_nombre = {p.nombre: p for p in pasos}
+    productores = {s: p for p in pasos for s in p.salidas}
+    for p in pasos:
+        faltantes = [e for e in p.entradas if e not in productores]
+        if faltantes:
+            raise RuntimeError(f"❌ Paso '{p.nombre}' sin productor para: {faltantes}")
+    if not objetivos:
+        return list(pasos)
+
+    requeridos: set[str] = set()
+    pila = []
+    for nombre in objetivos:
+        if nombre not in por_nombre:
+            raise RuntimeError(f"❌ Paso desconocido: {nombre}")
+        pila.append(por_nombre[nombre])
+    while pila:
+        p = pila.pop()
+        if p.nombre in requeridos:
+            continue
+        requeridos.add(p.nombre)
+        pila.extend(productores[e] for e in p.entradas)
+    return [p for p in pasos if p.nombre in requeridos]
+
+
+def _huellas_salidas(paso: Paso, salidas: Tuple[Any, ...]) -> Dict[str, Optional[str]]:
+    if paso.huella is not None:
+        return dict(zip(paso.salidas, paso.huella(*salidas)))
+    huellas: Dict[str, Optional[str]] = {}
+    for nombre, valor in zip(paso.salidas, salidas):
+        try:
+            huellas[nombre] = huella_objeto(valor)
+        except Exception:
+            huellas[nombre] = None  # artefacto no hasheable → downstream no cacheable
+    return huellas
+
+
+def _huella_paso(paso: Paso, huellas: Dict[str, Optional[str]]) -> Optional[str]:
+    """Huella de entradas del paso; None si alguna entrada no es hasheable."""
+    entradas = [huellas.get(e) for e in paso.entradas]
+    if any(h is None for h in entradas):
+        return None
+    return combinar(
+        paso.nombre,
+        *(f"{d.name}={huella_archivo(d)}" for d in paso.dependencias),
+        *(f"{e}={h}" for e, h in zip(paso.entradas, entradas)),
+    )
+
+
+def _correr(paso: Paso, args: List[Any]) -> Tuple[Tuple[Any, ...], Dict[str, Optional[str]]]:
+    t0 = time.perf_counter()
+    resultado = paso.ejecutar(*args)
+    salidas = resultado if len(paso.salidas) > 1 else (resultado,)
+    if len(salidas) != len(paso.salidas):
+        raise RuntimeError(f"❌ Paso '{paso.nombre}' devolvió {len(salidas)} salidas, se esperaban {len(paso.salidas)}")
+    salidas = tuple(salidas)
+    print(f"⏱️ {paso.nombre}: {(time.perf_counter() - t0) * 1000:.0f} ms")
+    return salidas, _huellas_salidas(paso, salidas)
+
+
+def _desde_cache(paso: Paso, cache: CachePasos, estado: Dict[str, Any]) -> Tuple[Tuple[Any, ...], Dict[str, Optional[str]]]:
+    salidas = cache.cargar_salidas(paso.nombre, paso.salidas)
+    print(f"⏭️ {paso.nombre}: sin cambios, reutiliza salidas cacheadas")
+    return salidas, estado["salidas"]
+
+
+def ejecutar_dag(
+    pasos: List[Paso],
+    archivos: bool = False,
+    db: bool = False,
+    max_workers: int = 4,
+    cache: Optional[CachePasos] = None,
+) -> Dict[str, Any]:
+    """
+    Ejecuta los pasos respetando dependencias: cada paso se lanza apenas sus
+    entradas están disponibles. Con `cache`, los pasos cuya huella no cambió se
+    saltan; los sinks pedidos corren igual sobre las salidas cacheadas.
+    Devuelve todos los artefactos producidos.
+    """
+    artefactos: Dict[str, Any] = {}
+    huellas: Dict[str, Optional[str]] = {}
+    pendientes = {p.nombre: p for p in pasos}
+    en_curso: Dict[Future, Tuple[Paso, Optional[str], Optional[Dict[str, Any]]]] = {}
+    sinks: List[Future] = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pendientes or en_curso:
+            listos = [p for p in pendientes.values() if all(e in artefactos for e in p.entradas)]
+            for p in listos:
+                del pendientes[p.nombre]
+                h = _huella_paso(p, huellas) if (cache and p.cache) else None
+                estado = cache.vigente(p.nombre, h) if (cache and h) else None
+                if estado:
+                    fut = pool.submit(_desde_cache, p, cache, estado)
+                else:
+                    fut = pool.submit(_correr, p, [artefactos[e] for e in p.entradas])
+                en_curso[fut] = (p, h, estado)
+            if not en_curso:
+                raise RuntimeError(f"❌ Dependencias sin resolver: {sorted(pendientes)}")
+
+            hechos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for fut in hechos:
+                p, h, estado = en_curso.pop(fut)
+                salidas, huellas_salidas = fut.result()
+                artefactos.update(zip(p.salidas, salidas))
+                huellas.update(huellas_salidas)
+
+                if cache and h and not estado:
+                    cache.guardar(p.nombre, h, dict(zip(p.salidas, salidas)), huellas_salidas)
+                # Sinks siempre que se pidan: no se sabe si el destino sigue teniendo los datos
+                for activo, fn in ((archivos, p.archivos), (db, p.db)):
+                    if activo and fn:
+                        sinks.append(pool.submit(fn, *salidas))
+
+        for fut in sinks:
+            fut.result()
+
+    return artefactos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refinería en proceso (DAG de pasos 0–12)")
+    parser.add_argument("--archivos", action="store_true", help="exporta artefactos (Parquet + CSV) y .py como los scripts sueltos")
+    parser.add_argument("--db", action="store_true", help="persiste tablas en la DB")
+    parser.add_argument("--hasta", action="append", metavar="PASO", help="corre solo lo necesario para PASO (repetible)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sin-cache", action="store_true", help="ignora huellas y recalcula todos los pasos")
+    parser.add_argument("--grafo", action="store_true", help="valuación por grafo (6b) en lugar de los pasos 6–12")
+    args = parser.parse_args()
+
+    solo_db = sorted(set(args.hasta or ()) & set(PASOS_DB))
+    if solo_db and not args.db:
+        parser.error(f"{', '.join(solo_db)} valida/escribe la DB: requiere --db")
+
+    ensure_runtime_dirs()
+    pasos = seleccionar(construir_dag(grafo=args.grafo, db=args.db), args.hasta)
+
+    t0 = time.perf_counter()
+    artefactos = ejecutar_dag(
+        pasos, archivos=args.archivos, db=args.db, max_workers=args.workers,
+        cache=None if args.sin_cache else CachePasos(),
+    )
+    print(f"🎯 DAG completo: {len(pasos)} pasos, {len(artefactos)} artefactos en {time.perf_counter() - t0:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
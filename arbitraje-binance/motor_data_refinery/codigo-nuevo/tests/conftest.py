@@ -0,0 +1,9 @@
+# codigo/tests/conftest.py
+"""Pruebas del paquete `config` (se importa como en `python -m config.X` desde codigo/)."""
+
+import sys
+from pathlib import Path
+
+CODIGO_DIR = Path(__file__).resolve().parents[1]
+if str(CODIGO_DIR) not in sys.path:
+    sys.path.insert(0, str(CODIGO_DIR))
@@ -0,0 +1,34 @@
+# codigo/tests/test_criterios.py
+"""Normalización vectorizada de criterios (config/criterios.py) contra `normalizar_valor` por fila."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config.criterios import compilar, evaluar, normalizar_serie, normalizar_valor
+
+COLUMNAS = [
+    pd.Series([1.0, True, 1, "1", " yes ", False, 0, 0.0], dtype=object),
+    pd.Series([None, np.nan, "None", "nan", pd.NA], dtype=object),
+    pd.Series([" spot ", "SPOT", "Spot", None, 1.5]),
+    pd.Series([1.0, np.nan, 0.0]),
+    pd.Series([True, False, True]),
+]
+
+
+@pytest.mark.parametrize("s", COLUMNAS)
+def test_serie_igual_a_valor_por_fila(s):
+    assert list(normalizar_serie(s)) == [normalizar_valor(v) for v in s]
+
+
+def test_bool_no_se_agrupa_con_float():
+    assert list(normalizar_serie(pd.Series([1.0, True], dtype=object))) == ["1.0", "TRUE"]
+
+
+def test_evaluar_no_depende_del_orden():
+    compilados = compilar({"active": {"TRUE"}})
+    df = pd.DataFrame({"active": pd.Series([1.0, True, None, np.nan], dtype=object)})
+    bits = evaluar(df, compilados, fiat=[])
+    bits_inv = evaluar(df.iloc[::-1].reset_index(drop=True), compilados, fiat=[])
+    assert list(bits) == list(bits_inv[::-1])
+    assert list(bits == 0) == [False, True, False, False]
@@ -0,0 +1,96 @@
+# codigo/tests/test_ddl.py
+"""Índices de tablas `sym_*` previas (config/ddl.py): tipos reales, no los del DDL generado."""
+
+import re
+
+import pymysql
+
+from config import db
+from config.ddl import INDICES, VARCHAR_MAX, asegurar_indices
+
+# Línea base: `sym_*` creadas con todas las columnas en TEXT
+BASE_TEXT = {"symbol_id": "text", "exchange": "text", "symbol": "text", "base": "text", "quote": "text"}
+
+
+class _CursorMaria:
+    def __init__(self, conn):
+        self.conn = conn
+        self._filas = []
+
+    def execute(self, sql, args=None):
+        self.conn.sentencias.append(sql)
+        if sql.startswith("SHOW COLUMNS"):
+            self._filas = [{"Field": c, "Type": t} for c, t in self.conn.tipos.items()]
+        elif sql.startswith("SELECT MAX(CHAR_LENGTH"):
+            col = re.search(r"`(\w+)`", sql).group(1)
+            self._filas = [{"largo": self.conn.largos.get(col)}]
+        elif sql.startswith("ALTER TABLE"):
+            col, tipo = re.search(r"MODIFY `(\w+)` (.+)$", sql).groups()
+            self.conn.tipos[col] = tipo.lower()
+        elif sql.startswith("CREATE INDEX"):
+            cols = re.search(r"\((.+)\)", sql).group(1).replace("`", "").split(", ")
+            if any(self.conn.tipos[c] == "text" for c in cols):
+                raise pymysql.err.OperationalError(1170, "BLOB/TEXT column used in key specification without a key length")
+        return 0
+
+    def fetchone(self):
+        return self._filas[0] if self._filas else None
+
+    def fetchall(self):
+        return self._filas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class _ConexionMaria:
+    """MariaDB mínima: SHOW COLUMNS / ALTER MODIFY y el error 1170 de índices sobre TEXT."""
+
+    def __init__(self, tipos, largos):
+        self.tipos = dict(tipos)
+        self.largos = largos
+        self.sentencias = []
+
+    def cursor(self, cursorclass=None):
+        return _CursorMaria(self)
+
+
+def test_mariadb_tabla_base_text_pasa_a_varchar():
+    conn = _ConexionMaria(BASE_TEXT, {"base": 8, "quote": 5})
+    sentencias = asegurar_indices(conn, "sym_spot")
+    assert len(sentencias) == len(INDICES)
+    assert conn.tipos["base"] == conn.tipos["quote"] == f"varchar({VARCHAR_MAX})"
+    assert conn.tipos["symbol"] == "text"  # fuera de los índices: no se toca
+
+
+def test_mariadb_valor_largo_omite_indice():
+    conn = _ConexionMaria(BASE_TEXT, {"base": 8, "quote": VARCHAR_MAX + 1})
+    assert asegurar_indices(conn, "sym_spot") == []
+    assert conn.tipos["quote"] == "text"
+
+
+def test_mariadb_tabla_tipada_no_se_altera():
+    tipos = {**BASE_TEXT, "base": f"varchar({VARCHAR_MAX})", "quote": f"varchar({VARCHAR_MAX})"}
+    conn = _ConexionMaria(tipos, {})
+    assert len(asegurar_indices(conn, "sym_spot")) == len(INDICES)
+    assert not [s for s in conn.sentencias if s.startswith("ALTER")]
+
+
+def test_sqlite_tabla_base_text_se_indexa(tmp_path, monkeypatch):
+    monkeypatch.setenv("TDDL_BACKEND", "sqlite")
+    monkeypatch.setenv("TDDL_SQLITE_PATH", str(tmp_path / "base.sqlite"))
+    try:
+        with db.conexion("TDDL") as conn:
+            with conn.cursor() as cur:
+                cur.execute("CREATE TABLE `sym_spot` ({})".format(", ".join(f"`{c}` TEXT" for c in BASE_TEXT)))
+            sentencias = asegurar_indices(conn, "sym_spot")
+            with conn.cursor() as cur:
+                cur.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'sym_spot'")
+                nombres = {f["name"] for f in cur.fetchall()}
+        assert len(sentencias) == len(INDICES)
+        assert nombres == {"idx_sym_spot_quote", "idx_sym_spot_base_quote"}
+    finally:
+        db.cerrar_pools()
@@ -0,0 +1,107 @@
+# codigo/tests/test_feed_ws.py
+"""Feed WebSocket (config/feed_ws.py) contra el stand-in local (config/ws_replay.py)."""
+
+import asyncio
+import json
+import math
+import socket
+
+import pytest
+
+from config import ws_replay
+from config.feed_ws import FeedBinance, TablaBBO
+
+MARKETS = {"BTC/USDT": {"id": "BTCUSDT"}, "ETH/USDT": {"id": "ETHUSDT"}}
+
+
+def _book(s, u, b, a):
+    return {"stream": f"{s.lower()}@bookTicker",
+            "data": {"u": u, "s": s, "b": str(b), "B": "1.5", "a": str(a), "A": "2.5"}}
+
+
+def _mini(s, c, e):
+    return {"stream": f"{s.lower()}@miniTicker", "data": {"e": "24hrMiniTicker", "E": e, "s": s, "c": str(c)}}
+
+
+MENSAJES = [
+    {"result": None, "id": 1},                  # respuesta a SUBSCRIBE: se ignora
+    _book("BTCUSDT", 10, 100.0, 100.1),
+    _book("BTCUSDT", 9, 1.0, 1.1),              # u viejo: rechazado
+    _book("BTCUSDT", 12, 100.2, 100.3),
+    _book("BTCUSDT", 12, 2.0, 2.1),             # u repetido: rechazado
+    _mini("BTCUSDT", 100.25, 1700000000000),
+    _book("ETHUSDT", 5, 3000.0, 3000.5),
+    _book("XRPUSDT", 1, 0.5, 0.6),              # fuera de la tabla
+    _mini("ETHUSDT", 3000.2, 1700000000500),
+]
+APLICADOS = 5  # book BTC u=10 y u=12, miniTicker BTC, book ETH, miniTicker ETH
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _correr_feed(grabacion, esperados, grabar=None, timeout=10.0) -> FeedBinance:
+    puerto = _puerto_libre()
+    runner = await ws_replay.iniciar(grabacion, puerto=puerto, velocidad=0)
+    feed = FeedBinance(list(MARKETS), markets=MARKETS, url=f"ws://127.0.0.1:{puerto}/stream", grabar=grabar)
+    tarea = asyncio.ensure_future(feed.correr())
+    try:
+        limite = asyncio.get_running_loop().time() + timeout
+        while feed.tabla.mensajes < esperados:
+            assert asyncio.get_running_loop().time() < limite, f"solo {feed.tabla.mensajes} mensajes aplicados"
+            await asyncio.sleep(0.01)
+    finally:
+        if feed._detener is not None:
+            feed._detener.set()
+        await asyncio.wait_for(tarea, timeout)
+        await runner.cleanup()
+    return feed
+
+
+@pytest.fixture
+def grabacion(tmp_path):
+    path = tmp_path / "sesion.jsonl"
+    path.write_text("\n".join(json.dumps({"t": 1000.0 + n, "m": json.dumps(m)}) for n, m in enumerate(MENSAJES)),
+                    encoding="utf-8")
+    return path
+
+
+def test_feed_contra_replay(grabacion):
+    feed = asyncio.run(_correr_feed(grabacion, APLICADOS))
+    tabla = feed.tabla
+    assert tabla.mensajes == APLICADOS
+    assert not feed.conectado.is_set()
+
+    btc = tabla.fila("BTC/USDT")
+    assert (btc["bid"], btc["bid_qty"], btc["ask"], btc["ask_qty"]) == (100.2, 1.5, 100.3, 2.5)
+    assert (btc["last"], btc["ts_last"]) == (100.25, 1700000000000.0)
+    assert tabla.update_id[tabla.indice["BTC/USDT"]] == 12
+
+    eth = tabla.fila("ETH/USDT")
+    assert tabla.mejor("ETH/USDT") == (3000.0, 3000.5)
+    assert (eth["last"], eth["ts_last"]) == (3000.2, 1700000000500.0)
+    assert tabla.fila("XRP/USDT") is None
+
+    df = tabla.frame()
+    assert list(df.index) == ["BTC/USDT", "ETH/USDT"]
+    assert df.loc["ETH/USDT", "update_id"] == 5
+
+
+def test_feed_graba_lo_que_recibe(grabacion, tmp_path):
+    salida = tmp_path / "regrabado.jsonl"
+    asyncio.run(_correr_feed(grabacion, APLICADOS, grabar=salida))
+    recibidos = [m for _, m in ws_replay.leer_grabacion(salida)]
+    assert recibidos[:len(MENSAJES)] == [json.dumps(m) for m in MENSAJES]
+
+
+def test_tabla_rechaza_u_viejo():
+    tabla = TablaBBO(["BTC/USDT"])
+    tabla.aplicar_book_ticker(0, {"u": 7, "b": "1", "B": "1", "a": "2", "A": "1"})
+    tabla.aplicar_book_ticker(0, {"u": 6, "b": "9", "B": "9", "a": "9", "A": "9"})
+    tabla.aplicar_book_ticker(0, {"u": 7, "b": "8", "B": "8", "a": "8", "A": "8"})
+    assert tabla.mejor("BTC/USDT") == (1.0, 2.0) and tabla.mensajes == 1
+    assert tabla.version[0] == 2  # par: ninguna escritura a medio hacer
+    assert math.isnan(tabla.fila("BTC/USDT")["last"])
@@ -0,0 +1,83 @@
+# codigo/tests/test_orderbook.py
+"""Order book local (config/orderbook.py) contra el libro "verdad" del replay (config/depth_replay.py)."""
+
+import json
+
+import pytest
+
+from config.depth_replay import FuenteReplay, correr_replay
+from config.orderbook import GestorLibros, LibroLocal
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "snapshot.json"
+    path.write_text(json.dumps({
+        "symbol": "BTC/USDT",
+        "lastUpdateId": 1000,
+        "bids": [[100.0 - i * 0.1, 1.0 + i] for i in range(30)],
+        "asks": [[100.1 + i * 0.1, 1.0 + i] for i in range(30)],
+    }), encoding="utf-8")
+    return path
+
+
+def test_replay_sin_huecos_coincide(snapshot):
+    res = correr_replay(FuenteReplay(snapshot, n_sinteticos=2000, semilla=1))
+    assert res["coincide_con_verdad"]
+    assert res["eventos_aplicados"] == 2000
+    assert res["gaps"] == 0
+    assert res["resyncs"] == 1  # solo el snapshot inicial
+
+
+@pytest.mark.parametrize("semilla", [0, 7])
+def test_replay_con_huecos_resincroniza(snapshot, semilla):
+    huecos = [100, 1000, 1001, 2500]
+    res = correr_replay(FuenteReplay(snapshot, n_sinteticos=5000, semilla=semilla, descartar=huecos))
+    assert res["descartados"] == len(huecos)
+    assert res["coincide_con_verdad"]
+    assert res["gaps"] == 3  # 1000 y 1001 seguidos son un solo hueco
+    assert res["resyncs"] == 1 + res["gaps"]
+
+
+def test_replay_desde_eventos_grabados(snapshot, tmp_path):
+    eventos = tmp_path / "eventos.jsonl"
+    eventos.write_text("\n".join(json.dumps({"stream": "btcusdt@depth", "data": ev}) for ev in [
+        {"e": "depthUpdate", "s": "BTCUSDT", "U": 1001, "u": 1001, "b": [[100.0, 0.0]], "a": []},
+        {"e": "depthUpdate", "s": "BTCUSDT", "U": 1002, "u": 1004, "b": [[100.05, 2.5]], "a": [[100.1, 0.5]]},
+    ]), encoding="utf-8")
+    res = correr_replay(FuenteReplay(snapshot, eventos_path=eventos, descartar=[0]))
+    assert res["coincide_con_verdad"]
+    assert (res["gaps"], res["resyncs"], res["eventos_aplicados"]) == (1, 2, 0)
+
+
+def test_libro_reglas_de_secuencia():
+    libro = LibroLocal("BTC/USDT")
+    # antes del snapshot se bufferiza; lo ya contenido en el snapshot se descarta
+    assert libro.procesar({"U": 5, "u": 9, "b": [[99.0, 1.0]], "a": []})
+    assert libro.procesar({"U": 10, "u": 12, "b": [[98.0, 2.0]], "a": [[101.0, 0.0]]})
+    assert libro.aplicar_snapshot({"lastUpdateId": 10, "bids": [[99.5, 1.0]], "asks": [[101.0, 3.0], [102.0, 1.0]]})
+    assert libro.last_update_id == 12 and libro.eventos == 1
+    assert libro.bids.niveles() == [[99.5, 1.0], [98.0, 2.0]]
+    assert libro.asks.niveles() == [[102.0, 1.0]]
+
+    # evento viejo: se ignora sin tocar el libro
+    assert libro.procesar({"U": 11, "u": 12, "b": [[97.0, 1.0]], "a": []})
+    assert libro.bids.niveles(1) == [[99.5, 1.0]] and len(libro.bids) == 2
+
+    # hueco (U != u_anterior + 1) → desincronizado con el evento en el buffer
+    assert not libro.procesar({"U": 14, "u": 15, "b": [], "a": []})
+    assert not libro.listo and libro.gaps == 1 and len(libro.buffer) == 1
+
+
+def test_gestor_enruta_por_id_y_resincroniza(snapshot):
+    fuente = FuenteReplay(snapshot, n_sinteticos=50, descartar=range(10, 20))
+    gestor = GestorLibros(lambda _s: fuente.snapshot(), [fuente.symbol])
+    # sin snapshot inicial: el primer evento lo pide; el hueco dispara el segundo
+    for ev in fuente.eventos():
+        assert gestor.procesar(ev) == "BTC/USDT"
+    libro = gestor.libros["BTC/USDT"]
+    assert (libro.resyncs, libro.gaps) == (2, 1)
+    verdad = fuente.snapshot()
+    assert libro.a_dict() == {"symbol": "BTC/USDT", "bids": verdad["bids"], "asks": verdad["asks"],
+                              "nonce": verdad["lastUpdateId"]}
+    assert gestor.procesar({"s": "ETHUSDT", "U": 1, "u": 1}) is None
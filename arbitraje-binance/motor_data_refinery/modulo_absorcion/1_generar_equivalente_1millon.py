@@ -2,21 +2,13 @@
 
 import os
 import pandas as pd
-import pymysql
-from decimal import Decimal, getcontext
 
-# Precisión interna muy alta
-getcontext().prec = 50
-
-# --- Config DB Kraken -------------------------------------------------
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "database": os.getenv("DB_NAME"),
-    "charset": "utf8mb4",
-    "cursorclass": pymysql.cursors.DictCursor,
-}
+# --- Config DB Kraken: pool compartido (perfil DB_*) -----------------
+from rutas_motor import usar_config_motor
+usar_config_motor()
+from config.artefactos import leer_artefacto
+from config.db import connect
+from config.numerico import decimales_de, texto_exacto, truncar
 
 # --- Rutas -------------------------------------------------------------
 BASE_DIR = os.path.dirname(__file__)
@@ -25,29 +17,21 @@ DST_CSV = os.path.join(BASE_DIR, 'cotizaciones_equivalentes_1_millon_usdt.csv')
 DST_YAML = os.path.join(BASE_DIR, 'cotizaciones_equivalentes_1_millon_usdt.yaml')
 
 # --- Leer cotizaciones base -------------------------------------------
-df = pd.read_csv(SRC, dtype=str)  # mantiene full-precision como texto
+df = leer_artefacto(SRC, exactos=True)  # Parquet tipado (o el CSV); precios como decimal exacto
+df['1_dolar_equivale_a_quote'] = texto_exacto(df['1_dolar_equivale_a_quote'])
 
 # --- Cargar precisión por símbolo desde kraken_funcional --------------
-conn = pymysql.connect(**DB_CONFIG)
+conn = connect()
 with conn.cursor() as cur:
     cur.execute("SELECT symbol, price FROM kraken_funcional")
-    precisiones = {
-        r['symbol']: Decimal(str(r['price'])).normalize().as_tuple().exponent * -1
-        for r in cur.fetchall()
-    }
+    filas = cur.fetchall()
 conn.close()
+precisiones = pd.Series(decimales_de(r['price'] for r in filas), index=[r['symbol'] for r in filas])
+precisiones = precisiones[~precisiones.index.duplicated(keep='last')]
 
-# --- Función de truncado según precision ------------------------------
-def a_1m_truncado(row):
-    valor_1d = Decimal(row['1_dolar_equivale_a_quote'])
-    bruto_1m = valor_1d * Decimal('1000000')
-    decimales = precisiones.get(row['symbol'], 18)  # fallback: 18
-    factor = Decimal('1').scaleb(-decimales)
-    truncado = (bruto_1m // factor) * factor
-    return str(truncado)
-
-# --- Calcular columna truncada ----------------------------------------
-df['1_millon_equivale_a_quote'] = df.apply(a_1m_truncado, axis=1)
+# --- Truncado exacto según precision (sobre los dígitos, sin float) ---
+decimales = df['symbol'].map(precisiones).fillna(18).astype(int)  # fallback: 18
+df['1_millon_equivale_a_quote'] = truncar(df['1_dolar_equivale_a_quote'], 6, decimales)
 
 # --- Guardar CSV final truncado ---------------------------------------
 cols = ['symbol', 'base', 'quote', '1_dolar_equivale_a_quote', '1_millon_equivale_a_quote']
@@ -55,10 +39,10 @@ df[cols].to_csv(DST_CSV, index=False)
 
 # --- Exportar versión tipo YAML (toda la tabla) ------------------------
 with open(DST_YAML, 'w', encoding='utf-8') as f:
-    for _, row in df.iterrows():
-        f.write(f"- symbol    : {row['symbol']}\n")
-        f.write(f"  base      : {row['base']}\n")
-        f.write(f"  quote     : {row['quote']}\n")
-        f.write(f"  1_usd     : {row['1_dolar_equivale_a_quote']}\n")
-        f.write(f"  1m_usd    : {row['1_millon_equivale_a_quote']}\n")
+    for symbol, base, quote, usd, usd_1m in df[cols].itertuples(index=False, name=None):
+        f.write(f"- symbol    : {symbol}\n")
+        f.write(f"  base      : {base}\n")
+        f.write(f"  quote     : {quote}\n")
+        f.write(f"  1_usd     : {usd}\n")
+        f.write(f"  1m_usd    : {usd_1m}\n")
         f.write("\n")
@@ -2,9 +2,14 @@
 
 import os
 import csv
-import ccxt
+import asyncio
 from datetime import datetime
 
+# --- Capa de fetch concurrente compartida (codigo/config/fetch_async.py) ---
+from rutas_motor import usar_config_motor
+usar_config_motor()
+from config.fetch_async import iterar
+
 ARCHIVO_ENTRADA = 'cotizaciones_equivalentes_1_millon_usdt.csv'
 ARCHIVO_SALIDA = 'snapshot_multi_slippage.csv'
 EXCHANGE_ID = 'kraken'
@@ -12,8 +17,6 @@ EXCHANGE_ID = 'kraken'
 # Slippages a evaluar (en porcentaje decimal)
 SLIPPAGES = [0.001, 0.003, 0.005]  # 0.1%, 0.3%, 0.5%
 
-exchange = getattr(ccxt, EXCHANGE_ID)({'enableRateLimit': True})
-
 # Simula hasta donde se puede absorber sin superar el slippage permitido
 def simular_absorcion(orderbook_asks, slippage_pct):
     if not orderbook_asks:
@@ -45,31 +48,22 @@ with open(ruta_entrada, 'r') as f:
     reader = csv.DictReader(f)
     datos = list(reader)
 
-# Escribir CSV de salida
-with open(ruta_salida, 'w', newline='') as f_out:
-    writer = csv.writer(f_out)
+filas_por_symbol = {fila['symbol']: fila for fila in datos}
 
-    # Armar cabecera
-    header = ['timestamp', 'symbol', 'quote', 'capital_simulado_quote']
-    for s in SLIPPAGES:
-        sufijo = f"{int(s*1000):03d}_slip"
-        header += [
-            f'capital_quote_max_{sufijo}',
-            f'capital_usdt_equiv_{sufijo}',
-            f'niveles_usados_{sufijo}',
-            f'precio_limite_{sufijo}'
-        ]
-    writer.writerow(header)
 
-    for fila in datos:
-        symbol = fila['symbol']
+# Order books concurrentes: cada fila se escribe apenas llega su libro
+async def procesar(writer):
+    async for r in iterar(EXCHANGE_ID, "fetch_order_book", filas_por_symbol.keys()):
+        symbol = r.symbol
+        fila = filas_por_symbol[symbol]
         quote = fila['quote']
         try:
+            if not r.ok:
+                raise r.error
             capital_simulado = float(fila['1_millon_equivale_a_quote'])
             quote_por_1_usdt = float(fila['1_dolar_equivale_a_quote'])
 
-            orderbook = exchange.fetch_order_book(symbol)
-            asks = orderbook.get('asks', [])
+            asks = r.valor.get('asks', [])
 
             fila_out = [datetime.utcnow().isoformat() + 'Z', symbol, quote, capital_simulado]
 
@@ -89,3 +83,22 @@ with open(ruta_salida, 'w', newline='') as f_out:
 
         except Exception as e:
             print(f"❌ Error procesando {symbol}: {e}")
+
+
+# Escribir CSV de salida
+with open(ruta_salida, 'w', newline='') as f_out:
+    writer = csv.writer(f_out)
+
+    # Armar cabecera
+    header = ['timestamp', 'symbol', 'quote', 'capital_simulado_quote']
+    for s in SLIPPAGES:
+        sufijo = f"{int(s*1000):03d}_slip"
+        header += [
+            f'capital_quote_max_{sufijo}',
+            f'capital_usdt_equiv_{sufijo}',
+            f'niveles_usados_{sufijo}',
+            f'precio_limite_{sufijo}'
+        ]
+    writer.writerow(header)
+
+    asyncio.run(procesar(writer))
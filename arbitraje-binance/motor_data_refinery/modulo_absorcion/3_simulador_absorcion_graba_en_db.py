@@ -2,27 +2,30 @@
 
 import os
 import csv
-import ccxt
-import pymysql
+import asyncio
 from datetime import datetime
 
-# --- Configuración de DB usando variables de entorno DB2_* ---
-DB_CONFIG = {
-    "host": os.getenv("DB2_HOST"),
-    "user": os.getenv("DB2_USER"),
-    "password": os.getenv("DB2_PASSWORD"),
-    "database": os.getenv("DB2_NAME"),
-    "charset": "utf8mb4",
-    "cursorclass": pymysql.cursors.DictCursor,
-    "autocommit": True,
-}
+import pandas as pd
+
+# --- Fetch concurrente y pool de DB compartidos (codigo/config/) ---
+from rutas_motor import usar_config_motor
+usar_config_motor()
+from config.fetch_async import iterar
+from config.db import connect
+from config.carga import cargar_frame
+from config.historial import (
+    COLUMNAS_METRICAS, TABLA_HISTORIAL,
+    asegurar_historial, asegurar_particiones, asegurar_vistas, grabar_historial,
+)
+
+# --- DB: perfil de variables de entorno DB2_* ---
+DB_PERFIL = "DB2"
 
 # --- Parámetros generales ---
 ARCHIVO_ENTRADA = os.path.join(os.path.dirname(__file__), 'cotizaciones_equivalentes_1_millon_usdt.csv')
 EXCHANGE_ID = 'kraken'
 SLIPPAGE = 0.003  # 0.3%
 TABLE_SNAPSHOT = 'absorcion_snapshot_global'
-PREFIX = 'absorcion_'
 
 # --- Simula absorción sin superar el slippage tolerado ---
 def simular_absorcion(orderbook_asks, slippage_pct):
@@ -43,7 +46,7 @@ if not os.path.exists(ARCHIVO_ENTRADA):
     raise FileNotFoundError(f"❌ No se encontró el archivo de entrada: {ARCHIVO_ENTRADA}")
 
 # --- Conexión a DB ---
-conn = pymysql.connect(**DB_CONFIG)
+conn = connect(DB_PERFIL, autocommit=True)
 cur = conn.cursor()
 
 try:
@@ -67,64 +70,56 @@ try:
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
     """)
 
-    # --- Inicializar exchange y timestamp global ---
-    exchange = getattr(ccxt, EXCHANGE_ID)({'enableRateLimit': True})
+    # --- Timestamp global ---
     now = datetime.utcnow().replace(microsecond=0)
+    filas_por_symbol = {fila['symbol']: fila for fila in datos}
+
+    # --- Historial único (particionado por mes) + vistas absorcion_<symbol> ---
+    asegurar_historial(conn)
+    asegurar_particiones(conn, now)
+    compat = asegurar_vistas(conn, {s: f.get('quote') for s, f in filas_por_symbol.items()})
+    if compat["vistas_creadas"]:
+        print(f"🗂️ {compat['vistas_creadas']} vistas por símbolo sobre `{TABLA_HISTORIAL}` "
+              f"({compat['filas_migradas']} filas migradas de tablas viejas)")
 
-    # --- Loop por símbolo ---
-    for fila in datos:
+    # --- Order books concurrentes: se simula cada símbolo apenas llega su libro ---
+    resultados = []
+
+    async def procesar():
+        async for r in iterar(EXCHANGE_ID, "fetch_order_book", filas_por_symbol.keys()):
+            simular(r)
+
+    def simular(r):
+        fila = filas_por_symbol[r.symbol]
         try:
-            symbol = fila['symbol']
-            quote = fila['quote']
+            if not r.ok:
+                raise r.error
             capital_simulado = float(fila['1_millon_equivale_a_quote'])
             quote_por_1_usdt = float(fila['1_dolar_equivale_a_quote'])
 
-            orderbook = exchange.fetch_order_book(symbol)
-            asks = orderbook.get('asks', [])
+            asks = r.valor.get('asks', [])
 
             quote_usado, niveles, precio_max = simular_absorcion(asks, SLIPPAGE)
             usdt_equiv = quote_usado / quote_por_1_usdt if quote_por_1_usdt > 0 else 0
 
-            # --- Insertar en snapshot global ---
-            cur.execute(f"""
-                INSERT INTO {TABLE_SNAPSHOT} (
-                    timestamp_utc, symbol, quote, capital_simulado_quote,
-                    capital_quote_max_003_slip, capital_usdt_equiv_003_slip,
-                    niveles_usados_003_slip, precio_limite_003_slip
-                ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
-            """, (
-                now, symbol, quote, capital_simulado,
+            resultados.append((
+                fila['symbol'], fila['quote'], capital_simulado,
                 quote_usado, usdt_equiv, niveles, precio_max
             ))
-
-            # --- Insertar en tabla por símbolo ---
-            tabla_simbolo = f"{PREFIX}{symbol.lower().replace('/', '_').replace(' ', '').replace('.', '')}"
-            cur.execute(f"""
-                CREATE TABLE IF NOT EXISTS {tabla_simbolo} (
-                    timestamp_utc DATETIME,
-                    capital_simulado_quote DECIMAL(32,12),
-                    capital_quote_max_003_slip DECIMAL(32,12),
-                    capital_usdt_equiv_003_slip DECIMAL(32,12),
-                    niveles_usados_003_slip INT,
-                    precio_limite_003_slip DECIMAL(32,12)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-            """)
-            cur.execute(f"""
-                INSERT INTO {tabla_simbolo} (
-                    timestamp_utc, capital_simulado_quote,
-                    capital_quote_max_003_slip, capital_usdt_equiv_003_slip,
-                    niveles_usados_003_slip, precio_limite_003_slip
-                ) VALUES (%s,%s,%s,%s,%s,%s)
-            """, (
-                now, capital_simulado,
-                quote_usado, usdt_equiv, niveles, precio_max
-            ))
-
-            print(f"✅ {symbol} insertado en snapshot y tabla histórica")
+            print(f"✅ {fila['symbol']} simulado")
 
         except Exception as e:
             print(f"❌ Error procesando símbolo {fila.get('symbol', '?')}: {e}")
 
+    asyncio.run(procesar())
+
+    # --- Snapshot completo: una carga masiva por tabla ---
+    df = pd.DataFrame(resultados, columns=["symbol", "quote", *COLUMNAS_METRICAS])
+    df.insert(0, "ts", now)
+    cargar_frame(conn, TABLE_SNAPSHOT, df.rename(columns={"ts": "timestamp_utc"}))
+    grabar_historial(conn, df)
+    print(f"✅ Snapshot {now:%Y-%m-%d %H:%M:%S}: {len(df)} símbolos en `{TABLE_SNAPSHOT}` y `{TABLA_HISTORIAL}`")
+
 finally:
     cur.close()
     conn.close()
@@ -2,23 +2,16 @@
 
 import csv
 import os
-import pymysql
 
 # 📁 Rutas de archivos
 archivo_entrada = os.path.join(os.path.dirname(__file__), 'snapshot_multi_slippage.csv')
 archivo_filtrados = os.path.join(os.path.dirname(__file__), 'absorcion_filtrada.csv')
 archivo_descartados = os.path.join(os.path.dirname(__file__), 'absorcion_descartados.csv')
 
-# 🛠️ Conexión a base de datos común
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "database": os.getenv("DB_NAME"),
-    "charset": "utf8mb4",
-    "cursorclass": pymysql.cursors.DictCursor,
-    "autocommit": True,
-}
+# 🛠️ Conexión a base de datos común: pool compartido (perfil DB_*)
+from rutas_motor import usar_config_motor
+usar_config_motor()
+from config.db import connect
 
 # 🔐 Columnas de salida
 columnas_salida = [
@@ -73,7 +66,7 @@ print("✅ Archivos CSV generados correctamente.")
 
 # 🛢️ Guardar en MariaDB tabla: kraken_pares_operables
 try:
-    conn = pymysql.connect(**DB_CONFIG)
+    conn = connect(autocommit=True)
     cur = conn.cursor()
 
     # Crear tabla si no existe
@@ -0,0 +1,27 @@
+# archivo: modulo_absorcion/rutas_motor.py
+"""
+Bootstrap común de los scripts de absorción: agrega al sys.path la carpeta del
+motor que tenga el paquete `config/` (`codigo/` o `codigo-nuevo/`), para poder
+importar `config.db`, `config.fetch_async`, etc.
+
+Uso (antes de los `from config... import`):
+    from rutas_motor import usar_config_motor
+    usar_config_motor()
+"""
+
+import sys
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parent.parent
+CANDIDATOS = ("codigo", "codigo-nuevo")
+
+
+def usar_config_motor() -> Path:
+    """Inserta en sys.path el primer candidato con `config/` y lo devuelve."""
+    for cand in CANDIDATOS:
+        carpeta = BASE / cand
+        if (carpeta / "config").is_dir():
+            if str(carpeta) not in sys.path:
+                sys.path.insert(0, str(carpeta))
+            return carpeta
+    raise RuntimeError(f"❌ No se encontró el paquete config/ en {BASE} ({', '.join(CANDIDATOS)})")